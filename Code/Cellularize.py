@@ -1,25 +1,72 @@
 from PIL import Image
+import numpy as np
 import random
 import string
 import os
 
+import image_store
+
 OutputLocation = "temp"
 
-def cellularize_Page_colrow(ImageLocation: str, colAr: list, rowAr: list, page_num):
+
+class Cell:
+    """
+    A single table cell: its page, grid position, pixel bounding box and pixels.
+
+    Row and column are carried on the record, so nothing has to be parsed back out of
+    a file name. The pixels are held in memory (`image`, usually a zero-copy view into
+    the page array) or on disk (`path`, for cells written by cellularize_Page_colrow).
+
+    Example:
+    --------
+    cell = Cell(0, 3, 1, (120, 300, 260, 340), image=page[300:340, 120:260])
+    cell.row, cell.col, cell.pixels().shape
+    """
+    __slots__ = ('page', 'row', 'col', 'bbox', 'image', 'path')
+
+    def __init__(self, page, row, col, bbox, image=None, path=None):
+        """
+        @param bbox: (left, upper, right, lower) in page pixel coordinates.
+        @param image: Cell pixels as a NumPy array, or None if only saved to `path`.
+        @param path: Cell image file, or None for purely in-memory cells.
+        """
+        self.page = page
+        self.row = row
+        self.col = col
+        self.bbox = bbox
+        self.image = image
+        self.path = path
+
+    def pixels(self):
+        """The cell's pixels as an array, read from `path` (memory-mapped for .npy cells) if they are not in memory."""
+        if self.image is not None:
+            return self.image
+        return image_store.load_image(self.path)
+
+    @property
+    def label(self):
+        """Human-readable name used in place of a filename in reports."""
+        return f"page {self.page} row {self.row} col {self.col}"
+
+    def __repr__(self):
+        return f"Cell(page={self.page}, row={self.row}, col={self.col}, bbox={self.bbox}, path={self.path!r})"
+
+def cellularize_Page_colrow(ImageLocation: str, colAr: list, rowAr: list, page_num, store=None):
     """
     Splits an image into cells based on provided column and row boundaries.
 
     This function takes an image from a specified location and divides it into smaller
     cells according to the specified pixel boundaries in `colAr` and `rowAr`.
-    The cells are saved as PNG files in the designated output folder.
+    The cells are saved in the designated output folder with an image_store store.
 
     @param ImageLocation: A string representing the path to the input image.
     @param colAr: A list of pairs representing the column boundaries in pixel coordinates.
                   Each pair defines the start and end of a column (e.g., [[colStart1, colEnd1], [colStart2, colEnd2], ...]).
     @param rowAr: A list of pairs representing the row boundaries in pixel coordinates.
                   Each pair defines the start and end of a row (e.g., [[rowStart1, rowEnd1], [rowStart2, rowEnd2], ...]).
+    @param store: image_store store name ("npy", "png-fast", "png"); default image_store.DEFAULT_STORE.
 
-    @return A list of strings, each representing the file path to a saved cell image.
+    @return A list of Cell records, each holding the file path to a saved cell image.
 
     Example:
     --------
@@ -28,36 +75,32 @@ def cellularize_Page_colrow(ImageLocation: str, colAr: list, rowAr: list, page_n
     Notes:
     - The top-left pixel of the input image is considered as [0, 0].
     - Each unit in the boundary arrays corresponds to a pixel in the image.
-    - Cells are saved in the `OutputLocation` directory as PNG files.
+    - Cells are saved in the `OutputLocation` directory (PNG by default); the returned records
+      carry their row and column, so the file names are never parsed.
 
     Exceptions:
     -----------
     - If the output directory already exists, a message is printed to the console.
     """
-def cellularize_Page_colrow(ImageLocation: str, colAr: list, rowAr: list, page_num):
+def cellularize_Page_colrow(ImageLocation: str, colAr: list, rowAr: list, page_num, store=None):
     """ Splits an image into cells based on provided column and row boundaries, including page number. """
-    page = Image.open(ImageLocation)
+    page = load_page_array(ImageLocation)
+    store = image_store.get_store(store)
     try:
         os.mkdir(OutputLocation)
     except:
         print(f"{OutputLocation} folder already exists!")
     
+    # Prefix keeps cells of different documents with the same page number apart in OutputLocation
     pageID = get_random_string(7) 
-    count = 0
-    colcount = 0
-    rowcount = 0
     locationlist = []
     # Process columns and rows, and name files including the page number
-    for col in colAr:
-        colcount = 0
-        for row in rowAr:
-            cell = page.crop((col[0], row[0], col[1], row[1]))
-            filename = f"page_{page_num}_{colcount}_{rowcount}.png"
-            fullPath = os.path.join(OutputLocation, filename)
-            cell.save(fullPath)
-            locationlist.append(fullPath)
-            colcount += 1
-        rowcount += 1
+    for colcount, col in enumerate(colAr):
+        for rowcount, row in enumerate(rowAr):
+            bbox = (col[0], row[0], col[1], row[1])
+            fullPath = store.path_for(os.path.join(OutputLocation, f"{pageID}_page_{page_num}_{rowcount}_{colcount}"))
+            store.save(page[bbox[1]:bbox[3], bbox[0]:bbox[2]], fullPath)
+            locationlist.append(Cell(page_num, rowcount, colcount, bbox, path=fullPath))
     return locationlist
 
     
@@ -66,3 +109,52 @@ def get_random_string(length):
     letters = string.ascii_lowercase
     result_str = ''.join(random.choice(letters) for i in range(length))
     return result_str
+
+
+def load_page_array(page):
+    """
+    Returns a page as a NumPy array, decoding it at most once.
+
+    @param page: A path to an image file, a PIL Image or an existing NumPy array.
+    @return: An (H, W) or (H, W, C) uint8 array. Arrays are returned unchanged,
+             grayscale files stay single-channel and .npy pages are memory-mapped
+             read-only (see image_store.load_image).
+    """
+    if isinstance(page, np.ndarray):
+        return page
+    if isinstance(page, Image.Image):
+        return np.asarray(page)
+    return image_store.load_image(page)
+
+
+def iter_cells(page, colAr: list, rowAr: list, page_num=0, dump_dir=None, min_size=1):
+    """
+    Yields the cells of a page as zero-copy views, without writing anything to disk.
+
+    Uses the same column/row boundary pairs as `cellularize_Page_colrow`, and the
+    same row/column numbering (row = index into rowAr, col = index into colAr).
+
+    @param page: Page image as a path, PIL Image or NumPy array.
+    @param colAr: List of [colStart, colEnd] pixel pairs.
+    @param rowAr: List of [rowStart, rowEnd] pixel pairs.
+    @param page_num: Page number stored on every yielded Cell.
+    @param dump_dir: Debug only - if set, each cell is also saved there as
+                     page_{page_num}_{row}_{col}.png.
+    @param min_size: Cells narrower or shorter than this many pixels are skipped.
+    @return: Generator of Cell records, columns outermost as in cellularize_Page_colrow.
+    """
+    pixels = load_page_array(page)
+    height, width = pixels.shape[:2]
+    if dump_dir:
+        os.makedirs(dump_dir, exist_ok=True)
+
+    for colcount, col in enumerate(colAr):
+        left, right = max(0, int(col[0])), min(width, int(col[1]))
+        for rowcount, row in enumerate(rowAr):
+            upper, lower = max(0, int(row[0])), min(height, int(row[1]))
+            if right - left < min_size or lower - upper < min_size:
+                continue
+            cell = Cell(page_num, rowcount, colcount, (left, upper, right, lower), image=pixels[upper:lower, left:right])
+            if dump_dir:
+                Image.fromarray(cell.image).save(os.path.join(dump_dir, f"page_{page_num}_{rowcount}_{colcount}.png"))
+            yield cell
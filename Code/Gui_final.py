@@ -8,8 +8,10 @@ import mimetypes
 import threading
 import time
 import signal
+import multiprocessing
 import smtplib
 import pickle
+import gc
 import shutil
 import csv
 import traceback
@@ -32,15 +34,30 @@ from PyQt5.QtWidgets import (
     QMenuBar, QMenu, QToolBar, QLabel, QComboBox, QProgressBar, QStatusBar, QTreeWidget, QTreeWidgetItem,
     QPushButton, QMessageBox, QGraphicsPixmapItem, QTableWidget, QTableWidgetItem, QGraphicsObject,
     QDockWidget, QListWidget, QTabWidget, QInputDialog, QWidgetAction, QActionGroup, QTextBrowser, QLineEdit,
-    QDialog, QUndoCommand, QGraphicsItem, QHeaderView
+    QDialog, QUndoCommand, QGraphicsItem, QHeaderView, QTableView
 )
-from PyQt5.QtGui import QPixmap, QImage, QPen, QColor, QPainter, QFont, QDragEnterEvent, QDropEvent, QCursor, QIcon
-from PyQt5.QtCore import Qt, QRectF, QObject, pyqtSignal, QLineF, QThread, QPointF, QSizeF
+from PyQt5.QtGui import QPixmap, QImage, QPen, QColor, QPainter, QFont, QDragEnterEvent, QDropEvent, QCursor, QIcon, QTransform
+from PyQt5.QtCore import Qt, QRectF, QObject, pyqtSignal, QLineF, QThread, QPointF, QSizeF, QAbstractTableModel, QModelIndex, QTimer
 #from pdf2image import convert_from_path
 from PIL import Image
 from logging.handlers import RotatingFileHandler
 
 import RunThroughTest as ocr_module
+import parallel_ocr
+import parallel_render
+import image_store
+import image_bridge
+import engine_server
+import page_ocr
+import pdf_to_image
+from ocr_cache import OCRCache, CACHE_FILENAME
+from blank_cells import BlankCellDetector
+from pdf_to_image import PDFPageProvider
+from table_grid import line_intersections
+from result_store import ResultStore, LOW_CONFIDENCE_THRESHOLD
+from tiled_image import ImagePyramid, level_for_scale
+from background_detection import BackgroundTableDetector
+from pipeline import Pipeline, format_metrics
 
 class ExcludeMainLoggerFilter(logging.Filter):
     def filter(self, record):
@@ -308,6 +325,111 @@ class RectItem(QGraphicsObject):
             return new_pos  # Allow the position change
         return super().itemChange(change, value)
 
+class TiledImageItem(QGraphicsObject):
+    """
+    Draws a full-resolution page from an image pyramid: only the tiles intersecting the
+    exposed area, at the level matching the view's zoom, so zooming and panning never
+    scale one huge pixmap.
+
+    The item lies over the page's preview pixmap in page-pixel coordinates. Nothing is
+    built while the preview is sharp enough; once the zoom needs a finer level, the
+    levels up to it are built from the full-resolution pixels in a background thread.
+    Until then the closest built level is drawn, and the preview shows through while
+    none is. Tile pixmaps are cached by (tile, level).
+
+    Example:
+    --------
+    item = TiledImageItem(width, height, lambda: load_page_pixels(0), base_scale=0.24)
+    scene.addItem(item)   # levels are built when a zoom first needs them
+    item.stop()           # before the item is removed from the scene
+    """
+    levelReady = pyqtSignal(float)
+    logger = logging.getLogger(__name__)
+
+    # Memory budget of the tile pixmaps of one page
+    TILE_CACHE_BYTES = 128 * 1024 * 1024
+
+    def __init__(self, width, height, load_pixels, base_scale=0.0, parent=None):
+        """
+        @param width: Width of the full-resolution page.
+        @param height: Height of the full-resolution page.
+        @param load_pixels: Function returning the full-resolution pixels as a uint8 array;
+                            called in the background thread, only once a zoom needs a level.
+        @param base_scale: Scale of the preview pixmap under the item; coarser levels are not built.
+        """
+        super().__init__(parent)
+        self.pyramid = ImagePyramid(width, height)
+        self.base_scale = base_scale
+        self._load_pixels = load_pixels
+        self._tiles = image_bridge.PixmapCache(max_bytes=self.TILE_CACHE_BYTES)
+        self._cancel_event = threading.Event()
+        self._thread = None
+        # Finest level asked for by paint; the background thread builds up to it
+        self._requested = base_scale
+        self._request_lock = threading.Lock()
+        # Exposed rectangles are needed to draw only the visible tiles
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
+        self.setAcceptedMouseButtons(Qt.NoButton)
+        self.levelReady.connect(self._on_level_ready)
+
+    def boundingRect(self):
+        return QRectF(0, 0, self.pyramid.width, self.pyramid.height)
+
+    def request(self, scale):
+        """Builds the levels finer than the preview, up to scale, in a background thread."""
+        with self._request_lock:
+            if scale <= self._requested or self._cancel_event.is_set():
+                return
+            self._requested = scale
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._build, name="page-tiles", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """Stops building levels; a level being built is finished but not shown."""
+        self._cancel_event.set()
+
+    def _build(self):
+        while not self._cancel_event.is_set():
+            with self._request_lock:
+                requested = self._requested
+                scales = [scale for scale in self.pyramid.scales if self.base_scale < scale <= requested and not self.pyramid.has_level(scale)]
+                if not scales:
+                    self._thread = None
+                    return
+            try:
+                self.pyramid.build(self._load_pixels, scales, cancel_event=self._cancel_event, on_level=self._level_built)
+            except Exception as e:
+                # The preview is still shown
+                self.logger.warning(f"Building page tiles failed: {e}")
+                return
+
+    def _level_built(self, scale):
+        if not self._cancel_event.is_set():
+            # Queued to the GUI thread, which repaints with the new level
+            self.levelReady.emit(scale)
+
+    def _on_level_ready(self, scale):
+        self.update()
+
+    def paint(self, painter, option, widget=None):
+        view_scale = option.levelOfDetailFromTransform(painter.worldTransform())
+        wanted = level_for_scale(view_scale, self.pyramid.scales)
+        if wanted <= self.base_scale:
+            return
+        self.request(wanted)
+        built = [scale for scale in self.pyramid.built_levels() if scale > self.base_scale]
+        if not built:
+            return
+        finer = [scale for scale in built if scale >= wanted]
+        scale = min(finer) if finer else max(built)
+
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        exposed = option.exposedRect
+        for col, row in self.pyramid.tiles_in_rect(scale, exposed.x(), exposed.y(), exposed.width(), exposed.height()):
+            pixmap = self._tiles.get_or_create((col, row), scale, lambda: image_bridge.to_qpixmap(self.pyramid.tile(scale, col, row)))
+            painter.drawPixmap(QRectF(*self.pyramid.tile_rect(scale, col, row)), pixmap, QRectF(pixmap.rect()))
+
 class Action:
     """Base class for actions that can be undone/redone."""
     def undo(self):
@@ -514,13 +636,96 @@ class PageSelectionDialog(QDialog):
     def get_selected_pages(self):
         return self.input_field.text()
 
+class OCRResultsModel(QAbstractTableModel):
+    """
+    Read-only table model over a result_store.ResultStore.
+
+    The view only asks for the cells it shows, so no item is created per cell and the
+    low-confidence highlight is worked out when a cell is painted. Sorting and filtering
+    replace the array of store rows the model shows; the results are never copied.
+
+    Example:
+    --------
+    model = OCRResultsModel(ResultStore.from_results(results))
+    view = QTableView()
+    view.setModel(model)
+    view.setSortingEnabled(True)   # header clicks call model.sort
+    model.set_filter("wien")
+    """
+    LOW_CONFIDENCE_COLOR = QColor(255, 0, 0, 100)  # Semi-transparent red
+
+    def __init__(self, store, header_row=True, low_confidence_threshold=LOW_CONFIDENCE_THRESHOLD, parent=None):
+        """
+        @param store: The ResultStore to show.
+        @param header_row: Use the first row of the table as column headers.
+        @param low_confidence_threshold: Cells with a known confidence below this are highlighted.
+        """
+        super().__init__(parent)
+        self.store = store
+        self.header_row = header_row and store.shape[0] > 0
+        self.low_confidence_threshold = low_confidence_threshold
+        self._all_rows = np.arange(1 if self.header_row else 0, store.shape[0])
+        self._rows = self._all_rows
+        self._sort_column, self._sort_order = -1, Qt.AscendingOrder
+        self._filter_text = ''
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.store.shape[1]
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, col = int(self._rows[index.row()]), index.column()
+        if role == Qt.DisplayRole:
+            return self.store.text(row, col)
+        if role == Qt.BackgroundRole:
+            if self.store.is_low_confidence(row, col, self.low_confidence_threshold):
+                return self.LOW_CONFIDENCE_COLOR
+        elif role == Qt.ToolTipRole:
+            confidence = self.store.confidence(row, col)
+            if confidence < self.low_confidence_threshold:
+                return f"Low confidence ({confidence:.2f})"
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            header = self.store.text(0, section) if self.header_row else ''
+            return header or f"Column {section + 1}"
+        # Rows keep their table row number when sorted or filtered
+        return str(int(self._rows[section]) + 1)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Orders the rows by a column (column -1 restores the table order)."""
+        self.layoutAboutToBeChanged.emit()
+        self._sort_column, self._sort_order = column, order
+        self._rows = self._ordered(self._rows)
+        self.layoutChanged.emit()
+
+    def set_filter(self, text):
+        """Shows only rows with a cell containing `text` (case-insensitive); '' shows every row."""
+        self.beginResetModel()
+        self._filter_text = text
+        self._rows = self._ordered(self.store.filter_rows(text, rows=self._all_rows))
+        self.endResetModel()
+
+    def _ordered(self, rows):
+        if self._sort_column < 0 or self._sort_column >= self.store.shape[1]:
+            return np.sort(rows)
+        return self.store.sort_order(self._sort_column, self._sort_order == Qt.DescendingOrder, rows)
+
 class OCRWorker(QThread):
     ocr_progress = pyqtSignal(int, int)
     ocr_time_estimate = pyqtSignal(float)
     ocr_completed = pyqtSignal(object)
     ocr_error = pyqtSignal(str)
+    ocr_pipeline_stats = pyqtSignal(object)  # Pipeline.metrics() after each page
 
-    def __init__(self, pdf_file, storedir, output_csv, ocr_cancel_event, ocr_engine, easyocr_engine, user_lines=None, image_list=None):
+    def __init__(self, pdf_file, storedir, output_csv, ocr_cancel_event, ocr_engine, easyocr_engine, user_lines=None, image_list=None, cell_dump_dir=None, ocr_workers=1, rec_batch_size=None, cache_path=None, page_renderer=None, detect_workers=2, shared_engines=False, adaptive_cascade=False, skip_blank=True, ocr_strategy='cells', detected_tables=None, ocr_executor=None):
         super().__init__()
         self.pdf_file = pdf_file
         self.storedir = storedir
@@ -530,6 +735,22 @@ class OCRWorker(QThread):
         self.easyocr_engine = easyocr_engine
         self.user_lines = user_lines if user_lines else {}
         self.image_list = image_list  # List of images to process
+        self.cell_dump_dir = cell_dump_dir  # Debug only: also write cell PNGs here
+        self.ocr_workers = ocr_workers  # 1 = OCR in this thread with the GUI's engines
+        self.rec_batch_size = rec_batch_size  # None = full PaddleOCR pipeline per cell
+        self.cache_path = cache_path  # OCR result cache database, None = no caching
+        self.page_renderer = page_renderer  # Called with a page path to write the page image if needed
+        self.detect_workers = detect_workers  # Table detection threads in the pipeline
+        self.shared_engines = shared_engines  # Worker processes use the engine server's models
+        self.ocr_executor = ocr_executor  # ParallelOCRExecutor kept by the window; None = start one for this run
+        # Decides when EasyOCR runs after PaddleOCR; learns per-column thresholds if adaptive
+        self.policy = ocr_module.make_cascade_policy(learn=adaptive_cascade)
+        # Empty cells skip OCR; tuned on the first page of this document
+        self.blank_detector = BlankCellDetector() if skip_blank else None
+        # 'cells': OCR every cropped cell; 'page': OCR the whole page once and assign words to cells
+        self.ocr_strategy = ocr_strategy
+        # {image path: table} already found by the GUI's background detection
+        self.detected_tables = detected_tables or {}
         self.logger = logging.getLogger(self.__class__.__name__)
         self.cell_times = deque(maxlen=20)
 
@@ -550,90 +771,113 @@ class OCRWorker(QThread):
             image_list = self.image_list
             if self.ocr_cancel_event.is_set():
                 self.emit_cancellation()
+                return
     
-            # Detect tables in images
-            self.logger.info("Detecting tables in images.")
-            auto_TableMap = ocr_module.detect_tables_in_images(image_list)
-            if self.ocr_cancel_event.is_set():
-                self.emit_cancellation()
-    
-            # Ensure auto_TableMap is a list with correct length
-            if isinstance(auto_TableMap, dict):
-                auto_TableMap = [auto_TableMap.get(image, [[], []]) for image in image_list]
-            elif not (isinstance(auto_TableMap, list) and len(auto_TableMap) == len(image_list)):
-                raise ValueError("Mismatch between number of images and detected table maps.")
-    
-            # Merge user-added lines
-            self.logger.info("Incorporating user-added lines into table detection.")
-            combined_TableMap = self._merge_user_lines(auto_TableMap, image_list)
-    
-            if self.ocr_cancel_event.is_set():
-                self.emit_cancellation()
-    
-            # Validate combined_TableMap
-            for idx, (columns, rows) in enumerate(combined_TableMap):
-                if not (isinstance(columns, list) and isinstance(rows, list)):
-                    raise ValueError(f"Invalid table structure for image {image_list[idx]} at index {idx}.")
-                if len(columns) < 2 or len(rows) < 2:
-                    raise ValueError(f"Insufficient number of columns or rows for image {image_list[idx]} at index {idx}.")
+            # Page loading and table detection/cellularization run on pipeline threads,
+            # so later pages are prepared while earlier pages are being OCR'd
+            pipeline = Pipeline(queue_size=2)
+            pipeline.add_stage("render", self._load_page)
+            pipeline.add_stage("detect", self._detect_page_cells, workers=self.detect_workers)
     
-            # Cellularize images
-            self.logger.info("Cellularizing images based on combined table detection.")
-            locationlists = ocr_module.cellularize_images(image_list, combined_TableMap)
-            if self.ocr_cancel_event.is_set():
-                self.emit_cancellation()
+            # The cache's SQLite connection must be opened in this thread
+            cache = None
+            if self.cache_path:
+                cache = OCRCache(self.cache_path, fingerprint=ocr_module.ocr_fingerprint(self.rec_batch_size, self.policy))
+                self.logger.info(f"Using OCR result cache {self.cache_path} ({len(cache)} entries).")
     
-            # Flatten the list of image filenames
-            all_filenames = [filename for collection in locationlists for filename in collection]
-            total_images = len(all_filenames)
-            self.logger.info(f"Total cell images to process: {total_images}")
+            executor = None
+            owns_executor = False
+            if self.ocr_workers > 1 and self.ocr_strategy != 'page':
+                executor = self.ocr_executor
+                if executor is None:
+                    # Each worker process loads its own engines once
+                    self.logger.info(f"Starting OCR processing on {self.ocr_workers} worker processes.")
+                    executor = parallel_ocr.ParallelOCRExecutor(max_workers=self.ocr_workers, use_gpu=paddle.device.is_compiled_with_cuda(), batch_size=self.rec_batch_size, shared_engines=self.shared_engines, policy=self.policy)
+                    owns_executor = True
+                else:
+                    self.logger.info(f"OCR processing on {executor.max_workers} running worker processes.")
+                    executor.set_policy(self.policy)
     
-            if not all_filenames:
-                raise ValueError("No cell images found for OCR processing.")
+            # Start timing
+            ocr_start_time = time.time()
+            results = []
+            page_timings = []
+            pages_done = cells_seen = cells_done = 0
+            progress_emitted = 0
     
-            # Initialize cumulative time
-            self.cumulative_time = 0
+            stream = pipeline.run(enumerate(image_list))
+            try:
+                for page_index, page, table, cells in stream:
+                    if self.ocr_cancel_event.is_set():
+                        self.emit_cancellation()
+                        return
+                    pages_done += 1
+                    cells_seen += len(cells)
+                    # Cell counts of pages still in the pipeline are estimated from the pages seen so far
+                    estimated_total = max(cells_seen, round(cells_seen / pages_done * len(image_list)))
+                    self.logger.info(f"OCR on page {page_index + 1}: {len(cells)} cells.")
     
-            # Define progress callback function
-            def progress_callback(idx, total_images, remaining_time):
-                if self.ocr_cancel_event.is_set():
-                    self.emit_cancellation()
-                # Emit progress and remaining time less frequently
-                if idx % 10 == 0 or idx == total_images:
-                    self.ocr_progress.emit(idx, total_images)
-                    self.ocr_time_estimate.emit(remaining_time)
+                    def progress_callback(idx, total_images, remaining_time):
+                        nonlocal progress_emitted
+                        done = cells_done + idx
+                        # Emit progress and remaining time less frequently
+                        if done - progress_emitted < 10 and idx != total_images:
+                            return
+                        progress_emitted = done
+                        self.ocr_progress.emit(done, estimated_total)
+                        self.ocr_time_estimate.emit((estimated_total - done) * (time.time() - ocr_start_time) / done)
     
-            # OCR Processing using process_all_images
-            self.logger.info("Starting OCR processing on cell images.")
+                    page_start = time.time()
+                    with pipeline.measure("ocr"):
+                        if self.ocr_strategy == 'page':
+                            results.extend(self._run_page_ocr(page_index, page, table, len(cells), progress_callback))
+                        else:
+                            results.extend(self._run_ocr(cells, progress_callback, cache, executor))
+                    page_seconds = time.time() - page_start
+                    page_timings.append({'page': page_index + 1, 'strategy': self.ocr_strategy, 'cells': len(cells), 'seconds': round(page_seconds, 3)})
+                    self.logger.info(f"Page {page_index + 1}: {self.ocr_strategy} OCR took {page_seconds:.2f} seconds for {len(cells)} cells.")
+                    cells_done += len(cells)
+                    self.ocr_pipeline_stats.emit(pipeline.metrics())
+            finally:
+                stream.close()
+                if owns_executor:
+                    executor.shutdown()
+                if cache is not None:
+                    cache.close()
     
-            # Start timing
-            ocr_start_time = time.time()
+            if self.ocr_cancel_event.is_set():
+                self.emit_cancellation()
+                return
+            if not cells_done:
+                raise ValueError("No cells found for OCR processing.")
     
-            results = ocr_module.process_all_images(
-                all_filenames,
-                self.ocr_engine,
-                self.easyocr_engine,
-                progress_callback=progress_callback
-            )
+            stats = cache.stats() if cache is not None else {}
+            stats['pipeline'] = pipeline.metrics()
+            stats['cascade'] = self.policy.stats()
+            stats['page_timings'] = page_timings
+            self.logger.info(f"Pipeline stages: {format_metrics(stats['pipeline'])}")
+            self.logger.info(f"Fallback cascade: {ocr_module.format_cascade_stats(stats['cascade'])}")
     
             # End timing
             ocr_end_time = time.time()
             self.logger.info(f"OCR processing completed in {ocr_end_time - ocr_start_time:.2f} seconds.")
-    
-            if self.ocr_cancel_event.is_set():
-                self.emit_cancellation()
+            if cache is not None:
+                self.logger.info(f"OCR cache hits: {stats['cache_hits']}, misses: {stats['cache_misses']}.")
     
             # Process OCR results
             self.logger.info("Processing OCR results.")
-            table_data, total, bad, easyocr_count, paddleocr_count, low_confidence_results = ocr_module.process_results(results)
+            table_data, total, bad, easyocr_count, paddleocr_count, blank_count, low_confidence_results = ocr_module.process_results(results)
+            stats['blank_skipped'] = blank_count
+            # Columnar copy of the results (with confidences) for the table view
+            stats['result_store'] = ResultStore.from_results(results)
     
             # Write to CSV
             self.logger.info(f"Writing OCR results to CSV: {self.output_csv}")
             ocr_module.write_results_to_csv(table_data, self.output_csv)
             processing_time = time.time() - start_time
     
-            # Emit completion signal with the results and processing time
-            self.ocr_completed.emit((table_data, total, bad, easyocr_count, paddleocr_count, low_confidence_results, processing_time))
+            # Emit completion signal with the results, processing time and extra statistics
+            self.ocr_completed.emit((table_data, total, bad, easyocr_count, paddleocr_count, low_confidence_results, processing_time, stats))
     
             self.logger.info("OCR process completed successfully.")
             self.logger.info(f"Total OCR processing time: {processing_time:.2f} seconds.")
@@ -642,6 +886,62 @@ class OCRWorker(QThread):
             self.logger.error(f"OCR process failed: {e}", exc_info=True)
             self.ocr_error.emit(f"Critical error: {e}")
     
+    def _load_page(self, item):
+        """Pipeline stage: renders the page file if needed and decodes it."""
+        page_index, image_path = item
+        if self.page_renderer is not None:
+            self.page_renderer(image_path)
+        return page_index, image_path, ocr_module.load_page_array(image_path)
+
+    def _detect_page_cells(self, item):
+        """Pipeline stage: detects the table on one page, merges the user's lines and cuts it into in-memory cells."""
+        page_index, image_path, page = item
+        auto_map = self.detected_tables.get(image_path)
+        if auto_map is None:
+            auto_map = ocr_module.detect_tables_in_images([page])[0]
+        columns, rows = self._merge_user_lines([auto_map], [image_path])[0]
+        if len(columns) < 2 or len(rows) < 2:
+            raise ValueError(f"Insufficient number of columns or rows for image {image_path} at index {page_index}.")
+        table = [columns, rows]
+        # Cell PNGs are only written in debug mode
+        return page_index, page, table, list(ocr_module.iter_image_cells([page], [table], page_num=page_index, dump_dir=self.cell_dump_dir))
+
+    def _run_page_ocr(self, page_index, page, table, cell_count, progress_callback):
+        """
+        Whole-page strategy: PaddleOCR runs once over the page (tiled) and the words are assigned
+        to the table's cells; cells it is not confident about still go through the EasyOCR fallback.
+        """
+        def refine(row, col, pixels, label, paddle_result):
+            return ocr_module.select_best_result(row, col, ocr_module.cell_to_rgb(pixels), label, paddle_result, self.easyocr_engine, self.policy)
+
+        # Table[0] holds the row boundaries, Table[1] the column boundaries
+        results = page_ocr.ocr_page_cells(page, table[0], table[1], self.ocr_engine, page_index, refine=refine)
+        progress_callback(cell_count, cell_count, 0)
+        return results
+
+    def _run_ocr(self, cells, progress_callback, cache=None, executor=None):
+        """OCRs the cells of one page in this thread, or on the worker processes of executor."""
+        if executor is not None:
+            return executor.process_all(
+                cells,
+                progress_callback=progress_callback,
+                cancel_event=self.ocr_cancel_event,
+                cache=cache,
+                blank_detector=self.blank_detector
+            )
+
+        return ocr_module.process_all_images(
+            cells,
+            self.ocr_engine,
+            self.easyocr_engine,
+            progress_callback=progress_callback,
+            cancel_event=self.ocr_cancel_event,
+            batch_size=self.rec_batch_size,
+            cache=cache,
+            policy=self.policy,
+            blank_detector=self.blank_detector
+        )
+    
 
     def _merge_user_lines(self, auto_TableMap, image_list):
         combined_TableMap = []
@@ -719,6 +1019,50 @@ class OCRWorker(QThread):
         self.ocr_error.emit("OCR process was cancelled by the user.")
         self.quit()
 
+class EngineLoader(QObject):
+    """
+    Loads the OCR engines (locally or on the shared engine server) on a background thread
+    and warms them up with a dummy inference, so the window stays responsive and the first
+    OCR run starts at full speed. The thread is a daemon: loading cannot be interrupted,
+    and closing the window must not wait for it.
+
+    Example:
+    --------
+    loader = EngineLoader(use_gpu=False, rec_batch_num=6, shared=False)
+    loader.engines_ready.connect(on_ready)    # (paddle_engine, easyocr_reader, seconds)
+    loader.engines_failed.connect(on_failed)  # (message)
+    loader.start()
+    """
+    engines_ready = pyqtSignal(object, object, float)
+    engines_failed = pyqtSignal(str)
+
+    def __init__(self, use_gpu, rec_batch_num, shared):
+        super().__init__()
+        # The settings the engines are built with, see OCRApp.engine_settings
+        self.settings = (use_gpu, rec_batch_num, shared)
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name="ocr-engine-loader", daemon=True)
+        self._thread.start()
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def run(self):
+        use_gpu, rec_batch_num, shared = self.settings
+        try:
+            start = time.time()
+            self.logger.info("Loading PaddleOCR and EasyOCR engines" + (" on the engine server." if shared else "."))
+            ocr_engine, easyocr_engine = engine_server.get_engines(use_gpu, rec_batch_num=rec_batch_num, shared=shared)
+            warm_up_seconds = engine_server.warm_up(ocr_engine, easyocr_engine)
+            self.logger.info(f"OCR engines loaded in {time.time() - start:.1f}s, warm-up inference took {warm_up_seconds:.1f}s.")
+            self.engines_ready.emit(ocr_engine, easyocr_engine, time.time() - start)
+        except Exception as e:
+            self.logger.error(f"Failed to initialize OCR engines: {e}", exc_info=True)
+            self.engines_failed.emit(str(e))
+
 class PDFGraphicsView(QGraphicsView):
     rectangleSelected = pyqtSignal(QRectF)
     lineModified = pyqtSignal()
@@ -738,6 +1082,7 @@ class PDFGraphicsView(QGraphicsView):
         self.cropped_areas = []
         self.pdf_images = []  # Store PDF pages as QImages
         self.current_page_index = 0  # Track the current page
+        self._tile_item = None  # TiledImageItem drawing the page at the zoom's resolution, see load_image
         self.setRenderHint(QPainter.Antialiasing)
         self.setMouseTracking(True)
         self.setDragMode(QGraphicsView.ScrollHandDrag)
@@ -853,7 +1198,7 @@ class PDFGraphicsView(QGraphicsView):
 
             # Get the boundaries of the image
             if hasattr(self, '_pixmap_item') and self._pixmap_item:
-                pixmap_rect = self._pixmap_item.pixmap().rect()
+                pixmap_rect = self._pixmap_item.sceneBoundingRect()
             else:
                 pixmap_rect = self.sceneRect()
 
@@ -967,8 +1312,9 @@ class PDFGraphicsView(QGraphicsView):
             if not image_filename:
                 self.logger.error("Image filename is empty. Cannot save user lines.")
                 return
-            if not os.path.exists(os.path.join(self.image_file_paths[self.current_page_index])):
-                self.logger.error(f"Image file does not exist: {self.image_file_paths[self.current_page_index]}")
+            # Pages of lazily rendered PDFs are only written to disk when detection or OCR needs them
+            if image_filename not in self.image_file_paths and not os.path.exists(image_filename):
+                self.logger.error(f"Image file does not exist: {image_filename}")
                 return
             self.lines[image_filename] = lines
             self.logger.info(f"Lines saved for {image_filename} with orientations.")
@@ -1078,10 +1424,20 @@ class PDFGraphicsView(QGraphicsView):
             if main_window:
                 main_window.show_error_message(f"Failed to remove rectangle: {e}")
 
-    def load_image(self, image, filename=None):
-        """Load and display the given image in the graphics view."""
+    def load_image(self, image, filename=None, display_size=None, full_image=None):
+        """
+        Load and display the given image in the graphics view.
+
+        If display_size (width, height) is given, the image is a preview and is scaled
+        to that size, so scene coordinates stay in full-resolution page pixels.
+        If full_image (a function returning the full-resolution pixels) is also given,
+        a TiledImageItem over the preview draws the page at the resolution the zoom needs.
+        """
         try:
             # Clear existing scene items
+            if self._tile_item is not None:
+                self._tile_item.stop()
+                self._tile_item = None
             self.scene().clear()
             self._rect_items = []
             self._line_items = []
@@ -1099,7 +1455,13 @@ class PDFGraphicsView(QGraphicsView):
 
             # Add pixmap to the scene
             self._pixmap_item = self.scene().addPixmap(pixmap)
-            self.scene().setSceneRect(self._pixmap_item.boundingRect())
+            if display_size and (pixmap.width(), pixmap.height()) != tuple(display_size):
+                self._pixmap_item.setTransformationMode(Qt.SmoothTransformation)
+                self._pixmap_item.setTransform(QTransform.fromScale(display_size[0] / pixmap.width(), display_size[1] / pixmap.height()))
+                if full_image is not None:
+                    self._tile_item = TiledImageItem(display_size[0], display_size[1], full_image, base_scale=pixmap.width() / display_size[0])
+                    self.scene().addItem(self._tile_item)
+            self.scene().setSceneRect(self._pixmap_item.sceneBoundingRect())
             self.fitInView(self._pixmap_item, Qt.KeepAspectRatio)
             self._image_loaded = True
 
@@ -1500,10 +1862,16 @@ class OCRApp(QMainWindow):
     ocr_progress = pyqtSignal(int, int)
     ocr_error = pyqtSignal(str)
     croppedImageCreated = pyqtSignal(int, int, str)
+    # Results of the background table detection, emitted from its worker threads
+    tableDetected = pyqtSignal(int, object)
+    tableDetectionFailed = pyqtSignal(int, str)
     SUPPORTED_IMAGE_FORMATS = {'.png', '.jpg', '.jpeg'}
     SUPPORTED_PDF_FORMATS = {'.pdf'}
     logger = logging.getLogger(__name__)
 
+    # Images with a longer side are displayed from a downscaled preview, see page_pixmap
+    PREVIEW_SIDE = 2048
+
     def __init__(self):
         super().__init__()
 
@@ -1518,15 +1886,39 @@ class OCRApp(QMainWindow):
         self.ocr_cancel_event = threading.Event()
         self.recent_files = []
         self.ocr_initialized = False
+        # OCR worker processes; each loads its own copy of the OCR models, so more is opt-in
+        self.ocr_workers = 1
+        self.rec_batch_size = None  # Batched recognition off by default
+        self.adaptive_cascade = False  # Opt-in: learn per column when the EasyOCR fallback can be skipped
+        self.skip_blank_cells = True  # Don't OCR cells the blank-cell detector finds empty
+        self.ocr_strategy = 'cells'  # 'cells' or 'page', see OCRWorker
+        self.image_store_name = image_store.DEFAULT_STORE  # Format of page images in new projects
+        self.page_store = self.image_store_name  # Format of the open project's page images
+        self.use_engine_server = os.environ.get('OCR_ENGINE_SERVER', '') not in ('', '0')
+        # Worker processes kept between OCR runs, so their engines load once (see ocr_executor)
+        self._ocr_executor = None
+        self._ocr_executor_settings = None
         self.init_ui()
         self.last_csv_path = None  # Store the path of the last saved CSV
         self.project_folder = None  # Store the project folder path
         self.low_confidence_cells = []  # Store low-confidence OCR results
+        self.results_model = None  # OCRResultsModel of the 'Table View' tab
+        self.csv_table_widget = None  # Table shown in the 'CSV Output' tab by display_csv_as_table
         self.table_detection_method = 'Peaks and Troughs'  # Default method
         self.cropped_images = {}
         self.image_file_paths = []
         self.pil_images = []
         self.qimages = []
+        self.page_provider = None  # PDFPageProvider of the open PDF, renders pages on demand
+        self.tile_provider = None  # Second PDFPageProvider of the open PDF, for the display tiles
+        self.pixmap_cache = image_bridge.PixmapCache()  # Display pixmaps by (page, zoom), see page_pixmap
+        self.prerender_thread = None  # Renders all page files in the background, see start_page_prerender
+        self.prerender_cancel_event = threading.Event()
+        self.table_detector = None  # BackgroundTableDetector of the open document, see start_table_detection
+        self.detection_provider = None  # PDFPageProvider rendering pages for table detection
+        self.engine_loader = None  # EngineLoader loading the OCR engines in the background
+        self.pending_ocr_pages = None  # Pages of a Run OCR waiting for the engines; [] = all pages
+        self.requested_detections = set()  # Pages whose table the user asked for with Detect Tables
         self.setAcceptDrops(True)
         self.load_recent_files()
         self.current_page_index = 0
@@ -1540,6 +1932,8 @@ class OCRApp(QMainWindow):
         self.ocr_worker.ocr_error.connect(self.show_error_message)
         self.graphics_view.rectangleSelected.connect(self.on_rectangle_selected)
         self.graphics_view.lineModified.connect(self.on_line_modified)
+        self.tableDetected.connect(self.on_table_detected)
+        self.tableDetectionFailed.connect(self.on_table_detection_failed)
     
     def init_ui(self):
         splitter = QSplitter(Qt.Horizontal)
@@ -1562,6 +1956,9 @@ class OCRApp(QMainWindow):
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
         self.progress_bar = None
+        # Readiness of the OCR engines, see initialize_ocr_engines
+        self.engine_status_label = QLabel("OCR engines: not loaded", self)
+        self.status_bar.addPermanentWidget(self.engine_status_label)
 
         sys.stdout = EmittingStream(textWritten=self.normal_output_written)
         sys.stderr = EmittingStream(textWritten=self.error_output_written)
@@ -1691,6 +2088,65 @@ class OCRApp(QMainWindow):
         method_group.addAction(transitions_action)
         method_group.setExclusive(True)
 
+        # OCR Menu
+        ocr_menu = menu_bar.addMenu('OCR')
+        workers_menu = ocr_menu.addMenu('Worker Processes')
+        workers_group = QActionGroup(self)
+        workers_group.setExclusive(True)
+        for count in sorted({1, 2, 4, self.ocr_workers, parallel_ocr.physical_core_count()}):
+            workers_action = QAction(str(count), self)
+            workers_action.setCheckable(True)
+            workers_action.setChecked(count == self.ocr_workers)
+            workers_action.triggered.connect(lambda checked, c=count: self.set_ocr_workers(c))
+            workers_group.addAction(workers_action)
+            workers_menu.addAction(workers_action)
+
+        batched_recognition_action = QAction('Batched Recognition (skip detector on cells)', self)
+        batched_recognition_action.setCheckable(True)
+        batched_recognition_action.setChecked(False)
+        batched_recognition_action.triggered.connect(lambda checked: self.set_rec_batch_size(32 if checked else None))
+        ocr_menu.addAction(batched_recognition_action)
+
+        strategy_menu = ocr_menu.addMenu('OCR Strategy')
+        strategy_group = QActionGroup(self)
+        strategy_group.setExclusive(True)
+        for strategy, label in [('cells', 'Per Cell'), ('page', 'Whole Page (detect once, assign words to cells)')]:
+            strategy_action = QAction(label, self)
+            strategy_action.setCheckable(True)
+            strategy_action.setChecked(strategy == self.ocr_strategy)
+            strategy_action.triggered.connect(lambda checked, s=strategy: self.set_ocr_strategy(s))
+            strategy_group.addAction(strategy_action)
+            strategy_menu.addAction(strategy_action)
+
+        skip_blank_action = QAction('Skip Blank Cells', self)
+        skip_blank_action.setCheckable(True)
+        skip_blank_action.setChecked(self.skip_blank_cells)
+        skip_blank_action.triggered.connect(self.set_skip_blank_cells)
+        ocr_menu.addAction(skip_blank_action)
+
+        adaptive_cascade_action = QAction('Adaptive EasyOCR Fallback (skip where it never helps)', self)
+        adaptive_cascade_action.setCheckable(True)
+        adaptive_cascade_action.setChecked(self.adaptive_cascade)
+        adaptive_cascade_action.triggered.connect(self.set_adaptive_cascade)
+        ocr_menu.addAction(adaptive_cascade_action)
+
+        engine_server_action = QAction('Use Shared Engine Server', self)
+        engine_server_action.setCheckable(True)
+        engine_server_action.setChecked(self.use_engine_server)
+        engine_server_action.triggered.connect(self.set_use_engine_server)
+        ocr_menu.addAction(engine_server_action)
+
+        image_store_menu = ocr_menu.addMenu('Intermediate Image Format (new projects)')
+        image_store_group = QActionGroup(self)
+        image_store_group.setExclusive(True)
+        for name, label in [('npy', 'Raw (.npy, memory-mapped)'), ('png-fast', 'PNG, fast compression'), ('png', 'PNG')]:
+            image_store_action = QAction(label, self)
+            image_store_action.setCheckable(True)
+            image_store_action.setChecked(name == self.image_store_name)
+            image_store_action.triggered.connect(lambda checked, n=name: self.set_image_store(n))
+            image_store_group.addAction(image_store_action)
+            image_store_menu.addAction(image_store_action)
+
         # Help Menu
         help_menu = menu_bar.addMenu('Help')
 
@@ -1843,6 +2299,11 @@ class OCRApp(QMainWindow):
         # Add the remaining_time_label to the dock layout
         dock_layout.addWidget(self.remaining_time_label)
 
+        # Per-stage utilization and queue depth of the OCR pipeline
+        self.pipeline_stats_label = QLabel("", self)
+        self.pipeline_stats_label.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
+        dock_layout.addWidget(self.pipeline_stats_label)
+
         # Set the dock's central widget
         self.output_dock.setWidget(dock_widget)
 
@@ -1931,6 +2392,47 @@ class OCRApp(QMainWindow):
         self.remaining_time_label.setText(time_str)
         #self.logger.debug(f"Updated remaining_time_label: {time_str}")
 
+    def update_pipeline_stats_label(self, metrics):
+        self.pipeline_stats_label.setText(f"Pipeline: {format_metrics(metrics)}")
+
+    def set_ocr_workers(self, count):
+        self.ocr_workers = count
+        self.status_bar.showMessage(f'OCR worker processes set to: {count}', 5000)
+
+    def set_use_engine_server(self, enabled):
+        self.use_engine_server = enabled
+        # Engines are fetched again, locally or from the server
+        self.ocr_initialized = False
+        self.initialize_ocr_engines()
+        self.status_bar.showMessage(f"Shared OCR engine server {'enabled' if enabled else 'disabled'}", 5000)
+
+    def set_ocr_strategy(self, strategy):
+        self.ocr_strategy = strategy
+        label = 'whole page' if strategy == 'page' else 'per cell'
+        self.status_bar.showMessage(f'OCR strategy set to: {label}', 5000)
+
+    def set_image_store(self, name):
+        # Open projects keep the format their page images were written in
+        self.image_store_name = name
+        self.status_bar.showMessage(f'Page images of new projects will be stored as: {name}', 5000)
+
+    def set_skip_blank_cells(self, enabled):
+        self.skip_blank_cells = enabled
+        self.status_bar.showMessage(f"Blank cell skipping {'enabled' if enabled else 'disabled'}", 5000)
+
+    def set_adaptive_cascade(self, enabled):
+        self.adaptive_cascade = enabled
+        mode = 'adaptive per column' if enabled else f'always below {ocr_module.EASYOCR_FALLBACK_THRESHOLD} confidence'
+        self.status_bar.showMessage(f'EasyOCR fallback: {mode}', 5000)
+
+    def set_rec_batch_size(self, batch_size):
+        self.rec_batch_size = batch_size
+        # The recognizer's internal batch size is fixed when the engine is built
+        self.ocr_initialized = False
+        self.initialize_ocr_engines()
+        mode = f'batched ({batch_size} cells per batch)' if batch_size else 'per cell'
+        self.status_bar.showMessage(f'PaddleOCR recognition mode set to: {mode}', 5000)
+
     def set_table_detection_method(self, method_name):
         self.table_detection_method = method_name
         self.status_bar.showMessage(f'Table Detection Method set to: {method_name}', 5000)
@@ -1988,7 +2490,11 @@ class OCRApp(QMainWindow):
             self.update_recent_files_menu()
 
     def detect_tables(self):
-        """Detect tables in the currently selected page or cropped image."""
+        """
+        Shows the detected table of the currently selected page. Tables are detected in
+        the background (see start_table_detection): a page's cached table is shown at
+        once, otherwise the page is detected next and shown when its result arrives.
+        """
         try:
             current_item = self.project_list.currentItem()
             if not current_item:
@@ -1997,16 +2503,10 @@ class OCRApp(QMainWindow):
 
             selected_text = current_item.text(0)
 
-            # Get the image path from the item data
-            image_path = current_item.data(0, Qt.UserRole)
-            if not image_path or not os.path.exists(image_path):
-                self.show_error_message("Image file not found for the selected item.")
-                return
-
             # Determine if the selected item is a Page or Cropped image
             if selected_text.startswith("Page"):
                 page_index = int(selected_text.split(" ")[1]) - 1
-                self.perform_table_detection(image_path, page_index=page_index, is_pdf=False, cropped_index=None)
+                self.perform_table_detection(page_index)
 
             elif selected_text.startswith("Cropped"):
                 # Handle cropped images (similar logic can be applied)
@@ -2020,75 +2520,20 @@ class OCRApp(QMainWindow):
             self.logger.error(f"Error in detect_tables: {e}", exc_info=True)
             self.show_error_message(f"An error occurred during table detection: {e}")
 
-    def perform_table_detection(self, image_path, page_index, is_pdf=True, cropped_index=None):
-        """Helper method to perform table detection on a single image."""
-        try:
-            # Detect tables using ocr_module's detect_tables_in_images method
-            table_map = ocr_module.detect_tables_in_images([image_path])  # Pass a list with a single image
-
-            if not table_map or not table_map[0]:
-                self.show_error_message(f"No tables detected in {'cropped image' if cropped_index is not None else 'page/image'} {page_index + 1}")
-                self.logger.warning(f"No tables detected in {'cropped image' if cropped_index is not None else 'page/image'} {page_index + 1}")
-                return
-
-            # Assume horizontal_positions and vertical_positions might be pairs of values (min, max)
-            horizontal_positions, vertical_positions = table_map[0]  # Unpack detected table coordinates
-
-            # Convert positions to QLineF objects for drawing lines
-            lines = []
-            pil_image = Image.open(image_path)
-            image_width, image_height = pil_image.size
-
-            # Draw horizontal lines
-            for y in horizontal_positions:
-                if isinstance(y, list) and len(y) == 2:  # If it's a list (min, max), use the first value for the line
-                    y_min, y_max = y
-                    line = QLineF(0.0, float(y_min), float(image_width), float(y_min))
-                else:
-                    line = QLineF(0.0, float(y), float(image_width), float(y))
-                lines.append((line, 'horizontal'))  # Append tuple with orientation
-
-            # Draw vertical lines
-            for x in vertical_positions:
-                if isinstance(x, list) and len(x) == 2:  # If it's a list (min, max), use the first value for the line
-                    x_min, x_max = x
-                    line = QLineF(float(x_min), 0.0, float(x_min), float(image_height))
-                else:
-                    line = QLineF(float(x), 0.0, float(x), float(image_height))
-                lines.append((line, 'vertical'))  # Append tuple with orientation
-
-            # Store lines with the correct key (depending on cropped or full image)
-            if cropped_index is not None:
-                key = f"{page_index}_{cropped_index}"
-            else:
-                key = f"{page_index}_full"
-            self.lines[key] = lines  # Assign list of tuples
-
-            # Ensure the correct image is displayed in the graphics view
-            if self.current_page_index != page_index:
-                self.current_page_index = page_index
-                self.show_current_page()
-
-            # Load the image into the graphics view (if not already loaded)
-            if not self.graphics_view._image_loaded:
-                # Convert PIL image to QImage
-                pil_image = self.pil_images[page_index]
-                qimage = pil_image.convert("RGBA").toqimage()
-                self.graphics_view.load_image(qimage, filename=image_path)
-
-            # Display the detected lines in the graphics view
-            self.graphics_view.display_lines(lines, key=key)
-
-            self.logger.info(f"Table detection completed for {'cropped image' if cropped_index is not None else 'page/image'} {page_index + 1}")
-
-        except Exception as e:
-            # Handle exceptions and show error messages
-            if cropped_index is not None:
-                self.show_error_message(f"Table detection on cropped image failed: {e}")
-                self.logger.error(f"Table detection on cropped image {cropped_index + 1} of page {page_index + 1} failed: {e}", exc_info=True)
-            else:
-                self.show_error_message(f"Table detection on {'page' if is_pdf else 'image'} failed: {e}")
-                self.logger.error(f"Table detection on {'page' if is_pdf else 'image'} {page_index + 1} failed: {e}", exc_info=True)
+    def perform_table_detection(self, page_index):
+        """Shows the page's detected table, from the background detection's cache or once it is detected."""
+        if self.table_detector is None:
+            self.start_table_detection()
+        if self.current_page_index != page_index:
+            self.current_page_index = page_index
+            self.show_current_page()
+        self.requested_detections.add(page_index)
+        table = self.table_detector.get(page_index)
+        if table is not None:
+            self.on_table_detected(page_index, table)
+        else:
+            self.table_detector.prioritize(page_index)
+            self.status_bar.showMessage(f"Detecting tables on page {page_index + 1}...")
 
     def open_pdf(self):
         options = QFileDialog.Options()
@@ -2172,32 +2617,221 @@ class OCRApp(QMainWindow):
             event.ignore()
 
     def process_pdf_to_images(self, pdf_path, project_folder):
-        """Processes the PDF into images and saves them in the project folder using PyMuPDF."""
+        """
+        Opens the PDF for on-demand rendering. Page images in the project folder are
+        only rendered and written when table detection or OCR needs them (see ensure_page_file).
+        """
         try:
             image_dir = os.path.join(project_folder, 'temp_images')
             os.makedirs(image_dir, exist_ok=True)
 
-            # Use PyMuPDF to convert PDF pages to images
-            from pdf_to_image import pdf_to_images  # Ensure this import matches your project structure
-            images = pdf_to_images(pdf_path, dpi=400)
-            self.image_file_paths = []
-            self.pil_images = []  # Initialize the list to store PIL images
+            # A project keeps the image format it was created with
+            self.page_store = image_store.read_project_store(project_folder, self.image_store_name)
+            image_store.write_project_store(project_folder, self.page_store)
+            store = image_store.get_store(self.page_store)
 
-            for i, page_image in enumerate(images):
-                image_path = os.path.join(image_dir, f'page_{i + 1}.png')
-                page_image.save(image_path, 'PNG')
-                self.image_file_paths.append(image_path)
-                self.pil_images.append(page_image)  # Add the PIL image to the list
-                self.logger.debug(f"Added PIL image for page {i+1}")
+            self.open_page_provider(pdf_path)
+            # Page files of another (version of the) document are not reused
+            pdf_to_image.claim_page_folder(image_dir, self.page_provider.document_id)
+            self.image_file_paths = [store.path_for(os.path.join(image_dir, f'page_{i + 1}')) for i in range(self.page_provider.page_count)]
+            self.start_page_prerender(pdf_path, image_dir)
+            self.start_table_detection()
 
-            self.logger.debug(f"Total images processed: {len(self.pil_images)}")
-            self.logger.info(f"PDF processed into images at: {image_dir}")
+            self.logger.debug(f"Total pages: {len(self.pil_images)}")
+            self.logger.info(f"PDF opened for on-demand rendering, page images go to: {image_dir}")
 
         except Exception as e:
             self.logger.error(f"Error processing PDF to images: {e}", exc_info=True)
             self.show_error_message(f"Failed to process PDF into images: {e}")
 
 
+    def open_page_provider(self, pdf_path):
+        """Replaces the current PDF page provider; self.pil_images then renders pages on demand."""
+        self.close_page_provider()
+        self.page_provider = PDFPageProvider(pdf_path, dpi=400)
+        # Renders the pixels of zoomed-in pages, see load_page_pixels
+        self.tile_provider = PDFPageProvider(pdf_path, dpi=self.page_provider.dpi, max_cached_pages=1, max_cached_previews=0)
+        self.pil_images = self.page_provider
+        self.pixmap_cache.clear()
+
+    def start_page_prerender(self, pdf_path, image_dir):
+        """
+        Renders every page file of the PDF on a process pool in a background thread, so
+        detection and OCR rarely have to wait for ensure_page_file. Pages already written
+        (or rendered on demand meanwhile) are skipped, unless the folder held another
+        document's pages (see pdf_to_image.claim_page_folder); files are replaced atomically.
+        """
+        self.stop_page_prerender()
+        self.prerender_cancel_event = threading.Event()
+        dpi = self.page_provider.dpi
+        cancel_event = self.prerender_cancel_event
+        store = self.page_store
+
+        def prerender():
+            try:
+                start = time.time()
+                name_format = image_store.get_store(store).path_for('page_{number}')
+                parallel_render.render_pdf_to_files(pdf_path, image_dir, name_format, dpi=dpi, skip_existing=True, cancel_event=cancel_event, store=store)
+                if not cancel_event.is_set():
+                    self.logger.info(f"Pre-rendered the pages of {pdf_path} in {time.time() - start:.1f}s")
+            except Exception as e:
+                # Pages are still rendered on demand
+                self.logger.warning(f"Background page rendering failed: {e}")
+
+        self.prerender_thread = threading.Thread(target=prerender, name="page-prerender", daemon=True)
+        self.prerender_thread.start()
+
+    def stop_page_prerender(self, wait=True):
+        """
+        Cancels the background page rendering, if any; pages being rendered are finished.
+        Waits for them by default, so no page of this document is written into the
+        folder after it is reused for another one.
+        """
+        self.prerender_cancel_event.set()
+        if wait and self.prerender_thread is not None:
+            self.prerender_thread.join()
+        self.prerender_thread = None
+
+    def close_page_provider(self):
+        """Closes the PDF page provider, if any, and empties self.pil_images; an OCR run queued for its pages is dropped."""
+        self.cancel_queued_ocr()
+        self.stop_page_prerender()
+        self.stop_table_detection()
+        self.pixmap_cache.clear()
+        if self.page_provider is not None:
+            self.page_provider.close()
+            self.page_provider = None
+            self.pil_images = []
+        if self.tile_provider is not None:
+            self.tile_provider.close()
+            self.tile_provider = None
+
+    def start_table_detection(self):
+        """
+        Detects the tables of every page of the open document in the background; the
+        visible page is prioritized by show_current_page, and results arrive through
+        tableDetected. Pages are read from their page files: while the background
+        prerender is writing them, detection waits for a page's file rather than rendering
+        the page a second time. The visible page, and pages the prerender does not reach,
+        are rendered by a page provider of the detector's own, which also writes their
+        page files, so detection never waits for (or holds up) the renders of the display.
+        """
+        self.stop_table_detection()
+        paths = list(self.image_file_paths)
+        detector = None
+        if self.page_provider is not None:
+            pages = self.detection_provider = PDFPageProvider(self.page_provider.pdf_path, dpi=self.page_provider.dpi, max_cached_pages=1, max_cached_previews=0)
+            page_count = pages.page_count
+            prerender = self.prerender_thread
+            store = self.page_store
+
+            def load_page(page_index):
+                path = paths[page_index]
+                urgent = page_index == self.current_page_index or page_index in self.requested_detections
+                # Page files are replaced atomically, so an existing one is complete
+                while not urgent and not os.path.exists(path) and prerender is not None and prerender.is_alive() and not detector.closed:
+                    time.sleep(0.1)
+                if os.path.exists(path):
+                    return path
+                return pages.page_path(page_index, os.path.dirname(path), store=store)
+        else:
+            images = list(self.pil_images)
+            page_count = len(images)
+
+            def load_page(page_index):
+                return np.asarray(images[page_index])
+
+        self.table_detector = detector = BackgroundTableDetector(
+            load_page,
+            on_result=self.tableDetected.emit,
+            on_error=lambda page_index, error: self.tableDetectionFailed.emit(page_index, str(error)),
+            max_workers=2
+        )
+        self.table_detector.submit(range(min(page_count, len(paths))))
+        self.logger.info(f"Detecting the tables of {page_count} page(s) in the background.")
+
+    def stop_table_detection(self):
+        """Stops the background table detection, if any; results still arriving are dropped."""
+        if self.table_detector is not None:
+            self.table_detector.close()
+            self.table_detector = None
+        if self.detection_provider is not None:
+            # Waits for a page being rendered by it
+            self.detection_provider.close()
+            self.detection_provider = None
+        self.requested_detections.clear()
+
+    def detected_tables(self):
+        """{page image path: table} of the pages whose table the background detection has found."""
+        if self.table_detector is None:
+            return {}
+        return {self.image_file_paths[page_index]: table for page_index, table in self.table_detector.tables().items() if page_index < len(self.image_file_paths)}
+
+    def on_table_detected(self, page_index, table):
+        """
+        Stores a page's detected table as its table lines and shows them if the page is
+        visible. Lines already shown for the page (e.g. moved by the user) are kept, unless
+        the user asked for the detection.
+        """
+        if self.table_detector is None or self.table_detector.get(page_index) is not table:
+            # From a document that is no longer open
+            return
+        requested = page_index in self.requested_detections
+        self.requested_detections.discard(page_index)
+        key = f"{page_index}_full"
+        if key in self.lines and not requested:
+            return
+        if not table[0] and not table[1]:
+            if requested:
+                self.show_error_message(f"No tables detected in page/image {page_index + 1}")
+            self.logger.warning(f"No tables detected in page/image {page_index + 1}")
+            return
+        lines = self.table_lines(table, *self.page_size(page_index))
+        self.lines[key] = lines
+        if page_index == self.current_page_index and self.graphics_view._image_loaded:
+            self.graphics_view.display_lines(lines, key=key)
+        if requested:
+            self.status_bar.showMessage(f"Tables detected on page {page_index + 1}", 5000)
+        self.logger.info(f"Table detection completed for page/image {page_index + 1}")
+
+    def on_table_detection_failed(self, page_index, message):
+        self.logger.error(f"Table detection on page/image {page_index + 1} failed: {message}")
+        if page_index in self.requested_detections:
+            self.requested_detections.discard(page_index)
+            self.show_error_message(f"Table detection on page failed: {message}")
+
+    def page_size(self, page_index):
+        """(width, height) of the full-resolution page, without rendering it."""
+        if self.is_lazy_page(page_index):
+            return self.page_provider.page_size(page_index)
+        return self.pil_images[page_index].size
+
+    @staticmethod
+    def table_lines(table, image_width, image_height):
+        """Table lines of a TableMap page entry: a horizontal line at the top of every row, a vertical line at the left of every column."""
+        lines = []
+        for y_min, _ in table[0]:
+            lines.append((QLineF(0.0, float(y_min), float(image_width), float(y_min)), 'horizontal'))
+        for x_min, _ in table[1]:
+            lines.append((QLineF(float(x_min), 0.0, float(x_min), float(image_height)), 'vertical'))
+        return lines
+
+    def is_lazy_page(self, page_index):
+        """True if the page belongs to the open PDF and is rendered on demand."""
+        return self.page_provider is not None and page_index < self.page_provider.page_count
+
+    def render_page_file(self, image_path):
+        """ensure_page_file by path; safe to call from the OCR worker thread."""
+        return self.ensure_page_file(self.image_file_paths.index(image_path))
+
+    def ensure_page_file(self, page_index):
+        """Returns the image file of a page, rendering and saving it first if the PDF page has not been written yet."""
+        image_path = self.image_file_paths[page_index]
+        if self.is_lazy_page(page_index):
+            # Only renders if the file is missing; page_path also checks the folder holds this document
+            self.page_provider.page_path(page_index, os.path.dirname(image_path), store=self.page_store)
+        return image_path
+
     def select_first_page(self, pdf_name):
         try:
             # Find the project item
@@ -2297,15 +2931,10 @@ class OCRApp(QMainWindow):
     def detect_line_intersections(self):
         """Detect intersections between vertical and horizontal lines and record them as table bounding boxes."""
         try:
-            vertical_lines = [line for line in self.graphics_view._line_items if line.orientation == 'vertical']
-            horizontal_lines = [line for line in self.graphics_view._line_items if line.orientation == 'horizontal']
-            bounding_boxes = []
+            vertical_x = [line.line.p1().x() for line in self.graphics_view._line_items if line.orientation == 'vertical']
+            horizontal_y = [line.line.p1().y() for line in self.graphics_view._line_items if line.orientation == 'horizontal']
 
-            for v_line in vertical_lines:
-                v_x = v_line.line.p1().x()
-                for h_line in horizontal_lines:
-                    h_y = h_line.line.p1().y()
-                    bounding_boxes.append(QRectF(v_x, h_y, 1, 1))  # Tiny rectangles at intersections
+            bounding_boxes = [QRectF(x, y, 1, 1) for x, y in line_intersections(horizontal_y, vertical_x)]  # Tiny rectangles at intersections
 
             self.bounding_boxes = bounding_boxes
             self.logger.info(f"Detected {len(bounding_boxes)} intersections.")
@@ -2466,12 +3095,12 @@ class OCRApp(QMainWindow):
             qimage = self.pil_image_to_qimage(pil_image)
             self.qimages.append(qimage)
 
-            # Save the image as a PNG file in the temporary directory
+            # Save the image in the project's page image format in the temporary directory
             temp_dir = Path('temp_images')
             temp_dir.mkdir(exist_ok=True)
             page_index = len(self.pil_images) - 1  # Zero-based index
-            image_file_path = temp_dir / f"image_{page_index + 1}.png"
-            pil_image.save(image_file_path, "PNG")
+            image_file_path = image_store.get_store(self.page_store).path_for(str(temp_dir / f"image_{page_index + 1}"))
+            image_store.save_image(pil_image, image_file_path, self.page_store)
             self.image_file_paths.append(str(image_file_path))
 
             # Populate the project list with the new image as a top-level item
@@ -2623,15 +3252,19 @@ class OCRApp(QMainWindow):
 
             # Convert QImage to PIL Image for consistency
             pil_image = Image.open(file_name).convert('RGB')
+            self.close_page_provider()
             self.pil_images = [pil_image]  # Initialize with the new image
             self.qimages = [self.pil_image_to_qimage(pil_image)]
 
             # Save the image as an image file in the temporary directory
+            self.page_store = image_store.read_project_store(project_folder, self.image_store_name)
+            image_store.write_project_store(project_folder, self.page_store)
             temp_dir = Path('temp_images')
             temp_dir.mkdir(exist_ok=True)
-            image_file_path = temp_dir / f"{image_name}.png"
-            pil_image.save(image_file_path, "PNG")
+            image_file_path = image_store.get_store(self.page_store).path_for(str(temp_dir / image_name))
+            image_store.save_image(pil_image, image_file_path, self.page_store)
             self.image_file_paths = [str(image_file_path)]
+            self.start_table_detection()
 
             # Load the image into the graphics view
             self.graphics_view.load_image(self.qimages[0], filename=str(image_file_path))
@@ -2658,6 +3291,7 @@ class OCRApp(QMainWindow):
     def clear_current_project(self):
         """Clear all current project data."""
         try:
+            self.close_page_provider()
             self.pil_images.clear()
             self.qimages.clear()
             self.image_file_paths.clear()
@@ -2676,29 +3310,22 @@ class OCRApp(QMainWindow):
         QApplication.processEvents()
 
         try:
-            # Import the PyMuPDF-based function
-            from pdf_to_image import pdf_to_images
-
-            # Convert PDF to list of PIL Images using PyMuPDF
-            pil_images = pdf_to_images(pdf_path=file_path, dpi=400)
-            if not pil_images:
+            # Open the PDF with PyMuPDF; pages are rendered when displayed or processed
+            self.open_page_provider(file_path)
+            if not self.page_provider.page_count:
                 raise ValueError('No pages found in the PDF.')
 
-            self.pil_images = pil_images  # Store PIL Images
-
-            # Convert PIL Images to QImages
-            self.qimages = [self.pil_image_to_qimage(pil_img) for pil_img in pil_images]
+            # Pages are displayed from previews, QImages are only built for loaded images
+            self.qimages = []
 
             self.current_page_index = 0  # Start from the first page
 
-            # Save each page as an image file
+            # Page image files are written on demand by ensure_page_file
             temp_dir = Path('temp_images')
-            temp_dir.mkdir(exist_ok=True)
-            self.image_file_paths = []
-            for idx, pil_img in enumerate(self.pil_images):
-                image_file_path = temp_dir / f"page_{idx + 1}.png"
-                pil_img.save(image_file_path, "PNG")
-                self.image_file_paths.append(str(image_file_path))
+            pdf_to_image.claim_page_folder(str(temp_dir), self.page_provider.document_id)
+            store = image_store.get_store(self.page_store)
+            self.image_file_paths = [store.path_for(str(temp_dir / f"page_{idx + 1}")) for idx in range(self.page_provider.page_count)]
+            self.start_table_detection()
 
             # Populate the project list with page names as top-level items
             self.populate_project_list()
@@ -2778,22 +3405,15 @@ class OCRApp(QMainWindow):
                 self.logger.error(f'Invalid page index: {self.current_page_index}')
                 return
 
-            # Get the PIL image for the current page
-            pil_image = self.pil_images[self.current_page_index]
             self.logger.debug(f"Displaying image for page {self.current_page_index + 1}")
-
-            # Ensure the image is in RGBA format
-            pil_image = pil_image.convert("RGBA")
-
-            # Convert PIL image to bytes
-            data = pil_image.tobytes("raw", "RGBA")
-            qimage = QImage(data, pil_image.size[0], pil_image.size[1], QImage.Format_RGBA8888)
-
-            if qimage is None:
-                self.logger.error(f"Failed to convert PIL image to QImage for page {self.current_page_index}")
+            if self.table_detector is not None:
+                self.table_detector.prioritize(self.current_page_index)
+            pixmap, display_size, full_image = self.page_pixmap(self.current_page_index)
+            if pixmap.isNull():
+                self.logger.error(f"Failed to convert the image of page {self.current_page_index + 1} for display")
                 return
             filename = self.image_file_paths[self.current_page_index]
-            self.graphics_view.load_image(qimage, filename=filename)
+            self.graphics_view.load_image(pixmap, filename=filename, display_size=display_size, full_image=full_image)
             self.logger.info(f'Successfully displayed page {self.current_page_index + 1}')
             # Load existing rectangles if any
             self.graphics_view.clear_rectangles()
@@ -2816,6 +3436,49 @@ class OCRApp(QMainWindow):
             self.logger.error(f"Failed to display page {self.current_page_index}: {e}", exc_info=True)
             self.show_error_message(f"An error occurred while displaying page {self.current_page_index + 1}: {e}")
 
+    def page_pixmap(self, page_index):
+        """
+        Returns the display pixmap of a page, the full-resolution (width, height) it is
+        shown at (None to show it at its own size) and a function returning the
+        full-resolution pixels for PDFGraphicsView's tiles (None if the pixmap is the
+        full-resolution page).
+
+        PDF pages are shown from a low-DPI preview scaled to the full-resolution page size;
+        other images larger than PREVIEW_SIDE from a downscaled copy, and small ones at
+        their own size. Pixmaps are kept in self.pixmap_cache by page and zoom (pixmap
+        pixels per page pixel), so a page shown before is not converted again.
+        """
+        if self.is_lazy_page(page_index):
+            provider = self.page_provider
+            zoom = provider.preview_dpi / provider.dpi
+            pixmap = self.pixmap_cache.get_or_create(page_index, zoom, lambda: image_bridge.to_qpixmap(provider.get_preview_array(page_index)))
+            return pixmap, provider.page_size(page_index), lambda: self.load_page_pixels(page_index)
+
+        image = self.pil_images[page_index]
+        width, height = image.size
+        zoom = level_for_scale(self.PREVIEW_SIDE / max(width, height))
+        if zoom >= 1.0:
+            return self.pixmap_cache.get_or_create(page_index, 1.0, lambda: image_bridge.to_qpixmap(image)), None, None
+        preview_size = (max(1, round(width * zoom)), max(1, round(height * zoom)))
+        pixmap = self.pixmap_cache.get_or_create(page_index, zoom, lambda: image_bridge.to_qpixmap(cv2.resize(np.asarray(image), preview_size, interpolation=cv2.INTER_AREA)))
+        return pixmap, (width, height), lambda: np.asarray(image)
+
+    def load_page_pixels(self, page_index):
+        """
+        Full-resolution pixels of a PDF page for the display tiles, called on their
+        background thread: the page file if it is written (memory-mapped for .npy pages),
+        else a render by self.tile_provider, so the display provider is never held up.
+        .npy pages are copied into memory, as a live mapping would keep the file from
+        being replaced or deleted on Windows.
+        """
+        path = self.image_file_paths[page_index]
+        if os.path.exists(path):
+            try:
+                return np.array(image_store.load_image(path))
+            except OSError as e:
+                self.logger.debug(f"Could not read page file {path}, rendering the page: {e}")
+        return self.tile_provider.get_array(page_index)
+
     def save_current_rectangles(self):
         rects = self.graphics_view.get_rectangles()
         self.rectangles[self.current_page_index] = rects
@@ -2838,6 +3501,7 @@ class OCRApp(QMainWindow):
                 'rectangles': self.rectangles,
                 'lines': self.lines,
                 'current_page_index': self.current_page_index,
+                'image_store': self.page_store,
                 # Include any other relevant data
             }
             with open(save_path, 'wb') as f:
@@ -2855,75 +3519,104 @@ class OCRApp(QMainWindow):
             self.rectangles = project_data['rectangles']
             self.lines = project_data['lines']
             self.current_page_index = project_data['current_page_index']
+            # Projects saved before the format was recorded have PNG page images
+            self.page_store = project_data.get('image_store', 'png')
             # Reload the PDF and annotations
             self.load_pdf(self.current_pdf_path)
             self.change_page(self.current_page_index)
             QMessageBox.information(self, 'Load Successful', 'Project loaded successfully.')
 
     def pil_image_to_qimage(self, pil_image):
-        """Convert PIL Image to QImage."""
-        try:
-            if pil_image.mode == 'RGB':
-                r, g, b = pil_image.split()
-                image = Image.merge("RGB", (r, g, b))
-                data = image.tobytes("raw", "RGB")
-                qimage = QImage(data, image.width, image.height, QImage.Format_RGB888)
-            elif pil_image.mode == 'RGBA':
-                r, g, b, a = pil_image.split()
-                image = Image.merge("RGBA", (r, g, b, a))
-                data = image.tobytes("raw", "RGBA")
-                qimage = QImage(data, image.width, image.height, QImage.Format_RGBA8888)
-            elif pil_image.mode == 'L':
-                # Convert grayscale to RGB
-                image = pil_image.convert("RGB")
-                r, g, b = image.split()
-                data = image.tobytes("raw", "RGB")
-                qimage = QImage(data, image.width, image.height, QImage.Format_RGB888)
-            else:
-                # For other modes, convert to RGBA
-                image = pil_image.convert("RGBA")
-                data = image.tobytes("raw", "RGBA")
-                qimage = QImage(data, image.width, image.height, QImage.Format_RGBA8888)
-            return qimage
+        """Convert PIL Image to QImage; the QImage shares the image's pixel buffer, see image_bridge.to_qimage."""
+        try:
+            return image_bridge.to_qimage(pil_image)
         except Exception as e:
             self.logger.error(f"Error converting PIL Image to QImage: {e}", exc_info=True)
             self.show_error_message(f"Failed to convert image for display: {e}")
             return QImage()
 
-    def initialize_ocr_engines(self):
-        """Initializes the OCR engines."""
-        # Update the status bar to inform the user about the initialization process
-        self.status_bar.showMessage('Initializing OCR engines...')
-        QApplication.processEvents()
+    def engine_settings(self):
+        """(use_gpu, rec_batch_num, shared) the OCR engines are built with."""
+        return paddle.device.is_compiled_with_cuda(), self.rec_batch_size or 6, self.use_engine_server
 
-        try:
-            # Determine if GPU is available for OCR processing
-            use_gpu = paddle.device.is_compiled_with_cuda()
-            self.logger.debug(f"GPU available: {use_gpu}")
-
-            # Initialize PaddleOCR engine
-            self.logger.info("Initializing PaddleOCR engine.")
-            self.ocr_engine = ocr_module.initialize_paddleocr(use_gpu)
-            self.logger.debug("PaddleOCR engine initialized successfully.")
-
-            # Initialize EasyOCR engine
-            self.logger.info("Initializing EasyOCR engine.")
-            self.easyocr_engine = ocr_module.initialize_easyocr(use_gpu)
-            self.logger.debug("EasyOCR engine initialized successfully.")
-
-            # Mark OCR engines as initialized
-            self.ocr_initialized = True
-            self.logger.info("Both OCR engines initialized successfully.")
+    def ocr_executor(self):
+        """
+        The window's ParallelOCRExecutor for the current settings, or None when OCR runs in
+        the worker thread. Started on first use and kept for later runs; restarted when the
+        worker count or engine settings change, or after a worker process died.
+        """
+        if self.ocr_workers <= 1 or self.ocr_strategy == 'page':
+            return None
+        use_gpu, _, shared = self.engine_settings()
+        settings = (self.ocr_workers, use_gpu, self.rec_batch_size, shared)
+        if self._ocr_executor is not None and (self._ocr_executor.broken or self._ocr_executor_settings != settings):
+            self.shutdown_ocr_executor()
+        if self._ocr_executor is None:
+            self.logger.info(f"Starting {self.ocr_workers} OCR worker processes.")
+            self._ocr_executor = parallel_ocr.ParallelOCRExecutor(max_workers=self.ocr_workers, use_gpu=use_gpu, batch_size=self.rec_batch_size, shared_engines=shared)
+            self._ocr_executor_settings = settings
+        return self._ocr_executor
+
+    def shutdown_ocr_executor(self):
+        """Stops the window's OCR worker processes, if any."""
+        if self._ocr_executor is not None:
+            self._ocr_executor.shutdown(wait=False)
+            self._ocr_executor = None
+            self._ocr_executor_settings = None
 
-            self.status_bar.showMessage('OCR engines initialized successfully.', 5000)
+    def initialize_ocr_engines(self):
+        """
+        Loads and warms up the OCR engines in the background (see EngineLoader), for the
+        current settings; called once the main window is shown and after settings that
+        change the engines. on_engines_ready then starts an OCR run queued meanwhile.
+        """
+        if self.engine_loader is not None and self.engine_loader.is_running():
+            # on_engines_ready loads again if the settings changed meanwhile
+            return
+        self.ocr_initialized = False
+        self.engine_status_label.setText("OCR engines: loading...")
+        self.status_bar.showMessage('Initializing OCR engines...', 5000)
+        self.engine_loader = EngineLoader(*self.engine_settings())
+        self.engine_loader.engines_ready.connect(self.on_engines_ready)
+        self.engine_loader.engines_failed.connect(self.on_engines_failed)
+        self.engine_loader.start()
+
+    def on_engines_ready(self, ocr_engine, easyocr_engine, seconds):
+        if self.engine_loader.settings != self.engine_settings():
+            # Loaded for settings changed while loading
+            self.engine_loader = None
+            self.initialize_ocr_engines()
+            return
+        self.ocr_engine, self.easyocr_engine = ocr_engine, easyocr_engine
+        self.ocr_initialized = True
+        self.engine_status_label.setText("OCR engines: ready")
+        self.engine_status_label.setToolTip("")
+        self.status_bar.showMessage(f'OCR engines initialized successfully in {seconds:.1f}s.', 5000)
+        self.logger.info("Both OCR engines initialized successfully.")
+        if self.pending_ocr_pages is not None:
+            selected_pages, self.pending_ocr_pages = self.pending_ocr_pages, None
+            self.run_ocr(selected_pages or None)
+
+    def on_engines_failed(self, message):
+        # Loading is tried again on the next Run OCR
+        self.engine_status_label.setText("OCR engines: failed")
+        self.engine_status_label.setToolTip(message)
+        self.ocr_initialized = False
+        if self.pending_ocr_pages is not None:
+            self.pending_ocr_pages = None
+            self.run_ocr_action.setText('Run OCR')
+            self.show_error_message(f'Failed to initialize OCR engines: {message}')
+        else:
+            self.status_bar.showMessage(f'Failed to initialize OCR engines: {message}', 10000)
 
-        except Exception as e:
-            self.show_error_message(f'Failed to initialize OCR engines: {e}')
-            self.logger.error(f'Failed to initialize OCR engines: {e}', exc_info=True)
-            self.ocr_initialized = False
-        finally:
-            self.run_ocr_action.setEnabled(True)
-            self.logger.debug("Run OCR button re-enabled after initialization attempt.")
+    def cancel_queued_ocr(self):
+        """Drops an OCR run waiting for the engines, if any; the engines keep loading."""
+        if self.pending_ocr_pages is None:
+            return
+        self.pending_ocr_pages = None
+        self.run_ocr_action.setText('Run OCR')
+        self.status_bar.showMessage('Queued OCR run cancelled.', 5000)
+        self.logger.info("Queued OCR run cancelled.")
 
     def run_ocr(self, selected_pages=None):
         """
@@ -2932,14 +3625,18 @@ class OCRApp(QMainWindow):
 
         :param selected_pages: Optional list of page indices (zero-based) to process. If None, all pages are processed.
         """
-        # Check if OCR engines are initialized
-        if not self.ocr_initialized:
-            self.initialize_ocr_engines()
+        # Triggering the action again while a run is queued cancels that run
+        if self.pending_ocr_pages is not None:
+            self.cancel_queued_ocr()
+            return
 
-        # Validate OCR engines
+        # Engines still loading: the run starts when they are ready (see on_engines_ready)
         if not self.ocr_initialized:
-            self.show_error_message('Failed to initialize OCR engines.')
-            self.logger.error('OCR engines not initialized.')
+            self.pending_ocr_pages = list(selected_pages) if isinstance(selected_pages, list) else []
+            self.initialize_ocr_engines()
+            self.run_ocr_action.setText('Cancel queued OCR')
+            self.status_bar.showMessage('OCR will start once the OCR engines are ready.', 5000)
+            self.logger.info("OCR run queued until the OCR engines are ready.")
             return
         
         self.logger.debug(f"Received user_lines: {self.user_lines}")
@@ -3010,7 +3707,8 @@ class OCRApp(QMainWindow):
         image_list = []
         for page_index in selected_pages:
             image_path = self.image_file_paths[page_index]
-            if not os.path.exists(image_path):
+            # PDF pages not rendered yet are written by the OCR pipeline (see render_page_file)
+            if not os.path.exists(image_path) and not self.is_lazy_page(page_index):
                 self.logger.error(f"Image file does not exist: {image_path}")
                 self.show_error_message(f"Image file does not exist: {image_path}")
                 return
@@ -3045,11 +3743,22 @@ class OCRApp(QMainWindow):
             ocr_engine=self.ocr_engine,
             easyocr_engine=self.easyocr_engine,
             user_lines=user_lines,  # Pass the user_lines here
-            image_list=image_list
+            image_list=image_list,
+            ocr_workers=self.ocr_workers,
+            rec_batch_size=self.rec_batch_size,
+            cache_path=os.path.join(self.project_folder, CACHE_FILENAME) if self.project_folder else None,
+            page_renderer=self.render_page_file,
+            shared_engines=self.use_engine_server,
+            adaptive_cascade=self.adaptive_cascade,
+            skip_blank=self.skip_blank_cells,
+            ocr_strategy=self.ocr_strategy,
+            detected_tables=self.detected_tables(),
+            ocr_executor=self.ocr_executor()
         )
         # Connect OCRWorker signals to respective slots
         self.ocr_worker.ocr_progress.connect(self.on_ocr_progress)
         self.ocr_worker.ocr_time_estimate.connect(self.update_remaining_time_label)
+        self.ocr_worker.ocr_pipeline_stats.connect(self.update_pipeline_stats_label)
         self.ocr_worker.ocr_completed.connect(self.on_ocr_completed)
         self.ocr_worker.ocr_error.connect(self.on_ocr_error)
 
@@ -3063,6 +3772,9 @@ class OCRApp(QMainWindow):
 
     def run_ocr_on_selected_pages(self):
         """Initiate OCR on user-selected pages."""
+        if self.pending_ocr_pages is not None:
+            self.cancel_queued_ocr()
+            return
         try:
             total_pages = len(self.pil_images)  # Assuming self.pil_images contains all the pages
             if total_pages == 0:
@@ -3274,68 +3986,64 @@ class OCRApp(QMainWindow):
         self.setStyleSheet(f"font-size: {self.text_size}px;")
         self.status_bar.showMessage(f'Text size changed to {size}px.', 5000)
 
-    def display_table(self, table_data, low_confidence_results):
-        """Display OCR results in a table view with low-confidence cells highlighted in red."""
+    def create_results_view(self, store):
+        """
+        Returns (widget, model): a filter box above a QTableView of an OCRResultsModel.
+        Rows have a fixed height and columns stretch, so Qt never measures every cell.
+        """
+        model = OCRResultsModel(store, parent=self)
+        view = QTableView()
+        view.setModel(model)
+        view.setAlternatingRowColors(True)
+        view.setSelectionBehavior(QTableView.SelectRows)
+        view.setEditTriggers(QTableView.NoEditTriggers)
+        view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        # No sort column until a header is clicked, so rows start in table order
+        view.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        view.setSortingEnabled(True)
+
+        filter_edit = QLineEdit()
+        filter_edit.setPlaceholderText("Filter rows...")
+        filter_edit.setClearButtonEnabled(True)
+        filter_edit.textChanged.connect(model.set_filter)
+
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(filter_edit)
+        layout.addWidget(view)
+        return widget, model
+
+    def display_table(self, table_data, low_confidence_results, result_store=None):
+        """
+        Display OCR results in a table view with low-confidence cells highlighted in red.
+
+        @param result_store: result_store.ResultStore of the results; without it the view is
+                             built from table_data, and low_confidence_results (messages
+                             without cell positions) cannot be highlighted.
+        """
         try:
-            if not table_data:
+            store = result_store if result_store is not None else ResultStore.from_table_data(table_data or {})
+            if not len(store):
                 self.show_error_message("No data to display.")
                 self.logger.warning("No data available in table_data.")
                 return
-            
-            # Ensure all keys are integers
-            if not all(isinstance(row, int) for row in table_data.keys()):
-                raise TypeError("Row indices in table_data must be integers.")
-            
-            # Determine maximum row and column indices
-            max_row = max(table_data.keys())
-            max_col = max(
-                max(cols.keys()) if isinstance(cols, dict) else 0 
-                for cols in table_data.values()
-            )
-            
-            # Initialize a QTableWidget
-            table_widget = QTableWidget()
-            table_widget.setRowCount(max_row + 1)
-            table_widget.setColumnCount(max_col + 1)
-            
-            # # Set headers if available
-            # headers = table_data.get(0, {})
-            # for col in range(max_col + 1):
-            #     header_text = headers.get(col, f"Column {col+1}")
-            #     table_widget.setHorizontalHeaderItem(col, QTableWidgetItem(header_text))
-            
-            # Populate the table
-            for row in range(1, max_row + 1):  # Start from 1 if row 0 is headers
-                for col in range(max_col + 1):
-                    text = table_data.get(row, {}).get(col, "")
-                    item = QTableWidgetItem(text)
-                    
-                    # Check if this cell is in low_confidence_results
-                    if (row, col) in low_confidence_results:
-                        item.setBackground(QColor(255, 0, 0, 100))  # Semi-transparent red
-                        item.setToolTip("Low confidence")
-                    
-                    table_widget.setItem(row, col, item)
-            
-            # Adjust table settings
-            table_widget.resizeColumnsToContents()
-            table_widget.resizeRowsToContents()
-            table_widget.setAlternatingRowColors(True)
-            table_widget.setSelectionBehavior(QTableWidget.SelectRows)
-            table_widget.setEditTriggers(QTableWidget.NoEditTriggers)
-            table_widget.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-            table_widget.setSortingEnabled(True)
-            
+
+            widget, self.results_model = self.create_results_view(store)
+
             # Replace the existing table in 'Table View' tab
             table_view_index = self.output_tabs.indexOf(self.tableWidget)
             if table_view_index != -1:
                 self.output_tabs.removeTab(table_view_index)
-            
-            self.output_tabs.addTab(table_widget, 'Table View')
-            self.output_tabs.setCurrentWidget(table_widget)
-            
-            self.logger.info("OCR results displayed in table view successfully.")
-        
+            self.tableWidget = widget
+
+            self.output_tabs.addTab(widget, 'Table View')
+            self.output_tabs.setCurrentWidget(widget)
+
+            self.logger.info(f"OCR results displayed in table view successfully: {store.shape[0]} rows, "
+                             f"{store.low_confidence_count()} low-confidence cells.")
+
         except Exception as e:
             self.logger.error(f"Error in display_table: {e}", exc_info=True)
             self.show_error_message(f"An error occurred while displaying the table: {e}")
@@ -3369,7 +4077,7 @@ class OCRApp(QMainWindow):
         Handles the completion of the OCR task in the GUI, including saving the results to a CSV,
         updating the GUI with performance statistics, and showing OCR quality information.
         """
-        all_table_data, total, bad, easyocr_count, paddleocr_count, low_confidence_results, processing_time = result
+        all_table_data, total, bad, easyocr_count, paddleocr_count, low_confidence_results, processing_time, stats = result
         
         if self.current_pdf_path:
             default_csv_name = os.path.splitext(os.path.basename(self.current_pdf_path))[0] + '.csv'
@@ -3397,7 +4105,7 @@ class OCRApp(QMainWindow):
         self.export_excel_action.setEnabled(True) 
 
         # Display the OCR results in the table view
-        self.display_table(all_table_data, low_confidence_results)
+        self.display_table(all_table_data, low_confidence_results, stats.get('result_store'))
 
         # Cleanup temporary files used during OCR
         try:
@@ -3440,7 +4148,17 @@ class OCRApp(QMainWindow):
             self.status_bar.showMessage("No OCR results to process.", 5000)
 
         # Log the OCR engine usage summary
-        self.status_bar.showMessage(f'OCR Engine Usage - EasyOCR: {easyocr_count}, PaddleOCR: {paddleocr_count}', 5000)
+        self.status_bar.showMessage(
+            f"OCR Engine Usage - EasyOCR: {easyocr_count}, PaddleOCR: {paddleocr_count}, "
+            f"Blank (skipped): {stats.get('blank_skipped', 0)}", 5000
+        )
+
+        # OCR result cache usage
+        if 'cache_hits' in stats:
+            self.status_bar.showMessage(
+                f"OCR cache: {stats['cache_hits']} hits, {stats['cache_misses']} misses "
+                f"({stats['cache_hit_rate'] * 100:.1f}% reused)", 5000
+            )
 
         # Update the project explorer to show the new files
         self.update_project_explorer()
@@ -3452,18 +4170,22 @@ class OCRApp(QMainWindow):
         self.run_ocr_action.setVisible(False)
 
     def on_ocr_progress(self, tasks_completed, total_tasks):
+        # The total is an estimate while pages are still being detected
+        self.progress_bar.setMaximum(total_tasks)
         self.progress_bar.setValue(tasks_completed)
         self.status_bar.showMessage(f'Processing OCR... ({tasks_completed}/{total_tasks})', 5000)
 
     def connect_ocr_signals(self):
         self.ocr_worker.ocr_progress.connect(self.on_ocr_progress)
         self.ocr_worker.ocr_time_estimate.connect(self.update_remaining_time_label)
+        self.ocr_worker.ocr_pipeline_stats.connect(self.update_pipeline_stats_label)
         self.ocr_worker.ocr_completed.connect(self.on_ocr_completed)
         self.ocr_worker.ocr_error.connect(self.on_ocr_error)
 
     def disconnect_ocr_signals(self):
         self.ocr_worker.ocr_progress.disconnect(self.on_ocr_progress)
         self.ocr_worker.ocr_time_estimate.disconnect(self.update_remaining_time_label)
+        self.ocr_worker.ocr_pipeline_stats.disconnect(self.update_pipeline_stats_label)
         self.ocr_worker.ocr_completed.disconnect(self.on_ocr_completed)
         self.ocr_worker.ocr_error.disconnect(self.on_ocr_error)
 
@@ -3520,6 +4242,12 @@ class OCRApp(QMainWindow):
         self.run_ocr_action.triggered.connect(self.run_ocr_on_selected_pages)
 
     def save_csv(self):
+        if self.results_model is not None:
+            # The table view shows a result store; write it in table order, whatever the view's sorting
+            self.results_model.store.write_csv(self.last_csv_path)
+            self.status_bar.showMessage(f'CSV saved: {self.last_csv_path}', 5000)
+            return
+
         # Read data from the tableWidget and write to CSV
         row_count = self.tableWidget.rowCount()
         column_count = self.tableWidget.columnCount()
@@ -3622,7 +4350,7 @@ class OCRApp(QMainWindow):
                 # Add pages based on image file paths
                 image_dir = os.path.join(self.project_folder, 'temp_images')
                 if os.path.exists(image_dir):
-                    image_files = sorted(os.listdir(image_dir))
+                    image_files = sorted(name for name in os.listdir(image_dir) if not name.startswith('.') and not image_store.is_partial(name))
                     for page_index, image_file in enumerate(image_files):
                         page_item = QTreeWidgetItem(project_item)
                         page_item.setText(0, f"Page {page_index + 1}")
@@ -3651,12 +4379,20 @@ class OCRApp(QMainWindow):
 
             # Add pages to the project item
             image_dir = os.path.join(project_folder, 'temp_images')
-            if os.path.exists(image_dir):
-                image_files = sorted(os.listdir(image_dir))
-                for page_index, image_file in enumerate(image_files):
+            if self.page_provider is not None and project_folder == self.project_folder:
+                # Pages of the open PDF may not have been rendered to disk yet
+                image_paths = self.image_file_paths[:self.page_provider.page_count]
+            elif os.path.exists(image_dir):
+                image_paths = [os.path.join(image_dir, image_file) for image_file in sorted(os.listdir(image_dir))
+                               if not image_file.startswith('.') and not image_store.is_partial(image_file)]
+            else:
+                image_paths = None
+
+            if image_paths is not None:
+                for page_index, image_path in enumerate(image_paths):
                     page_item = QTreeWidgetItem(project_item)
                     page_item.setText(0, f"Page {page_index + 1}")
-                    page_item.setData(0, Qt.UserRole, os.path.join(image_dir, image_file))
+                    page_item.setData(0, Qt.UserRole, image_path)
                     page_item.setFlags(page_item.flags() | Qt.ItemIsSelectable | Qt.ItemIsEnabled)
 
                 # Expand the project item
@@ -3678,45 +4414,22 @@ class OCRApp(QMainWindow):
             if not os.path.exists(csv_path):
                 raise FileNotFoundError(f"CSV file not found: {csv_path}")
 
-            # Read CSV data
-            with open(csv_path, 'r', newline='', encoding='utf-8') as csvfile:
-                reader = csv.reader(csvfile)
-                data = list(reader)
-
-            if not data:
+            # Read CSV data into a result store; the first row holds the headers
+            store = ResultStore.from_csv(csv_path)
+            if not store.shape[0]:
                 raise ValueError("CSV file is empty.")
 
-            headers = data[0]
-            rows = data[1:]
-
-            # Create QTableWidget
-            table_widget = QTableWidget()
-            table_widget.setRowCount(len(rows))
-            table_widget.setColumnCount(len(headers))
-            table_widget.setHorizontalHeaderLabels(headers)
-
-            # Populate table
-            for row_idx, row in enumerate(rows):
-                for col_idx, cell in enumerate(row):
-                    item = QTableWidgetItem(cell)
-                    table_widget.setItem(row_idx, col_idx, item)
-
-            # Enhance table appearance
-            table_widget.resizeColumnsToContents()
-            table_widget.resizeRowsToContents()
-            table_widget.setAlternatingRowColors(True)
-            table_widget.setSelectionBehavior(QTableWidget.SelectRows)
-            table_widget.setEditTriggers(QTableWidget.NoEditTriggers)
-            table_widget.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-            table_widget.setSortingEnabled(True)
+            widget, _ = self.create_results_view(store)
 
             # Remove existing widget in 'CSV Output' tab and add the new table
-            csv_output_index = self.output_tabs.indexOf(self.csv_output)
-            if csv_output_index != -1:
-                self.output_tabs.removeTab(csv_output_index)
-            
-            self.output_tabs.addTab(table_widget, 'CSV Output')
-            self.output_tabs.setCurrentWidget(table_widget)
+            for previous in (self.csv_output, self.csv_table_widget):
+                csv_output_index = self.output_tabs.indexOf(previous) if previous is not None else -1
+                if csv_output_index != -1:
+                    self.output_tabs.removeTab(csv_output_index)
+            self.csv_table_widget = widget
+
+            self.output_tabs.addTab(widget, 'CSV Output')
+            self.output_tabs.setCurrentWidget(widget)
 
             self.logger.info("CSV displayed as table successfully.")
 
@@ -3725,18 +4438,34 @@ class OCRApp(QMainWindow):
             self.show_error_message(f"An error occurred while displaying the table: {e}")
 
     def cleanup_temp_images(self):
-        """Delete all temporary directories and their contents."""
+        """
+        Delete all temporary directories and their contents. The open document is closed
+        first, so no worker writes into them and no page file is still memory-mapped
+        (which keeps it from being deleted on Windows); files that cannot be deleted are logged.
+        """
+        self.close_page_provider()
+        if self.graphics_view._tile_item is not None:
+            self.graphics_view._tile_item.stop()
+        # Drops unreachable arrays still mapping page or cell files
+        gc.collect()
+
+        def log_leftover(function, path, exc_info):
+            self.logger.warning(f"Could not delete {path}: {exc_info[1]}")
+
         temp_dirs = ['temp_images', 'temp_gui']
         for dir_name in temp_dirs:
             temp_dir = Path(dir_name)
             if temp_dir.exists() and temp_dir.is_dir():
                 try:
-                    shutil.rmtree(temp_dir, ignore_errors=True)
+                    shutil.rmtree(temp_dir, onerror=log_leftover)
                     self.logger.info(f"Deleted temporary directory: {temp_dir}")
                 except Exception as e:
                     self.logger.error(f"Failed to delete temporary directory {temp_dir}: {e}", exc_info=True)
 
     def closeEvent(self, event):
+        # Workers must stop writing page files before they are cleaned up
+        self.stop_page_prerender(wait=True)
+        self.shutdown_ocr_executor()
         self.cleanup_temp_images()
         event.accept()
 
@@ -3768,6 +4497,8 @@ def main():
         window = OCRApp()
         window.show()
         logger.info("Main window initialized and shown successfully.")
+        # Load the OCR engines once the event loop runs, with the window already on screen
+        QTimer.singleShot(0, window.initialize_ocr_engines)
     except Exception as e:
         logger.critical(f"Failed to initialize the main window: {e}", exc_info=True)
         QMessageBox.critical(
@@ -3797,4 +4528,6 @@ def main():
         sys.exit(1)
 
 if __name__ == '__main__':
+    # Needed by the frozen (auto-py-to-exe) build, whose OCR pools start spawned children
+    multiprocessing.freeze_support()
     main()
@@ -15,18 +15,31 @@ from paddleocr import PaddleOCR, draw_ocr
 from PIL import Image, ImageEnhance, ImageFilter, ImageTk
 
 
-reader = easyocr.Reader(['en'], gpu=True)  # Set 'gpu=True' if GPU is available
+import paddle
+import engine_server
 
-#Load PaddleOCR model and processor
-ocr = PaddleOCR(use_angle_cls=True, lang='en',rec_model_dir='en_PP-OCRv4_rec',
-    version='PP-OCRv4',
-    det_db_thresh=0.35,
-    det_db_box_thresh=0.45,
-    det_db_unclip_ratio=1.8,
-    cls_thresh=0.95,
-    use_space_char=True,
-    rec_image_shape='3, 48, 320',
-    det_limit_side_len=960)
+# Engines are loaded on first use (see get_engines), not at import time
+_engines = None
+
+
+def get_engines():
+    """
+    Returns the (PaddleOCR, EasyOCR) engines used by this module, loading them on first
+    use, or connecting to the shared engine server when OCR_ENGINE_SERVER is set.
+    """
+    global _engines
+    if _engines is None:
+        _engines = engine_server.get_engines(use_gpu=paddle.device.is_compiled_with_cuda())
+    return _engines
+
+
+def __getattr__(name):
+    # Keeps OCRCompare.ocr / OCRCompare.reader working for existing scripts
+    if name == 'ocr':
+        return get_engines()[0]
+    if name == 'reader':
+        return get_engines()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def perform_easyocr(image):
@@ -41,7 +54,7 @@ def perform_easyocr(image):
     @return: A tuple containing the recognized text (string) and the average confidence score (float).
              Returns an empty string and a confidence score of 0 if no text is detected.
     """
-    results = reader.readtext(np.array(image), detail=1, paragraph=False)
+    results = get_engines()[1].readtext(np.array(image), detail=1, paragraph=False)
     texts = [res[1] for res in results]
     confidences = [res[2] for res in results if res[2] > 0]  # Filter zero confidence
 
@@ -68,7 +81,7 @@ def perform_paddle_ocr(image, return_confidence=False):
     """
     image_array = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
     try:
-        result = ocr.ocr(image_array, cls=True)
+        result = get_engines()[0].ocr(image_array, cls=True)
         if not result:
             print("No text detected by PaddleOCR.")
             return ('', 0) if return_confidence else ''
@@ -6,8 +6,17 @@ import logging
 import csv
 from pathlib import Path
 import pdf_to_image
+import parallel_render
+import image_store
 from TableDetection import luminositybased
-from Cellularize import cellularize_Page_colrow
+from Cellularize import cellularize_Page_colrow, iter_cells, load_page_array
+from ocr_cache import OCRCache, make_fingerprint, CACHE_FILENAME
+from ocr_cascade import CascadePolicy, format_stats as format_cascade_stats
+from blank_cells import BlankCellDetector, BLANK_SOURCE
+from pipeline import Pipeline, format_metrics
+from background_detection import detect_page_table
+import engine_server
+import paddleocr
 from paddleocr import PaddleOCR
 from PIL import Image, ImageEnhance, ImageFilter
 import easyocr
@@ -38,6 +47,30 @@ def preprocess_image(image):
 
     return image.convert('RGB')
 
+# Recognizer input shape (channels, height, width), matches rec_image_shape in PADDLEOCR_SETTINGS
+REC_IMAGE_SHAPE = (3, 48, 320)
+
+# PaddleOCR model settings used by initialize_paddleocr
+PADDLEOCR_SETTINGS = dict(
+    use_angle_cls=True,
+    lang='en',
+    rec_model_dir='en_PP-OCRv4_rec',
+    version='PP-OCRv4',
+    det_db_thresh=0.35,
+    det_db_box_thresh=0.45,
+    det_db_unclip_ratio=1.8,
+    cls_thresh=0.95,
+    use_space_char=True,
+    rec_image_shape='3, 48, 320',
+    det_limit_side_len=960
+)
+
+# PaddleOCR results below this confidence are re-tried with EasyOCR
+EASYOCR_FALLBACK_THRESHOLD = 0.98
+
+# Engine order and per-engine thresholds of the default fallback cascade (see make_cascade_policy)
+CASCADE_ENGINES = [('PaddleOCR', EASYOCR_FALLBACK_THRESHOLD), ('EasyOCR', None)]
+
 def perform_paddle_ocr(image, ocr_engine, return_confidence=False):
     """Perform OCR using PaddleOCR."""
     image_array = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
@@ -74,66 +107,224 @@ def perform_easyocr(image, reader):
     else:
         return '', 0
 
-def process_image(filename, ocr, reader):
-    """Process a single image and perform OCR without additional preprocessing."""
-    # Extract row and column indices from filename
-    parts = filename.split('_')
+def cell_to_rgb(pixels):
+    """Returns a cell pixel array as 3-channel RGB, as the OCR engines expect."""
+    if pixels.ndim == 2:
+        return cv2.cvtColor(np.ascontiguousarray(pixels), cv2.COLOR_GRAY2RGB)
+    if pixels.shape[2] == 4:
+        return cv2.cvtColor(np.ascontiguousarray(pixels), cv2.COLOR_RGBA2RGB)
+    return pixels
+
+def resize_for_recognition(image, rec_image_shape=REC_IMAGE_SHAPE):
+    """
+    Fits an RGB cell into the recognizer input shape (C, H, W) as a BGR array.
+
+    The cell is scaled to height H keeping its aspect ratio (squeezed if it would
+    be wider than W) and padded on the right with white up to width W, so every
+    cell in a batch has the same shape.
+    """
+    _, rec_height, rec_width = rec_image_shape
+    pixels = np.asarray(image)
+    height, width = pixels.shape[:2]
+    new_width = max(1, min(rec_width, int(np.ceil(rec_height * width / max(1, height)))))
+    resized = cv2.resize(pixels, (new_width, rec_height), interpolation=cv2.INTER_LINEAR)
+    padded = np.full((rec_height, rec_width, 3), 255, dtype=np.uint8)
+    padded[:, :new_width] = resized
+    return cv2.cvtColor(padded, cv2.COLOR_RGB2BGR)
+
+def perform_paddle_ocr_batch(images, ocr_engine, batch_size=32, rec_image_shape=REC_IMAGE_SHAPE):
+    """
+    Recognition-only PaddleOCR over many cells at once.
+
+    Cells are already isolated by table detection, so the DB text detector and
+    the angle classifier are skipped: each cell is resized/padded to
+    rec_image_shape and the recognizer runs on `batch_size` cells per call.
+
+    @return: List of (text, confidence) tuples in input order, the same values
+             perform_paddle_ocr(..., return_confidence=True) returns per cell.
+    """
+    results = []
+    for start in range(0, len(images), batch_size):
+        batch = [resize_for_recognition(image, rec_image_shape) for image in images[start:start + batch_size]]
+        try:
+            rec_res, _ = ocr_engine.text_recognizer(batch)
+        except Exception as e:
+            print(f"An error occurred during batched PaddleOCR processing: {e}")
+            rec_res = [('', 0)] * len(batch)
+        for text, confidence in rec_res:
+            # Blank cells still get a score from the recognizer; treat them as
+            # "nothing detected" like the detector path does.
+            results.append((text, confidence) if text.strip() else ('', 0))
+    return results
+
+def load_cell(cell):
+    """
+    Returns (row_index, col_index, rgb_image, label) for a Cellularize.Cell, or None if its image cannot be read.
+
+    Row and column come from the record itself; in-memory cells are not read from disk,
+    cells saved by cellularize_Page_colrow are loaded from their path.
+    """
     try:
-        row_index = int(parts[2])
-        col_index = int(parts[3].split('.')[0])
-    except (IndexError, ValueError) as e:
-        print(f"Error parsing filename {filename}: {e}")
+        pixels = cell.pixels()
+    except OSError as e:
+        print(f"Error loading cell {cell}: {e}")
         return None
+    return cell.row, cell.col, cell_to_rgb(pixels), cell.label
+
+def make_cascade_policy(learn=False, column_thresholds=None, **kwargs):
+    """
+    Returns an ocr_cascade.CascadePolicy over CASCADE_ENGINES (PaddleOCR, then EasyOCR
+    below EASYOCR_FALLBACK_THRESHOLD). Learning is opt-in: with learn=True, EasyOCR is
+    skipped in columns where it has not been changing PaddleOCR's text, so results can
+    differ from the fixed threshold's.
+    """
+    return CascadePolicy(CASCADE_ENGINES, column_thresholds=column_thresholds, learn=learn, **kwargs)
+
+# Used by process_image/select_best_result calls without a policy: fixed thresholds,
+# built once instead of per cell
+DEFAULT_CASCADE_POLICY = make_cascade_policy()
+
+def cascade_recognizers(ocr, reader):
+    """Maps the CASCADE_ENGINES names to (text, confidence) recognizers for CascadePolicy.run."""
+    return {
+        'PaddleOCR': lambda image: perform_paddle_ocr(image, ocr, return_confidence=True),
+        'EasyOCR': lambda image: perform_easyocr(image, reader),
+    }
+
+def ocr_fingerprint(batch_size=None, policy=None):
+    """Fingerprint of everything that affects process_image results, for the OCR result cache."""
+    settings = {}
+    if policy is not None:
+        settings['cascade'] = policy.settings()
+    return make_fingerprint(
+        paddleocr=getattr(paddleocr, '__version__', ''),
+        easyocr=getattr(easyocr, '__version__', ''),
+        paddle_settings=PADDLEOCR_SETTINGS,
+        easyocr_fallback_threshold=EASYOCR_FALLBACK_THRESHOLD,
+        recognition='batched' if batch_size else 'per cell',
+        batch_size=batch_size,
+        **settings
+    )
 
-    # Open the image
-    image = Image.open(filename).convert("RGB")
+def result_from_cache(row_index, col_index, filename, cached):
+    """Rebuilds a process_image result from a cached (text, confidence, source) entry."""
+    text, confidence, source = cached
+    if confidence == 0:
+        return None
+    return (row_index, col_index, text, confidence, source, filename)
+
+def blank_result(row_index, col_index, filename):
+    """process_image result for a cell skipped as blank; process_results counts it but writes no text."""
+    return (row_index, col_index, '', 1.0, BLANK_SOURCE, filename)
+
+def prepare_blank_detector(blank_detector, cells, max_samples=200):
+    """Tunes a blank_cells.BlankCellDetector on the first cells of a document (once)."""
+    if blank_detector is None or blank_detector.fitted or not isinstance(cells, (list, tuple)):
+        return
+    step = max(1, len(cells) // max_samples)
+    blank_detector.fit([cell.pixels() for cell in cells[::step]])
+
+def cache_result(cache, image, result):
+    """Stores a process_image result (None meaning nothing recognised) for a cell image."""
+    if result is None:
+        cache.put(image, '', 0, '')
+    else:
+        cache.put(image, result[2], result[3], result[4])
+
+def process_image(cell, ocr, reader, cache=None, policy=None, blank_detector=None):
+    """
+    Process a single image and perform OCR without additional preprocessing.
+
+    `cell` is a Cellularize.Cell, in memory (nothing is read from disk) or saved
+    by cellularize_Page_colrow. If an ocr_cache.OCRCache is given, pixel-identical cells are answered from it.
+    `policy` is the ocr_cascade.CascadePolicy deciding on the EasyOCR fallback
+    (default: DEFAULT_CASCADE_POLICY). Cells a blank_cells.BlankCellDetector
+    finds empty skip OCR entirely and return blank_result().
+    """
+    loaded = load_cell(cell)
+    if loaded is None:
+        return None
+    row_index, col_index, image, filename = loaded
 
-    # Perform OCR on the original image using PaddleOCR
-    original_text, original_confidence = perform_paddle_ocr(image, ocr, return_confidence=True)
+    if blank_detector is not None and blank_detector.is_blank(image):
+        return blank_result(row_index, col_index, filename)
 
-    if original_confidence >= 0.98:
-        best_text = original_text
-        best_confidence = original_confidence
-        source = 'Original Image, PaddleOCR'
-    else:
-        # Use EasyOCR if confidence is still low
-        easy_original_text, easy_original_conf = perform_easyocr(image, reader)
+    if cache is not None:
+        cached = cache.get(image)
+        if cached is not None:
+            return result_from_cache(row_index, col_index, filename, cached)
+
+    # Perform OCR on the original image using PaddleOCR
+    paddle_result = perform_paddle_ocr(image, ocr, return_confidence=True)
+    result = select_best_result(row_index, col_index, image, filename, paddle_result, reader, policy)
+
+    if cache is not None:
+        cache_result(cache, image, result)
+    return result
+
+def process_batch(filenames, ocr, reader, batch_size=32, cache=None, policy=None, blank_detector=None):
+    """
+    Batched counterpart of process_image for a list of cells: PaddleOCR
+    recognition runs once per batch, the EasyOCR fallback stays per cell.
+
+    @return: One process_image-style result (or None) per input cell.
+    """
+    results = [None] * len(filenames)
+    pending = []
+    for index, filename in enumerate(filenames):
+        loaded = load_cell(filename)
+        if loaded is None:
+            continue
+        if blank_detector is not None and blank_detector.is_blank(loaded[2]):
+            results[index] = blank_result(loaded[0], loaded[1], loaded[3])
+            continue
+        cached = cache.get(loaded[2]) if cache is not None else None
+        if cached is not None:
+            results[index] = result_from_cache(loaded[0], loaded[1], loaded[3], cached)
+        else:
+            pending.append((index, loaded))
 
-        # Collect all results
-        results = [
-            (original_text, original_confidence, 'Original Image, PaddleOCR'),
-            (easy_original_text, easy_original_conf, 'Original Image, EasyOCR')
-        ]
+    paddle_results = perform_paddle_ocr_batch([loaded[2] for _, loaded in pending], ocr, batch_size)
+    for (index, (row_index, col_index, image, filename)), paddle_result in zip(pending, paddle_results):
+        results[index] = select_best_result(row_index, col_index, image, filename, paddle_result, reader, policy)
+        if cache is not None:
+            cache_result(cache, image, results[index])
+    return results
 
-        # Select the result with the highest confidence
-        best_text, best_confidence, source = max(results, key=lambda x: x[1])
+def select_best_result(row_index, col_index, image, filename, paddle_result, reader, policy=None):
+    """
+    Runs the rest of the fallback cascade (EasyOCR when PaddleOCR is not confident
+    enough, see make_cascade_policy) and returns the process_image result tuple.
+    """
+    if policy is None:
+        policy = DEFAULT_CASCADE_POLICY
+    best_text, best_confidence, engine = policy.run(image, col_index, cascade_recognizers(None, reader), first_result=paddle_result)
 
     if best_confidence == 0:
         return None
 
-    return (row_index, col_index, best_text, best_confidence, source, filename)
-
-def convert_pdf_to_images(pdf_file_path, output_dir, dpi=400):
-    """Converts PDF to images and saves them to output_dir."""
-    images = pdf_to_image.pdf_to_images(pdf_file_path, dpi=dpi)
-    image_list = []
-    counter = 0
-    for image in images:
-        name = os.path.join(output_dir, f"Document_{counter}.png")
-        image.save(name)
-        image_list.append(os.path.abspath(name))
-        counter += 1
-    return image_list
-
-
-def detect_tables_in_images(image_list):
-    """Detects tables in images and returns a TableMap."""
-    TableMap = []
-    for filepath in image_list:
-        TableCoords = luminositybased.findTable(filepath, "borderless", "borderless")
-        FormattedCoords = [luminositybased.convert_to_pairs(CordList) for CordList in TableCoords]
-        TableMap.append(FormattedCoords)
-    return TableMap
+    return (row_index, col_index, best_text, best_confidence, f'Original Image, {engine}', filename)
+
+def convert_pdf_to_images(pdf_file_path, output_dir, dpi=400, store=None):
+    """
+    Converts PDF to images (rendered straight to grayscale, pages in parallel) and saves them to output_dir.
+
+    @param store: image_store store name (default: image_store.DEFAULT_STORE, PNG); "npy"
+                  is written without any encoding and memory-mapped by detection and
+                  cellularization, at the cost of uncompressed files.
+    """
+    store = image_store.get_store(store)
+    image_files = parallel_render.render_pdf_to_files(pdf_file_path, output_dir, store.path_for("Document_{index}"), dpi=dpi, grayscale=True, store=store.name)
+    return [os.path.abspath(name) for name in image_files]
+
+def detect_tables_in_images(image_list, table_style="borderless"):
+    """
+    Detects tables in images and returns a TableMap.
+
+    @param table_style: "borderless" (cells separated by whitespace, detected as luminosity
+                        troughs) or "border" (ruled tables, detected as peaks).
+    """
+    return [detect_page_table(filepath, table_style) for filepath in image_list]
 
 def cellularize_images(image_list, TableMap, page_num=0):
     """Splits the images into cells based on detected table coordinates."""
@@ -142,16 +333,120 @@ def cellularize_images(image_list, TableMap, page_num=0):
         locationlists.append(cellularize_Page_colrow(image_list[index], Table[1], Table[0], page_num + index))
     return locationlists
 
-def process_all_images(all_filenames, ocr, reader, progress_callback=None):
-    """Processes all cell images and collects results."""
+def iter_image_cells(image_list, TableMap, page_num=0, dump_dir=None):
+    """
+    In-memory alternative to cellularize_images: decodes each page once and yields
+    Cell views of it. Cell PNGs are only written when dump_dir is given (debugging).
+    """
+    for index, Table in enumerate(TableMap):
+        page = load_page_array(image_list[index])
+        yield from iter_cells(page, Table[1], Table[0], page_num + index, dump_dir=dump_dir)
+
+def detect_page_cells(page_num, page, table_style="borderless"):
+    """
+    Table detection and in-memory cellularization of one page (path, PIL image or array).
+
+    @return: (page_num, cells), cells being Cell views of the decoded page.
+    """
+    page = load_page_array(page)
+    Table = detect_tables_in_images([page], table_style)[0]
+    return page_num, list(iter_cells(page, Table[1], Table[0], page_num))
+
+def iter_page_cells(pages, page_num=0):
+    """
+    Streams table detection and cellularization: for each page image yields
+    (page_num, cells) as detect_page_cells. Only one page is decoded at a time.
+    """
+    for index, page in enumerate(pages, start=page_num):
+        yield detect_page_cells(index, page)
+
+def iter_ocr_pages(pdf_file_path, ocr, reader, dpi=400, queue_size=2, cancel_event=None, batch_size=None, cache=None, detect_workers=2, pipeline=None, table_style="borderless", policy=None, skip_blank=True):
+    """
+    Streaming pipeline: render -> enhance -> detect -> cellularize -> OCR, one page at a time.
+
+    Rendering and table detection run as pipeline.Pipeline stages on their own threads,
+    connected to the OCR stage (this thread) by queues of at most `queue_size` pages, so
+    page N+1 is prepared while page N is OCR'd and memory stays constant no matter how
+    long the PDF is.
+
+    @param pipeline: Optional pipeline.Pipeline to run on, e.g. to read its metrics() afterwards.
+    @param table_style: Passed to detect_tables_in_images.
+    @param policy: Optional ocr_cascade.CascadePolicy shared by all pages.
+    @param skip_blank: Skip OCR on cells a BlankCellDetector (tuned on the first page) finds empty.
+    @return: Iterator of (page_num, results), results as returned by process_all_images.
+    """
+    pipeline = pipeline if pipeline is not None else Pipeline(queue_size)
+    blank_detector = BlankCellDetector() if skip_blank else None
+    # No page cache: each page is released as soon as it has been cellularized and OCR'd.
+    # Pages are rendered to single-channel arrays that detection and cellularization use as-is.
+    with pdf_to_image.PDFPageProvider(pdf_file_path, dpi=dpi, max_cached_pages=0, max_cached_previews=0, grayscale=True) as pages:
+        pipeline.add_stage("render", lambda page_num: (page_num, pages.get_array(page_num)))
+        pipeline.add_stage("detect", lambda item: detect_page_cells(*item, table_style), workers=detect_workers)
+        stream = pipeline.run(range(pages.page_count))
+        try:
+            for page_num, cells in stream:
+                if cancel_event is not None and cancel_event.is_set():
+                    return
+                with pipeline.measure("ocr"):
+                    results = process_all_images(cells, ocr, reader, cancel_event=cancel_event, batch_size=batch_size, cache=cache, policy=policy, blank_detector=blank_detector)
+                yield page_num, results
+        finally:
+            stream.close()
+
+def stream_pdf_to_csv(pdf_file_path, output_csv, ocr, reader, dpi=400, queue_size=2, cancel_event=None, batch_size=None, cache=None, pipeline=None, detect_workers=2, table_style="borderless", policy=None, skip_blank=True):
+    """
+    Runs iter_ocr_pages and appends each page's rows to output_csv as soon as the page
+    is done, so the first rows are written while later pages are still rendering.
+
+    @return: (total, bad, easyocr_count, paddleocr_count, blank_count, low_confidence_results) over all pages.
+    """
+    # Start from an empty file, pages are appended as they finish
+    open(output_csv, 'w').close()
+    total = bad = easyocr_count = paddleocr_count = blank_count = 0
+    low_confidence_results = []
+
+    pages = iter_ocr_pages(pdf_file_path, ocr, reader, dpi, queue_size, cancel_event, batch_size, cache, detect_workers, pipeline, table_style, policy, skip_blank)
+    for page_num, results in pages:
+        table_data, page_total, page_bad, page_easyocr, page_paddleocr, page_blank, page_low_confidence = process_results(results)
+        append_results_to_csv(table_data, output_csv)
+        total += page_total
+        bad += page_bad
+        easyocr_count += page_easyocr
+        paddleocr_count += page_paddleocr
+        blank_count += page_blank
+        low_confidence_results.extend(page_low_confidence)
+        print(f"Page {page_num + 1}: {page_total} cells written to {output_csv} ({page_blank} blank cells skipped)")
+
+    return total, bad, easyocr_count, paddleocr_count, blank_count, low_confidence_results
+
+def process_all_images(all_filenames, ocr, reader, progress_callback=None, total=None, cancel_event=None, batch_size=None, cache=None, policy=None, blank_detector=None):
+    """
+    Processes all cells and collects results.
+
+    @param all_filenames: Cellularize.Cell records (in memory or saved to disk).
+    @param total: Number of cells, required only when all_filenames has no len().
+    @param cancel_event: Optional threading.Event; processing stops once it is set.
+    @param batch_size: If set, use batched PaddleOCR recognition (see process_batch)
+                       with this many cells per batch instead of one ocr() call per cell.
+    @param cache: Optional ocr_cache.OCRCache consulted before running the engines.
+    @param policy: Optional ocr_cascade.CascadePolicy for the EasyOCR fallback (see process_image).
+    @param blank_detector: Optional blank_cells.BlankCellDetector; empty cells skip OCR. It is
+                           tuned on the first list of cells it sees (see prepare_blank_detector).
+    """
+    prepare_blank_detector(blank_detector, all_filenames)
+    if batch_size:
+        return _process_all_batched(all_filenames, ocr, reader, batch_size, progress_callback, total, cancel_event, cache, policy, blank_detector)
+
     results = []
-    total_images = len(all_filenames)
+    total_images = total if total is not None else len(all_filenames)
     start_time = time.time()
     cumulative_time = 0
 
     for idx, filename in enumerate(all_filenames, start=1):
+        if cancel_event is not None and cancel_event.is_set():
+            break
         cell_start = time.time()
-        result = process_image(filename, ocr, reader)
+        result = process_image(filename, ocr, reader, cache, policy, blank_detector)
         if result:
             results.append(result)
         cell_duration = time.time() - cell_start
@@ -169,13 +464,46 @@ def process_all_images(all_filenames, ocr, reader, progress_callback=None):
     return results
 
 
+def _process_all_batched(all_filenames, ocr, reader, batch_size, progress_callback=None, total=None, cancel_event=None, cache=None, policy=None, blank_detector=None):
+    """process_all_images in batched-recognition mode; progress is reported once per batch."""
+    results = []
+    total_images = total if total is not None else len(all_filenames)
+    start_time = time.time()
+    done = 0
+    batch = []
+
+    def run_batch():
+        nonlocal done
+        results.extend(result for result in process_batch(batch, ocr, reader, batch_size, cache, policy, blank_detector) if result)
+        done += len(batch)
+        batch.clear()
+        if progress_callback:
+            remaining_time = (total_images - done) * (time.time() - start_time) / done
+            progress_callback(done, total_images, remaining_time)
+
+    for filename in all_filenames:
+        if cancel_event is not None and cancel_event.is_set():
+            return results
+        batch.append(filename)
+        if len(batch) == batch_size:
+            run_batch()
+    if batch:
+        run_batch()
+
+    return results
+
 def process_results(results):
-    """Processes OCR results and returns aggregated data."""
+    """
+    Processes OCR results and returns aggregated data:
+    (table_data, total, bad, easyocr_count, paddleocr_count, blank_count, low_confidence_results),
+    blank_count being the cells skipped by the blank-cell detector (not included in total).
+    """
     table_data = {}
     total = 0
     bad = 0
     easyocr_count = 0
     paddleocr_count = 0
+    blank_count = 0
     low_confidence_results = []
 
     for result in results:
@@ -183,6 +511,11 @@ def process_results(results):
             continue
         row_index, col_index, best_text, best_confidence, source, filename = result
 
+        if source == BLANK_SOURCE:
+            # Skipped without OCR; the CSV gets an empty cell as before
+            blank_count += 1
+            continue
+
         if 'EasyOCR' in source:
             easyocr_count += 1
         else:
@@ -201,7 +534,7 @@ def process_results(results):
             table_data[row_index] = {}
         table_data[row_index][col_index] = best_text
 
-    return table_data, total, bad, easyocr_count, paddleocr_count, low_confidence_results
+    return table_data, total, bad, easyocr_count, paddleocr_count, blank_count, low_confidence_results
 
 def write_results_to_csv(table_data, output_csv):
     """Writes the table data to a CSV file."""
@@ -213,8 +546,21 @@ def write_results_to_csv(table_data, output_csv):
             writer.writerow(row)
     print(f"Results saved to {output_csv}")
 
-def display_statistics(total, bad, easyocr_count, paddleocr_count):
-    """Displays statistics about the OCR results."""
+def append_results_to_csv(table_data, output_csv):
+    """Appends the rows of one page's table data to a CSV file (see write_results_to_csv)."""
+    if not table_data:
+        return
+    max_columns = max(max(cols.keys()) for cols in table_data.values())
+    with open(output_csv, mode='a', newline='') as file:
+        writer = csv.writer(file)
+        for row_index in sorted(table_data.keys()):
+            writer.writerow([table_data[row_index].get(col_index, "") for col_index in range(max_columns + 1)])
+
+def display_statistics(total, bad, easyocr_count, paddleocr_count, blank_count=0, stats=None):
+    """
+    Displays statistics about the OCR results, plus any extra counters in `stats`
+    (OCRCache.stats() keys, and CascadePolicy.stats() under 'cascade').
+    """
     if total > 0:
         print(f"Percentage less than 80% confidence score is {bad / total * 100:.2f}% with {bad} possibly wrong")
     else:
@@ -223,6 +569,11 @@ def display_statistics(total, bad, easyocr_count, paddleocr_count):
     print("OCR verification complete. Results saved to CSV.")
     print(f"Results using EasyOCR: {easyocr_count}")
     print(f"Results using PaddleOCR: {paddleocr_count}")
+    print(f"Blank cells skipped: {blank_count}")
+    if stats and 'cache_hits' in stats:
+        print(f"OCR cache: {stats['cache_hits']} hits, {stats['cache_misses']} misses ({stats['cache_hit_rate'] * 100:.1f}% hit rate)")
+    if stats and 'cascade' in stats:
+        print(f"Fallback cascade: {format_cascade_stats(stats['cascade'])}")
 
 def cleanup(storedir):
     """Delete temporary files and directory."""
@@ -238,20 +589,11 @@ def cleanup(storedir):
     except Exception as e:
         print(f"Error removing directory {storedir}: {e}")
 
-def initialize_paddleocr(use_gpu):
-    """Initializes and returns a PaddleOCR engine."""
+def initialize_paddleocr(use_gpu, rec_batch_num=6):
+    """Initializes and returns a PaddleOCR engine. rec_batch_num is the recognizer's internal batch size."""
     ocr = PaddleOCR(
-        use_angle_cls=True,
-        lang='en',
-        rec_model_dir='en_PP-OCRv4_rec',
-        version='PP-OCRv4',
-        det_db_thresh=0.35,
-        det_db_box_thresh=0.45,
-        det_db_unclip_ratio=1.8,
-        cls_thresh=0.95,
-        use_space_char=True,
-        rec_image_shape='3, 48, 320',
-        det_limit_side_len=960,
+        **PADDLEOCR_SETTINGS,
+        rec_batch_num=rec_batch_num,
         use_gpu=use_gpu
     )
     return ocr
@@ -264,39 +606,30 @@ def initialize_easyocr(use_gpu):
 def main():
     start_time = time.time()
 
-    storedir = "temp"
-    if not os.path.exists(storedir):
-        os.makedirs(storedir)
-
     pdf_file = Path("..") / "Examples" / "2Page_AUSTRIA_1890_T2_g0bp.pdf"
     if not pdf_file.exists():
         raise FileNotFoundError(f"PDF file not found: {pdf_file.resolve()}")
 
-    # Convert PDF to images
-    image_list = convert_pdf_to_images(str(pdf_file), storedir, dpi=400)
-
-    # Detect tables and cellularize
-    TableMap = detect_tables_in_images(image_list)
-    locationlists = cellularize_images(image_list, TableMap)
-
     output_csv = 'output.csv'
 
-    # Flatten the list of image filenames
-    all_filenames = [filename for collection in locationlists for filename in collection]
-
     # Initialize OCR engines once in the main thread
     use_gpu = paddle.device.is_compiled_with_cuda()
-    ocr = initialize_paddleocr(use_gpu)
-    reader = initialize_easyocr(use_gpu)
-
-    # Process images
-    results = process_all_images(all_filenames, ocr, reader)
-
-    # Process the results
-    table_data, total, bad, easyocr_count, paddleocr_count, low_confidence_results = process_results(results)
-
-    # Write results to CSV
-    write_results_to_csv(table_data, output_csv)
+    # (or connect to the shared engine server when OCR_ENGINE_SERVER is set)
+    ocr, reader = engine_server.get_engines(use_gpu)
+
+    # Render, detect, cellularize and OCR page by page, appending each page to the CSV;
+    # results for cells already OCR'd in a previous run are reused
+    pipeline = Pipeline(queue_size=2)
+    policy = make_cascade_policy()
+    # Kept next to the output, not in whatever directory the script is run from
+    cache_path = os.path.join(os.path.dirname(os.path.abspath(output_csv)), CACHE_FILENAME)
+    with OCRCache(cache_path, fingerprint=ocr_fingerprint(policy=policy)) as cache:
+        total, bad, easyocr_count, paddleocr_count, blank_count, low_confidence_results = stream_pdf_to_csv(
+            str(pdf_file), output_csv, ocr, reader, dpi=400, cache=cache, pipeline=pipeline, policy=policy
+        )
+        stats = cache.stats()
+    stats['cascade'] = policy.stats()
+    print(f"Pipeline stages: {format_metrics(pipeline.metrics())}")
 
     # Print low-confidence results
     if low_confidence_results:
@@ -305,10 +638,7 @@ def main():
             print(msg)
 
     # Display statistics
-    display_statistics(total, bad, easyocr_count, paddleocr_count)
-
-    # Cleanup
-    cleanup(storedir)
+    display_statistics(total, bad, easyocr_count, paddleocr_count, blank_count, stats)
 
     end_time = time.time()
     elapsed_time = end_time - start_time
@@ -1 +1 @@
-__all__ = ["luminositybased"]
+__all__ = ["luminositybased", "extrema", "luminosity"]
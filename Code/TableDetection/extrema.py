@@ -0,0 +1,81 @@
+"""
+Vectorised local-extremum search over luminosity profiles.
+
+`find_peaks`/`find_troughs` in both luminosity detectors compare every sample of
+a row/column profile against its `pointgap - 1` neighbours on each side in pure
+Python. The functions here compute the same thing with sliding-window min/max
+over strided views, so a 400-DPI page costs a handful of NumPy calls instead of
+tens of millions of interpreted comparisons.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+ENGINES = ("python", "numpy")
+
+
+def check_engine(engine):
+    """Raise ValueError for an unknown peak/trough engine name."""
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown extrema engine '{engine}', expected one of {ENGINES}")
+
+
+def _neighbour_windows(profile, width, edge_fill):
+    """
+    Return the left and right neighbour windows of every sample.
+
+    Row i of the left window holds profile[i - width:i] using Python's negative
+    index wrap-around (which is what the original loops do for i - offset < 0).
+    Row i of the right window holds profile[i + 1:i + width + 1]. Positions the
+    loops could not index at all are filled with `edge_fill`.
+    """
+    n = len(profile)
+    left_index = np.arange(-width, n - 1)
+    left = np.take(profile, left_index, mode='wrap')
+    left[left_index < -n] = edge_fill
+    right = np.concatenate([profile[1:], np.full(width, edge_fill, dtype=profile.dtype)])
+    return sliding_window_view(left, width), sliding_window_view(right, width)
+
+
+def find_extrema(profile, pointgap, kind="peak", truncate_edges=False):
+    """
+    Find strict local minima ("peak", darkest) or maxima ("trough", lightest) in a profile.
+
+    A sample i (1 <= i < len(profile) - 1) is reported when it is strictly lower
+    (peak) or higher (trough) than every sample up to `pointgap - 1` positions
+    away on both sides. Indices match the pure-Python loops exactly.
+
+    @param profile: 1-D sequence of average luminosity values.
+    @param pointgap: Neighbourhood size; offsets 1..pointgap-1 are compared.
+    @param kind: "peak" for the darkest points, "trough" for the lightest.
+    @param truncate_edges: False reproduces luminosity_table_detection, where a
+                           neighbour past the end of the profile disqualifies the
+                           sample and pointgap <= 1 accepts every sample. True
+                           reproduces TableDetection.luminositybased, which skips
+                           neighbours past the end and reports nothing for
+                           pointgap <= 1.
+    @return: List of int indices in ascending order.
+    """
+    if kind not in ("peak", "trough"):
+        raise ValueError(f"kind must be 'peak' or 'trough', got '{kind}'")
+
+    profile = np.asarray(profile, dtype=np.float64)
+    n = len(profile)
+    if n < 3:
+        return []
+
+    width = int(pointgap) - 1
+    if width <= 0:
+        return [] if truncate_edges else list(range(1, n - 1))
+
+    if kind == "peak":
+        edge_fill = np.inf if truncate_edges else -np.inf
+        left, right = _neighbour_windows(profile, width, edge_fill)
+        mask = (profile < left.min(axis=1)) & (profile < right.min(axis=1))
+    else:
+        edge_fill = -np.inf if truncate_edges else np.inf
+        left, right = _neighbour_windows(profile, width, edge_fill)
+        mask = (profile > left.max(axis=1)) & (profile > right.max(axis=1))
+
+    mask[0] = mask[-1] = False
+    return np.flatnonzero(mask).tolist()
@@ -0,0 +1,71 @@
+"""
+uint8 luminosity and row/column luminosity profiles for table detection.
+
+`calculate_luminosity` in both detectors builds a float64 RGB copy of the page
+and a float64 luminosity plane before averaging it along each axis: several
+hundred MB of temporaries for a 400-DPI page. The profiles only need the row
+and column sums, so this module keeps the page as 8-bit luminosity (a view when
+the page already is grayscale), sums it in bands of rows that stay in cache,
+with integer accumulators, and returns the averages - a few KB.
+"""
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# Rows summed per band; 256 rows of a 400-DPI page are ~1.2 MB of uint8
+TILE_ROWS = 256
+
+
+def to_luminosity(image):
+    """
+    Returns a page as a 2-D uint8 luminosity (ITU-R 601-2 luma) array.
+
+    @param image: Path (image file or .npy array), PIL Image or (H, W) / (H, W, 3) / (H, W, 4)
+                  uint8 array. Grayscale arrays and mode "L" images are returned without copying.
+    """
+    if isinstance(image, np.ndarray):
+        if image.ndim == 2:
+            return image
+        code = cv2.COLOR_RGBA2GRAY if image.shape[2] == 4 else cv2.COLOR_RGB2GRAY
+        return cv2.cvtColor(np.ascontiguousarray(image), code)
+    if not isinstance(image, Image.Image):
+        if str(image).lower().endswith('.npy'):
+            # Raw pages (image_store "npy") are mapped, not decoded
+            return to_luminosity(np.load(image, mmap_mode='r', allow_pickle=False))
+        with Image.open(image) as opened:
+            return np.asarray(opened.convert('L'))
+    return np.asarray(image if image.mode == 'L' else image.convert('L'))
+
+
+def luminosity_sums(image, tile_rows=TILE_ROWS):
+    """
+    Row and column sums of a page's luminosity, in one pass over bands of rows.
+
+    @param image: Anything to_luminosity accepts.
+    @return: (row_sums, col_sums) as uint64 arrays of length H and W.
+    """
+    luminosity = to_luminosity(image)
+    height, width = luminosity.shape
+    row_sums = np.empty(height, dtype=np.uint64)
+    col_sums = np.zeros(width, dtype=np.uint64)
+    for start in range(0, height, max(1, tile_rows)):
+        band = luminosity[start:start + tile_rows]
+        # uint32 holds the sum of up to 16M uint8 values, more than any row or band column
+        row_sums[start:start + len(band)] = band.sum(axis=1, dtype=np.uint32)
+        col_sums += band.sum(axis=0, dtype=np.uint32)
+    return row_sums, col_sums
+
+
+def luminosity_profiles(image, tile_rows=TILE_ROWS):
+    """
+    Average luminosity of every row and every column of a page.
+
+    Equivalent to np.mean(calculate_luminosity(image), axis=1) and axis=0, without
+    the full-page float arrays.
+
+    @return: (row_profile, col_profile) float64 arrays of length H and W.
+    """
+    row_sums, col_sums = luminosity_sums(image, tile_rows)
+    width, height = len(col_sums), len(row_sums)
+    return row_sums / max(width, 1), col_sums / max(height, 1)
@@ -1,17 +1,18 @@
 from PIL import Image, ImageDraw
 import numpy as np
+from TableDetection import extrema
+from TableDetection.luminosity import to_luminosity, luminosity_profiles
 
 def calculate_luminosity(image):
-    # Convert the image to RGB (if it's not already)
-    image = image.convert('RGB')
-    pixels = np.array(image)
-    # Apply luminosity formula
-    luminosity = 0.299 * pixels[:, :, 0] + 0.587 * pixels[:, :, 1] + 0.114 * pixels[:, :, 2]
-    return luminosity
-
-def find_peaks(axis,luminosity,pointgap):
-    # Calculate the average luminosity
-    avg_luminosity = np.mean(luminosity, axis)
+    # uint8 luminosity (0.299 R + 0.587 G + 0.114 B), no float copies of the page
+    return to_luminosity(image)
+
+def find_peaks(axis,luminosity,pointgap,engine="python"):
+    extrema.check_engine(engine)
+    # Calculate the average luminosity (luminosity may already be a 1-D profile)
+    avg_luminosity = luminosity if np.ndim(luminosity) == 1 else np.mean(luminosity, axis)
+    if engine == "numpy":
+        return extrema.find_extrema(avg_luminosity, pointgap, kind="peak", truncate_edges=True)
     # Find peaks: we consider a point as a peak if it's lower than its neighbors
     peaks = []
     error_count=0
@@ -35,9 +36,12 @@ def find_peaks(axis,luminosity,pointgap):
     return peaks
 
 
-def find_troughs(axis,luminosity,pointgap):
-    # Calculate the average luminosity for each column
-    avg_luminosity = np.mean(luminosity, axis)
+def find_troughs(axis,luminosity,pointgap,engine="python"):
+    extrema.check_engine(engine)
+    # Calculate the average luminosity for each column (luminosity may already be a 1-D profile)
+    avg_luminosity = luminosity if np.ndim(luminosity) == 1 else np.mean(luminosity, axis)
+    if engine == "numpy":
+        return extrema.find_extrema(avg_luminosity, pointgap, kind="trough", truncate_edges=True)
     # Find troughs: we consider a point as a trough if it's lower than its neighbors
     troughs = []
     error_count=0
@@ -82,28 +86,30 @@ def draw_vertical_lines(image, lines):
 
 
 
-def findTable(image_path="Image/Path/here",HorizontalState = "border",VerticalState = "border",horizontalgap = 17/2077, verticalgap = 80/1474):
+def findTable(image_path="Image/Path/here",HorizontalState = "border",VerticalState = "border",horizontalgap = 17/2077, verticalgap = 80/1474, engine="numpy"):
 
     #Gap between peaks/troughs before consider new peak/trough
+    #engine selects the peak/trough search: "numpy" (vectorised) or "python" (original loops)
+    extrema.check_engine(engine)
 
-    image = Image.open(image_path)
-    # Process image
-    wid, hgt = image.size
+    #image_path may also be an in-memory PIL image or array (e.g. a page being streamed);
+    #paths are read by to_luminosity, .npy pages memory-mapped rather than decoded
+    # Row and column luminosity profiles straight from the uint8 page
+    row_profile, col_profile = luminosity_profiles(image_path)
+    wid, hgt = len(col_profile), len(row_profile)
 
-    luminosity = calculate_luminosity(image)
     if (HorizontalState == "border"):
-        Horizontal = find_peaks(1,luminosity,round(hgt*horizontalgap))
+        Horizontal = find_peaks(1,row_profile,round(hgt*horizontalgap),engine)
     else:
-        Horizontal = find_troughs(1,luminosity,round(hgt*horizontalgap)) 
+        Horizontal = find_troughs(1,row_profile,round(hgt*horizontalgap),engine)
     if (VerticalState == "border"):
-        Vertical = find_peaks(0,luminosity,round(wid*verticalgap))
+        Vertical = find_peaks(0,col_profile,round(wid*verticalgap),engine)
     else:
-        Vertical = find_troughs(0,luminosity,round(wid*verticalgap)) 
+        Vertical = find_troughs(0,col_profile,round(wid*verticalgap),engine)
     
 
-    result_image = draw_lines(image, Horizontal) 
-    final_image = draw_vertical_lines(image, Vertical)
-
+    #The lines are no longer drawn on every page read from disk; to inspect them:
+    #final_image = draw_vertical_lines(draw_lines(Image.open(image_path), Horizontal), Vertical)
     #final_image.save('output_image_with_lines.png')
     #final_image.show()
 
@@ -0,0 +1,151 @@
+# background_detection.py
+
+import logging
+import threading
+from collections import deque
+
+from TableDetection import luminositybased
+
+
+def detect_page_table(page, table_style="borderless"):
+    """
+    Detects the table on one page (path, PIL image or array).
+
+    @param table_style: "borderless" or "border", see RunThroughTest.detect_tables_in_images.
+    @return: TableMap page entry: [row (top, bottom) pairs, column (left, right) pairs].
+    """
+    TableCoords = luminositybased.findTable(page, table_style, table_style)
+    return [luminositybased.convert_to_pairs(CordList) for CordList in TableCoords]
+
+
+class BackgroundTableDetector:
+    """
+    Detects the tables of a document's pages on worker threads, so the GUI never waits
+    for detection.
+
+    Pages are queued in document order; prioritize() moves a page (the visible one) to
+    the front. Each page's table is detected once and cached until invalidated. Results
+    are handed to on_result(page_index, table) on the worker thread that found them, so
+    a GUI forwards them with a queued signal.
+
+    Example:
+    --------
+    detector = BackgroundTableDetector(provider.get_array, on_result, max_workers=2)
+    detector.submit(range(provider.page_count))
+    detector.prioritize(current_page)    # detected next
+    detector.get(3)                      # cached table of page 3, or None
+    detector.close()                     # another document was opened
+    """
+
+    def __init__(self, load_page, on_result, on_error=None, max_workers=2, table_style="borderless", detect=detect_page_table):
+        """
+        @param load_page: Function returning the pixels (or path) of a page index; called on a worker thread.
+        @param on_result: Called with (page_index, table) when a page's table is detected.
+        @param on_error: Called with (page_index, exception) when detection fails.
+        @param max_workers: Number of detection threads.
+        @param table_style: Passed to detect.
+        @param detect: Function detecting the table of one page, see detect_page_table.
+        """
+        self.load_page = load_page
+        self.on_result = on_result
+        self.on_error = on_error
+        self.table_style = table_style
+        self.detect = detect
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._tables = {}
+        self._queue = deque()
+        self._running = set()
+        # Bumped by invalidate(), so results of pages detected before are dropped
+        self._generation = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._threads = [threading.Thread(target=self._work, name=f"table-detection-{index}", daemon=True) for index in range(max_workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, page_indices):
+        """Queues pages for detection, after the pages already queued; cached and queued pages are skipped."""
+        with self._condition:
+            for page_index in page_indices:
+                if page_index not in self._tables and page_index not in self._queue and page_index not in self._running:
+                    self._queue.append(page_index)
+            self._condition.notify_all()
+
+    def prioritize(self, page_index):
+        """Detects the page next, unless its table is cached or being detected already."""
+        with self._condition:
+            if page_index in self._tables or page_index in self._running:
+                return
+            if page_index in self._queue:
+                self._queue.remove(page_index)
+            self._queue.appendleft(page_index)
+            self._condition.notify()
+
+    def get(self, page_index):
+        """The cached table of a page, or None if it has not been detected yet."""
+        with self._condition:
+            return self._tables.get(page_index)
+
+    def tables(self):
+        """{page_index: table} of every page detected so far."""
+        with self._condition:
+            return dict(self._tables)
+
+    def invalidate(self, page_index=None):
+        """Forgets the table of a page (default: all pages); pages being detected are detected again when resubmitted."""
+        with self._condition:
+            self._generation += 1
+            if page_index is None:
+                self._tables.clear()
+            else:
+                self._tables.pop(page_index, None)
+
+    @property
+    def closed(self):
+        """True once close() was called; load_page may check it to stop waiting for a page."""
+        with self._condition:
+            return self._closed
+
+    def wait(self, timeout=None):
+        """Waits until no page is queued or being detected; returns False on timeout."""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._closed or not (self._queue or self._running), timeout)
+
+    def close(self):
+        """Drops the queued pages and stops the workers once their current page is done; results after this are not reported."""
+        with self._condition:
+            self._closed = True
+            self._queue.clear()
+            self._condition.notify_all()
+
+    def _work(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._closed or self._queue)
+                if self._closed:
+                    return
+                page_index = self._queue.popleft()
+                self._running.add(page_index)
+                generation = self._generation
+            try:
+                table = self.detect(self.load_page(page_index), self.table_style)
+                error = None
+            except Exception as e:
+                table, error = None, e
+            with self._condition:
+                self._running.discard(page_index)
+                report = not self._closed and generation == self._generation
+                if report and error is None:
+                    self._tables[page_index] = table
+                self._condition.notify_all()
+            if not report:
+                continue
+            try:
+                if error is None:
+                    self.on_result(page_index, table)
+                elif self.on_error is not None:
+                    self.on_error(page_index, error)
+                else:
+                    self.logger.warning(f"Table detection on page {page_index + 1} failed: {error}")
+            except Exception as e:
+                self.logger.error(f"Handling the table of page {page_index + 1} failed: {e}", exc_info=True)
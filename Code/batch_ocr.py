@@ -0,0 +1,255 @@
+"""
+Headless batch OCR over many PDFs.
+
+Every PDF matched by the input globs is streamed through the OCR pipeline
+(RunThroughTest.stream_pdf_to_csv) and written to <outdir>/<name>.csv. Documents
+are processed concurrently on worker processes that each load the OCR engines
+once. A document's CSV only appears once it is complete, so re-running the same
+command after a crash skips finished documents. A JSON run summary is written to
+<outdir>/run_summary.json after every document; the next run in the same outdir
+keeps the PDF -> CSV names it records.
+
+Usage (from Code/):
+    python -m batch_ocr "../Examples/*.pdf" "/scans/**/*.pdf" --outdir results
+        [--dpi 400] [--method borderless|border] [--workers 2] [--detect-workers 2]
+        [--batch-size 32] [--gpu] [--force] [--engine-server] [--adaptive-cascade]
+"""
+
+import os
+import sys
+import glob
+import json
+import hashlib
+import time
+import argparse
+import multiprocessing
+import concurrent.futures
+from pathlib import Path
+
+SUMMARY_FILENAME = "run_summary.json"
+
+# Engines owned by the current worker process, built once by _init_worker
+_worker_ocr = None
+_worker_reader = None
+
+
+def find_pdfs(patterns):
+    """Expands the input globs (recursive ** allowed) into a sorted list of unique PDF paths."""
+    paths = set()
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True) or ([pattern] if os.path.isfile(pattern) else [])
+        paths.update(os.path.abspath(path) for path in matches if path.lower().endswith('.pdf'))
+    return sorted(paths)
+
+
+def path_hash(pdf_path, length=8):
+    """Short hexadecimal hash of a PDF's absolute path."""
+    return hashlib.sha1(os.path.abspath(pdf_path).encode('utf-8')).hexdigest()[:length]
+
+
+def output_names(pdf_paths, previous=None):
+    """
+    Maps each PDF to a CSV file name: its stem, or stem_<hash of its path> if another
+    input shares the stem. A PDF keeps the name an earlier run gave it (previous), so
+    resuming does not depend on which other PDFs are processed.
+
+    @param previous: {pdf path: CSV file name} of an earlier run, see read_previous_names.
+    @return: {pdf path: CSV file name}, the names all distinct.
+    """
+    previous = previous or {}
+    names = {}
+    # CSVs of earlier documents that are not inputs now still belong to them
+    taken = {name for pdf_path, name in previous.items() if pdf_path not in pdf_paths}
+    for pdf_path in pdf_paths:
+        name = previous.get(pdf_path)
+        if name is not None and name not in taken:
+            names[pdf_path] = name
+            taken.add(name)
+
+    # Stems of every input and earlier document, so a new PDF never takes a name another one had
+    stems = [Path(pdf_path).stem for pdf_path in set(pdf_paths) | set(previous)]
+    for pdf_path in pdf_paths:
+        if pdf_path in names:
+            continue
+        stem = Path(pdf_path).stem
+        candidates = [f"{stem}.csv"] if stems.count(stem) == 1 else []
+        candidates += [f"{stem}_{path_hash(pdf_path, length)}.csv" for length in (8, 16, 40)]
+        name = next((candidate for candidate in candidates if candidate not in taken), None)
+        if name is None:
+            raise ValueError(f"No unique CSV name for {pdf_path}")
+        names[pdf_path] = name
+        taken.add(name)
+    return names
+
+
+def read_previous_names(outdir):
+    """{pdf path: CSV file name} recorded in the run summary of an earlier run in outdir, if any."""
+    try:
+        with open(os.path.join(outdir, SUMMARY_FILENAME), encoding='utf-8') as file:
+            documents = json.load(file).get('documents', [])
+    except (OSError, ValueError):
+        return {}
+    return {document['pdf']: os.path.basename(document['csv']) for document in documents if document.get('pdf') and document.get('csv')}
+
+
+def _init_worker(use_gpu, rec_batch_num=6, shared_engines=False):
+    """Process-pool initializer: loads PaddleOCR and EasyOCR (or connects to the engine server) once per worker process."""
+    global _worker_ocr, _worker_reader
+    import engine_server
+    _worker_ocr, _worker_reader = engine_server.get_engines(use_gpu, rec_batch_num, shared=shared_engines)
+
+
+def process_document(pdf_path, csv_path, dpi=400, table_style="borderless", detect_workers=2, batch_size=None, adaptive_cascade=False):
+    """
+    OCRs one PDF into csv_path inside a worker process.
+
+    Rows are streamed into csv_path + '.part', which is renamed to csv_path only once
+    the whole document is done.
+
+    @param adaptive_cascade: Let the EasyOCR fallback learn per column when to skip
+                             (make_cascade_policy(learn=True)); off by default.
+    @return: Summary dict for the run summary.
+    """
+    import RunThroughTest as ocr_module
+    from pipeline import Pipeline
+
+    start_time = time.time()
+    part_path = csv_path + '.part'
+    pipeline = Pipeline(queue_size=2)
+    policy = ocr_module.make_cascade_policy(learn=adaptive_cascade)
+    total, bad, easyocr_count, paddleocr_count, blank_count, low_confidence_results = ocr_module.stream_pdf_to_csv(
+        pdf_path, part_path, _worker_ocr, _worker_reader,
+        dpi=dpi, batch_size=batch_size, pipeline=pipeline,
+        detect_workers=detect_workers, table_style=table_style, policy=policy
+    )
+    os.replace(part_path, csv_path)
+
+    return {
+        'pdf': pdf_path,
+        'csv': csv_path,
+        'status': 'done',
+        # A PDF without pages never reaches the OCR stage
+        'pages': pipeline.metrics().get('ocr', {}).get('items', 0),
+        'cells': total,
+        'low_confidence': bad,
+        'easyocr': easyocr_count,
+        'paddleocr': paddleocr_count,
+        'blank_skipped': blank_count,
+        'seconds': round(time.time() - start_time, 2),
+        'cascade': policy.stats(),
+    }
+
+
+def write_summary(path, summary):
+    """Writes the run summary atomically, so a crash never leaves a truncated file."""
+    with open(path + '.tmp', 'w', encoding='utf-8') as file:
+        json.dump(summary, file, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def run_batch(pdf_paths, outdir, dpi=400, table_style="borderless", workers=1, detect_workers=2, batch_size=None, use_gpu=False, force=False, shared_engines=False, adaptive_cascade=False):
+    """
+    Processes pdf_paths on `workers` worker processes and returns the run summary.
+
+    Documents whose CSV already exists in outdir are skipped unless force is set; CSV
+    names recorded by an earlier run in outdir are kept (see output_names).
+    """
+    os.makedirs(outdir, exist_ok=True)
+    summary_path = os.path.join(outdir, SUMMARY_FILENAME)
+    names = output_names(pdf_paths, read_previous_names(outdir))
+    start_time = time.time()
+    summary = {
+        'started': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'settings': {
+            'dpi': dpi,
+            'method': table_style,
+            'workers': workers,
+            'detect_workers': detect_workers,
+            'batch_size': batch_size,
+            'gpu': use_gpu,
+            'engine_server': shared_engines,
+            'adaptive_cascade': adaptive_cascade,
+        },
+        'documents': [],
+    }
+    documents = summary['documents']
+
+    pending = {}
+    for pdf_path, name in names.items():
+        csv_path = os.path.join(outdir, name)
+        if os.path.exists(csv_path) and not force:
+            documents.append({'pdf': pdf_path, 'csv': csv_path, 'status': 'skipped'})
+        else:
+            pending[pdf_path] = csv_path
+    print(f"{len(pending)} documents to process, {len(documents)} already done.")
+
+    # "spawn" avoids forking a process that holds Paddle threads
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(use_gpu, batch_size or 6, shared_engines)
+    ) as pool:
+        futures = {
+            pool.submit(process_document, pdf_path, csv_path, dpi, table_style, detect_workers, batch_size, adaptive_cascade): (pdf_path, csv_path)
+            for pdf_path, csv_path in pending.items()
+        }
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                pdf_path, csv_path = futures[future]
+                try:
+                    result = future.result()
+                    print(f"Done: {pdf_path} ({result['pages']} pages, {result['cells']} cells, {result['seconds']}s)")
+                except Exception as e:
+                    result = {'pdf': pdf_path, 'csv': csv_path, 'status': 'failed', 'error': str(e)}
+                    print(f"Failed: {pdf_path}: {e}")
+                documents.append(result)
+                summary['elapsed_seconds'] = round(time.time() - start_time, 2)
+                write_summary(summary_path, summary)
+        except KeyboardInterrupt:
+            for future in futures:
+                future.cancel()
+            raise
+
+    summary['finished'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+    summary['elapsed_seconds'] = round(time.time() - start_time, 2)
+    write_summary(summary_path, summary)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('inputs', nargs='+', help="PDF files or glob patterns (quote them; ** is recursive)")
+    parser.add_argument('--outdir', required=True, help="Directory for the per-document CSVs and the run summary")
+    parser.add_argument('--dpi', type=int, default=400)
+    parser.add_argument('--method', choices=['borderless', 'border'], default='borderless',
+                        help="Table detection: whitespace-separated (borderless) or ruled (border) tables")
+    parser.add_argument('--workers', type=int, default=1, help="Documents processed concurrently, one OCR engine set each")
+    parser.add_argument('--detect-workers', type=int, default=2, help="Table detection threads per document")
+    parser.add_argument('--batch-size', type=int, default=None, help="Use batched recognition with this many cells per batch")
+    parser.add_argument('--gpu', action='store_true', help="Run the OCR engines on the GPU")
+    parser.add_argument('--force', action='store_true', help="Re-process documents that already have a CSV")
+    parser.add_argument('--engine-server', action='store_true',
+                        help="Use the shared OCR engine server (python -m engine_server) instead of loading models per worker; "
+                             "it runs one request at a time, so workers no longer OCR in parallel")
+    parser.add_argument('--adaptive-cascade', action='store_true',
+                        help="Learn per column when the EasyOCR fallback can be skipped (may change results)")
+    args = parser.parse_args(argv)
+
+    pdf_paths = find_pdfs(args.inputs)
+    if not pdf_paths:
+        parser.error("no PDF files matched the inputs")
+
+    summary = run_batch(
+        pdf_paths, args.outdir, dpi=args.dpi, table_style=args.method, workers=args.workers,
+        detect_workers=args.detect_workers, batch_size=args.batch_size, use_gpu=args.gpu, force=args.force,
+        shared_engines=args.engine_server, adaptive_cascade=args.adaptive_cascade
+    )
+    failed = [document for document in summary['documents'] if document['status'] == 'failed']
+    print(f"Summary written to {os.path.join(args.outdir, SUMMARY_FILENAME)}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,116 @@
+# blank_cells.py
+
+import cv2
+import numpy as np
+
+# process_image result source for cells skipped as blank
+BLANK_SOURCE = 'Blank cell'
+
+
+def to_gray(pixels):
+    """Returns a cell (PIL image or RGB/RGBA/grayscale array) as a 2-D uint8 array."""
+    pixels = np.asarray(pixels)
+    if pixels.ndim == 2:
+        return pixels
+    if pixels.shape[2] == 4:
+        return cv2.cvtColor(np.ascontiguousarray(pixels), cv2.COLOR_RGBA2GRAY)
+    return cv2.cvtColor(np.ascontiguousarray(pixels), cv2.COLOR_RGB2GRAY)
+
+
+class BlankCellDetector:
+    """
+    Decides from the pixels alone whether a table cell is empty, so it can skip OCR.
+
+    A cell is blank when, after trimming a margin (where ruling lines and the
+    neighbouring cells' ink end up) and removing lines running through it, it has
+    almost no dark pixels, or all of its dark pixels form specks smaller than a
+    character stroke or long thin lines.
+
+    fit() tunes the dark threshold (from Otsu over a sample of the document's cells)
+    and the speck size (from the median cell height) to one document.
+
+    Example:
+    --------
+    detector = BlankCellDetector()
+    detector.fit_once([cell.image for cell in cells])
+    to_ocr = [cell for cell in cells if not detector.is_blank(cell.image)]
+    """
+
+    def __init__(self, dark_threshold=128, min_ink_ratio=0.002, min_component_area=12, margin=0.08):
+        """
+        @param dark_threshold: Gray level below which a pixel counts as ink.
+        @param min_ink_ratio: Cells with a smaller share of ink pixels are blank without further checks.
+        @param min_component_area: Ink blobs smaller than this many pixels are treated as noise.
+        @param margin: Fraction of the cell's shorter side ignored on each side.
+        """
+        self.dark_threshold = dark_threshold
+        self.min_ink_ratio = min_ink_ratio
+        self.min_component_area = min_component_area
+        self.margin = margin
+        self.fitted = False
+        self.checked = 0
+        self.blank = 0
+
+    def fit(self, images, max_samples=200):
+        """Tunes dark_threshold and min_component_area to the cells of one document."""
+        images = list(images)
+        if not images:
+            return self
+        step = max(1, len(images) // max_samples)
+        sample = [to_gray(image) for image in images[::step]]
+        pixels = np.concatenate([gray.ravel() for gray in sample if gray.size])
+        if pixels.size:
+            otsu, _ = cv2.threshold(pixels.reshape(1, -1), 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+            paper = np.median(pixels)
+            # Halfway between the Otsu split and the paper, so faded text still counts as ink;
+            # a nearly empty sample has no real split, so keep the threshold in a sane range
+            self.dark_threshold = int(np.clip((otsu + paper) / 2, 64, 224))
+        median_height = float(np.median([gray.shape[0] for gray in sample]))
+        # Specks smaller than a full stop at this text size are noise
+        self.min_component_area = max(4, int((0.08 * median_height) ** 2))
+        self.fitted = True
+        return self
+
+    def fit_once(self, images):
+        """Calls fit() on the first batch of cells of a document only."""
+        if not self.fitted:
+            self.fit(images)
+        return self
+
+    def is_blank(self, pixels):
+        """True if the cell holds no text."""
+        self.checked += 1
+        gray = to_gray(pixels)
+        height, width = gray.shape
+        # Same margin on all sides, from the short side: wide cells keep text near their edges
+        margin = int(min(height, width) * self.margin)
+        inner = gray[margin:height - margin, margin:width - margin]
+        if inner.size == 0:
+            self.blank += 1
+            return True
+
+        ink = inner < self.dark_threshold
+        # Ruling lines running through the cell: rows/columns that are almost all ink
+        ink[ink.mean(axis=1) >= 0.8, :] = False
+        ink[:, ink.mean(axis=0) >= 0.8] = False
+        if np.count_nonzero(ink) < self.min_ink_ratio * ink.size:
+            self.blank += 1
+            return True
+
+        count, _, stats, _ = cv2.connectedComponentsWithStats(ink.view(np.uint8), connectivity=8)
+        stats = stats[1:]  # Label 0 is the background
+        inner_height, inner_width = inner.shape
+        thin = max(3, 0.1 * min(inner_height, inner_width))
+        is_text = (
+            (stats[:, cv2.CC_STAT_AREA] >= self.min_component_area)
+            # Broken or slightly skewed ruling lines: spanning most of the cell but only a few pixels thick
+            & ~((stats[:, cv2.CC_STAT_WIDTH] >= 0.8 * inner_width) & (stats[:, cv2.CC_STAT_HEIGHT] <= thin))
+            & ~((stats[:, cv2.CC_STAT_HEIGHT] >= 0.8 * inner_height) & (stats[:, cv2.CC_STAT_WIDTH] <= thin))
+        )
+        if is_text.any():
+            return False
+        self.blank += 1
+        return True
+
+    def stats(self):
+        return {'blank_checked': self.checked, 'blank_skipped': self.blank}
@@ -0,0 +1,341 @@
+"""
+Local OCR engine server: one long-lived process owns the loaded PaddleOCR and
+EasyOCR models and serves recognition requests over multiprocessing.managers,
+so the GUI, the batch pipeline and tests connect in milliseconds instead of
+loading the models again.
+
+Usage (from Code/):
+    python -m engine_server           # run the server in the foreground
+    python -m engine_server --stop    # stop a running server
+
+Clients normally call get_engines(shared=True), which starts the server in the
+background on first use. Setting OCR_ENGINE_SERVER=1 makes shared the default.
+
+The server runs one request at a time (see EngineService): it saves loading the
+models per process, not OCR time. Several clients sharing it, e.g. the workers of a
+ParallelOCRExecutor with shared_engines=True, are fully serialized and also pay for
+pickling every image, so use it for parallel work only when memory forbids one model
+set per worker.
+
+The socket and the authentication key live in a per-user runtime directory
+(runtime_dir) that only the user can access. The key file is checked before it is
+trusted, since anyone holding the key can make the server unpickle their data.
+"""
+
+import os
+import sys
+import stat
+import time
+import argparse
+import threading
+import subprocess
+import multiprocessing
+from multiprocessing.connection import Client
+from multiprocessing.managers import BaseManager, dispatch
+
+_RUNTIME_NAME = "ocr_engines"
+# Files in the runtime directory
+SOCKET_FILENAME = "engines.sock"
+KEY_FILENAME = "engines.key"
+# Windows only: the localhost TCP address the running server listens on
+ADDRESS_FILENAME = "engines.address"
+
+
+def _check_private(info, path):
+    """Raises PermissionError unless a stat result belongs to the current user and grants no group or other access."""
+    if os.name == 'nt':
+        return
+    if info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f"{path} must be owned by the current user and not accessible by others (mode 0700/0600)")
+
+
+def runtime_dir():
+    """
+    Per-user directory for the server's socket and key: $XDG_RUNTIME_DIR/ocr_engines,
+    else ~/.cache/ocr_engines (%LOCALAPPDATA%\\ocr_engines on Windows). It is created
+    with mode 0700, and an existing one is only used if it is a directory of the current
+    user that nobody else can access.
+    """
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), 'AppData', 'Local')
+    else:
+        base = os.environ.get('XDG_RUNTIME_DIR') or os.path.join(os.path.expanduser('~'), '.cache')
+    path = os.path.join(base, _RUNTIME_NAME)
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode):
+        raise PermissionError(f"{path} is not a directory")
+    _check_private(info, path)
+    return path
+
+
+def default_address():
+    """
+    Unix socket in the runtime directory on POSIX. On Windows, the localhost TCP address
+    the running server recorded in the runtime directory, or any free port (port 0) for a
+    new server.
+    """
+    if os.name != 'nt':
+        return os.path.join(runtime_dir(), SOCKET_FILENAME)
+    try:
+        with open(os.path.join(runtime_dir(), ADDRESS_FILENAME), encoding='utf-8') as file:
+            host, port = file.read().split()
+        return (host, int(port))
+    except (OSError, ValueError):
+        return ('127.0.0.1', 0)
+
+
+def _record_address(address):
+    """Windows: records the TCP address the server listens on, for default_address."""
+    path = os.path.join(runtime_dir(), ADDRESS_FILENAME)
+    with open(path + '.tmp', 'w', encoding='utf-8') as file:
+        file.write(f"{address[0]} {address[1]}")
+    os.replace(path + '.tmp', path)
+
+
+def default_authkey():
+    """
+    Per-user random key, created on first use in a file only the user can read. An
+    existing key file is rejected (PermissionError) unless it belongs to the user and
+    grants no group or other access.
+    """
+    path = os.path.join(runtime_dir(), KEY_FILENAME)
+    nofollow = getattr(os, 'O_NOFOLLOW', 0)
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | nofollow, 0o600)
+    except FileExistsError:
+        fd = os.open(path, os.O_RDONLY | nofollow)
+        with os.fdopen(fd, 'rb') as file:
+            _check_private(os.fstat(file.fileno()), path)
+            key = file.read()
+        if not key:
+            raise PermissionError(f"{path} is empty")
+        return key
+    with os.fdopen(fd, 'wb') as file:
+        key = os.urandom(32)
+        file.write(key)
+    return key
+
+
+def _load_local_engines(use_gpu, rec_batch_num):
+    import RunThroughTest as ocr_module
+    return ocr_module.initialize_paddleocr(use_gpu, rec_batch_num=rec_batch_num), ocr_module.initialize_easyocr(use_gpu)
+
+
+class EngineService:
+    """
+    Server-side object holding one (PaddleOCR, EasyOCR) pair per (use_gpu, rec_batch_num)
+    requested by clients. All requests, of every client and engine pair, run one at a
+    time under a single lock, since the engines are not thread-safe: clients share the
+    loaded models, not their OCR throughput.
+    """
+
+    def __init__(self, factory=None):
+        """
+        @param factory: Callable(use_gpu, rec_batch_num) -> (paddle_engine, easyocr_reader);
+                        defaults to RunThroughTest.initialize_paddleocr/initialize_easyocr.
+        """
+        self._factory = factory or _load_local_engines
+        self._engines = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        key = tuple(key)
+        if key not in self._engines:
+            self._engines[key] = self._factory(*key)
+        return self._engines[key]
+
+    def ocr(self, key, image, cls=True):
+        """PaddleOCR.ocr on one image."""
+        with self._lock:
+            return self._get(key)[0].ocr(image, cls=cls)
+
+    def recognize(self, key, images):
+        """PaddleOCR recognizer only, on a batch of pre-cropped images (see perform_paddle_ocr_batch)."""
+        with self._lock:
+            return self._get(key)[0].text_recognizer(images)
+
+    def readtext(self, key, image, kwargs):
+        """EasyOCR readtext on one image."""
+        with self._lock:
+            return self._get(key)[1].readtext(image, **kwargs)
+
+    def load(self, key):
+        """Loads the engines for key ahead of the first request."""
+        with self._lock:
+            self._get(key)
+
+    def loaded(self):
+        return list(self._engines)
+
+    def ping(self):
+        return os.getpid()
+
+
+class _ServerManager(BaseManager):
+    pass
+
+
+class _ClientManager(BaseManager):
+    pass
+
+
+_ClientManager.register('engines')
+
+
+class RemotePaddleOCR:
+    """Stands in for a PaddleOCR engine (ocr() and text_recognizer()) backed by the engine server."""
+
+    def __init__(self, service, key):
+        self._service = service
+        self._key = key
+
+    def ocr(self, image, cls=True):
+        return self._service.ocr(self._key, image, cls)
+
+    def text_recognizer(self, images):
+        return self._service.recognize(self._key, images)
+
+
+class RemoteEasyOCR:
+    """Stands in for an easyocr.Reader (readtext()) backed by the engine server."""
+
+    def __init__(self, service, key):
+        self._service = service
+        self._key = key
+
+    def readtext(self, image, **kwargs):
+        return self._service.readtext(self._key, image, kwargs)
+
+
+def make_server(address=None, authkey=None, factory=None):
+    """Builds (but does not start) the manager server; call serve_forever() on the result."""
+    service = EngineService(factory)
+    _ServerManager.register('engines', callable=lambda: service)
+    manager = _ServerManager(address=address or default_address(), authkey=authkey or default_authkey())
+    server = manager.get_server()
+    if address is None and os.name == 'nt':
+        # Bound to a free port, which clients look up
+        _record_address(server.address)
+    return server
+
+
+def connect(address=None, authkey=None):
+    """
+    Connects to a running server and returns its EngineService proxy; raises
+    FileNotFoundError or ConnectionError if none is running.
+    """
+    address = address or default_address()
+    if isinstance(address, tuple) and address[1] == 0:
+        raise ConnectionRefusedError("No OCR engine server is running")
+    manager = _ClientManager(address=address, authkey=authkey or default_authkey())
+    manager.connect()
+    return manager.engines()
+
+
+def stop_server(address=None, authkey=None):
+    """Asks a running server to exit."""
+    conn = Client(address or default_address(), authkey=authkey or default_authkey())
+    try:
+        dispatch(conn, None, 'shutdown')
+    finally:
+        conn.close()
+
+
+def start_server(address=None, timeout=60):
+    """Starts the server as a detached background process and waits until it accepts connections."""
+    command = [sys.executable, '-m', 'engine_server']
+    if address is not None and not isinstance(address, tuple):
+        command += ['--address', address]
+    subprocess.Popen(
+        command,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+    deadline = time.time() + timeout
+    while True:
+        try:
+            return connect(address)
+        except (FileNotFoundError, ConnectionError):
+            if time.time() > deadline:
+                raise TimeoutError("OCR engine server did not start in time.")
+            time.sleep(0.2)
+
+
+def get_engines(use_gpu=False, rec_batch_num=6, shared=None, address=None):
+    """
+    Returns (paddle_engine, easyocr_reader).
+
+    @param shared: Use the engine server (starting it if needed) instead of loading the
+                   models in this process; its requests run one at a time for all clients.
+                   Defaults to the OCR_ENGINE_SERVER environment variable.
+    """
+    if shared is None:
+        shared = os.environ.get('OCR_ENGINE_SERVER', '') not in ('', '0')
+    if not shared:
+        return _load_local_engines(use_gpu, rec_batch_num)
+
+    try:
+        service = connect(address)
+    except (FileNotFoundError, ConnectionError):
+        service = start_server(address)
+    key = (bool(use_gpu), rec_batch_num)
+    service.load(key)
+    return RemotePaddleOCR(service, key), RemoteEasyOCR(service, key)
+
+
+def warm_up_image():
+    """A small table cell with a number in it: enough text for detection, recognition and EasyOCR to run."""
+    import cv2
+    import numpy as np
+
+    image = np.full((48, 160, 3), 255, dtype=np.uint8)
+    cv2.putText(image, "1234.5", (8, 34), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 0), 2, cv2.LINE_AA)
+    return image
+
+
+def warm_up(paddle_engine, easyocr_reader):
+    """
+    Runs one dummy inference through both engines, local or served, so that model
+    initialization, kernel selection and memory allocation happen before the first
+    real cell instead of during it.
+
+    @return: Seconds the warm-up took.
+    """
+    start = time.time()
+    image = warm_up_image()
+    paddle_engine.ocr(image, cls=True)
+    easyocr_reader.readtext(image, detail=1, paragraph=False)
+    return time.time() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--address', default=None, help="Unix socket path (default: in the per-user runtime directory)")
+    parser.add_argument('--stop', action='store_true', help="Stop a running server")
+    args = parser.parse_args(argv)
+
+    if args.stop:
+        stop_server(args.address)
+        return 0
+
+    try:
+        connect(args.address)
+        print(f"OCR engine server already running on {args.address or default_address()}")
+        return 0
+    except (FileNotFoundError, ConnectionError):
+        pass
+    address = args.address or default_address()
+    if isinstance(address, str) and os.path.exists(address):
+        os.remove(address)  # Stale socket from a server that did not exit cleanly
+    server = make_server(args.address)
+    print(f"OCR engine server listening on {server.address}")
+    server.serve_forever()
+    return 0
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,170 @@
+# image_bridge.py
+
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image
+
+# QImage format names for the array layouts handed to Qt
+GRAYSCALE = "Format_Grayscale8"
+RGB = "Format_RGB888"
+RGBA = "Format_RGBA8888"
+
+# Budget of the display pixmap cache: about 16 previews of an A4 page at 96 DPI (RGB),
+# or a handful of zoomed-in renderings
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def display_array(image):
+    """
+    Returns the pixels of a PIL image or NumPy array as a uint8 array Qt can wrap, with
+    the name of the matching QImage format.
+
+    Arrays that already have a displayable layout are returned as they are (memory-mapped
+    pages included); PIL images are read out once, without the split/merge round-trip.
+    Grayscale stays single-channel instead of being expanded to RGB.
+
+    @param image: PIL image, or (H, W), (H, W, 3) or (H, W, 4) uint8 array.
+    @return: (array, format name)
+    """
+    if isinstance(image, Image.Image):
+        if image.mode not in ("L", "RGB", "RGBA"):
+            image = image.convert("RGBA")
+        image = np.asarray(image)
+    array = np.asarray(image)
+    if array.dtype != np.uint8:
+        raise ValueError(f"Expected uint8 pixels, got {array.dtype}")
+    if array.ndim == 2:
+        image_format = GRAYSCALE
+    elif array.ndim == 3 and array.shape[2] == 3:
+        image_format = RGB
+    elif array.ndim == 3 and array.shape[2] == 4:
+        image_format = RGBA
+    else:
+        raise ValueError(f"Unsupported pixel layout: {array.shape}")
+    if not _wrappable(array):
+        array = np.ascontiguousarray(array)
+    return array, image_format
+
+
+def _wrappable(array):
+    """
+    True if QImage can point into the array as it is: rows may be strided (e.g. a crop of
+    a page), but the pixels of a row must be packed and the buffer 32-bit aligned.
+    """
+    channels = array.shape[2] if array.ndim == 3 else 1
+    packed = array.strides[1:] == ((channels, 1) if array.ndim == 3 else (1,))
+    return packed and array.strides[0] >= array.shape[1] * channels and array.ctypes.data % 4 == 0
+
+
+def to_qimage(image):
+    """
+    Wraps the pixels of a PIL image or NumPy array in a QImage without copying them.
+
+    The QImage points into the array, which is kept alive as an attribute of the returned
+    object: keep that object (not a C++ copy of it) for as long as it is drawn, or call
+    .copy() for an image that owns its pixels. QPixmap.fromImage makes its own copy, so
+    converting straight to a pixmap is always safe.
+
+    @param image: PIL image, or (H, W), (H, W, 3) or (H, W, 4) uint8 array.
+    @return: QImage sharing the array's memory.
+    """
+    from PyQt5.QtGui import QImage
+
+    array, image_format = display_array(image)
+    height, width = array.shape[:2]
+    # Passed by address: a strided array has no contiguous buffer, and Qt keeps no reference
+    qimage = QImage(array.ctypes.data, width, height, array.strides[0], getattr(QImage, image_format))
+    qimage._buffer = array
+    return qimage
+
+
+def to_qpixmap(image):
+    """Converts a PIL image or NumPy array to a QPixmap, with a single copy into the pixmap."""
+    from PyQt5.QtGui import QPixmap
+
+    return QPixmap.fromImage(to_qimage(image))
+
+
+def pixmap_nbytes(pixmap):
+    """Approximate memory held by a QPixmap."""
+    return pixmap.width() * pixmap.height() * pixmap.depth() // 8
+
+
+class PixmapCache:
+    """
+    Bounded LRU cache of display pixmaps keyed by (page, zoom), so a page shown before is
+    put back on screen without being rendered or converted again.
+
+    The cache is bounded by the memory of the pixmaps it holds; the least recently shown
+    ones are dropped first. It is meant for the GUI thread, like the pixmaps themselves.
+
+    Example:
+    --------
+    cache = PixmapCache(max_bytes=64 * 1024 * 1024)
+    pixmap = cache.get_or_create(page_index, zoom, lambda: to_qpixmap(provider.get_preview(page_index)))
+    cache.discard(page_index)   # the page changed, e.g. it was rotated
+    cache.clear()               # another document was opened
+    """
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES, cost=pixmap_nbytes):
+        """
+        @param max_bytes: Memory budget of the cached pixmaps. A single pixmap larger than
+                          this is still returned, but not kept.
+        @param cost: Function returning the memory of a cached value.
+        """
+        self.max_bytes = max_bytes
+        self.cost = cost
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def get(self, page, zoom):
+        """Returns the cached pixmap of the page at the zoom level, or None."""
+        key = (page, zoom)
+        if key not in self._items:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._items.move_to_end(key)
+        return self._items[key][0]
+
+    def put(self, page, zoom, pixmap):
+        """Caches the pixmap of the page at the zoom level, evicting the least recently used ones."""
+        key = (page, zoom)
+        self._remove(key)
+        size = self.cost(pixmap)
+        if size > self.max_bytes:
+            return pixmap
+        self._items[key] = (pixmap, size)
+        self.nbytes += size
+        while self.nbytes > self.max_bytes:
+            self._remove(next(iter(self._items)))
+        return pixmap
+
+    def get_or_create(self, page, zoom, create):
+        """Returns the cached pixmap of the page at the zoom level, calling create() to make it if needed."""
+        pixmap = self.get(page, zoom)
+        if pixmap is None:
+            pixmap = self.put(page, zoom, create())
+        return pixmap
+
+    def discard(self, page):
+        """Drops every cached zoom level of a page."""
+        for key in [key for key in self._items if key[0] == page]:
+            self._remove(key)
+
+    def clear(self):
+        self._items.clear()
+        self.nbytes = 0
+
+    def _remove(self, key):
+        if key in self._items:
+            self.nbytes -= self._items.pop(key)[1]
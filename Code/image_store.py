@@ -0,0 +1,199 @@
+# image_store.py
+
+"""
+Storage of the intermediate page and cell images passed between rendering, table
+detection, cellularization and OCR.
+
+A store is chosen by name and decides the file extension and encoding:
+
+    "npy"       raw uncompressed NumPy arrays, read back memory-mapped
+    "png-fast"  PNG at zlib level 1, a third of the default level's encode time
+    "png"       PNG at PIL's default compression, viewable by any image tool (default)
+
+load_image dispatches on the file extension, so readers do not need to know which
+store wrote a file. A page saved as .npy is written once and then mapped read-only:
+detection and cellularization work on views of the mapping, and only the parts of
+the page they touch are paged in from disk. It costs the full uncompressed size on
+disk, though (about 15 MB per grayscale A4 page at 400 DPI), so it is opt-in.
+
+A mapped file cannot be replaced or deleted on Windows while an array mapping it is
+alive, so long-lived holders (e.g. the display) copy .npy pages into memory; if
+save_image cannot replace a file, it removes its partial write before raising.
+"""
+
+import os
+import json
+import threading
+
+import numpy as np
+from PIL import Image
+
+DEFAULT_STORE = "png"
+# Name of the file in a project folder recording the store its images were written with
+PROJECT_STORE_FILENAME = "image_store.json"
+# Marks the temporary name save_image writes a file under
+PARTIAL_MARK = ".partial"
+
+
+class NpyStore:
+    """
+    Raw .npy files: no encoding cost on write, memory-mapped read-only on load.
+
+    Example:
+    --------
+    store = NpyStore()
+    path = store.save(pixels, store.path_for("temp_images/page_1"))
+    view = store.load(path)   # np.memmap, nothing decoded
+    """
+    name = "npy"
+    extension = ".npy"
+
+    def path_for(self, root):
+        """Returns `root` (a path without extension) with this store's extension."""
+        return root + self.extension
+
+    def save(self, pixels, path):
+        """Writes a uint8 array to `path` and returns the path."""
+        # Through a file object, so np.save never appends a second extension
+        with open(path, "wb") as handle:
+            np.save(handle, np.ascontiguousarray(pixels, dtype=np.uint8), allow_pickle=False)
+        return path
+
+    def load(self, path):
+        """Maps the array read-only; it stays valid while the returned array (or a view of it) is alive."""
+        return np.load(path, mmap_mode="r", allow_pickle=False)
+
+
+class PNGStore:
+    """
+    PNG files at a given zlib compression level (0-9).
+
+    Example:
+    --------
+    fast = PNGStore(compress_level=1)
+    fast.save(pixels, "temp_images/page_1.png")
+    """
+    extension = ".png"
+
+    def __init__(self, compress_level=6, name="png"):
+        """
+        @param compress_level: zlib level; 1 encodes about three times faster than the default 6
+                               for files around 20% larger.
+        @param name: Name of the store in STORES.
+        """
+        self.compress_level = compress_level
+        self.name = name
+
+    def path_for(self, root):
+        """Returns `root` (a path without extension) with this store's extension."""
+        return root + self.extension
+
+    def save(self, pixels, path):
+        """Writes an image (uint8 array or PIL Image) to `path` and returns the path."""
+        image = pixels if isinstance(pixels, Image.Image) else Image.fromarray(np.asarray(pixels))
+        image.save(path, format="PNG", compress_level=self.compress_level)
+        return path
+
+    def load(self, path):
+        """Decodes the file to an array; grayscale and RGB files keep their channels."""
+        return _decode(path)
+
+
+STORES = {
+    "npy": NpyStore(),
+    "png-fast": PNGStore(compress_level=1, name="png-fast"),
+    "png": PNGStore(),
+}
+
+
+def get_store(name=None):
+    """
+    Returns the store registered under `name` (default: DEFAULT_STORE). A store
+    instance is returned unchanged.
+    """
+    if name is None:
+        name = DEFAULT_STORE
+    if not isinstance(name, str):
+        return name
+    if name not in STORES:
+        raise ValueError(f"Unknown image store '{name}', expected one of {list(STORES)}")
+    return STORES[name]
+
+
+def _decode(path):
+    with Image.open(path) as image:
+        return np.asarray(image if image.mode in ("L", "RGB") else image.convert("RGB"))
+
+
+def load_image(path):
+    """
+    Reads an image file written by any store (or any other image file) as a uint8 array.
+
+    @return: A read-only memory map for .npy files; a decoded (H, W) or (H, W, 3)
+             array otherwise.
+    """
+    if os.path.splitext(str(path))[1].lower() == NpyStore.extension:
+        return STORES["npy"].load(path)
+    return _decode(path)
+
+
+def store_for_path(path):
+    """Name of the store matching a file's extension: "npy" for .npy files, "png" otherwise."""
+    return "npy" if os.path.splitext(str(path))[1].lower() == NpyStore.extension else "png"
+
+
+def image_size(path):
+    """Returns the (width, height) of an image file without decoding its pixels."""
+    if os.path.splitext(str(path))[1].lower() == NpyStore.extension:
+        height, width = load_image(path).shape[:2]
+        return width, height
+    with Image.open(path) as image:
+        return image.size
+
+
+def save_image(pixels, path, store=None):
+    """
+    Writes pixels with `store` and returns the path. The file is written under a
+    temporary name and moved into place, so readers never see half a page.
+
+    @param path: Target file; its extension should match the store's (see path_for).
+    @param store: Store name or instance (default: store_for_path(path)).
+    """
+    store = get_store(store if store is not None else store_for_path(path))
+    root, extension = os.path.splitext(str(path))
+    # Unique per process and thread, as two threads may write the same page
+    partial = f"{root}{PARTIAL_MARK}{os.getpid()}_{threading.get_ident()}{extension}"
+    try:
+        store.save(pixels, partial)
+        # Fails on Windows while an array maps the target
+        os.replace(partial, path)
+    except BaseException:
+        try:
+            os.remove(partial)
+        except OSError:
+            pass
+        raise
+    return path
+
+
+def is_partial(path):
+    """True for a file save_image is still writing (or that a crashed writer left behind)."""
+    return PARTIAL_MARK in os.path.basename(str(path))
+
+
+def read_project_store(project_folder, default=None):
+    """Returns the store name recorded in a project folder, or `default` (DEFAULT_STORE) if none is."""
+    try:
+        with open(os.path.join(project_folder, PROJECT_STORE_FILENAME)) as handle:
+            name = json.load(handle).get("store")
+    except (OSError, ValueError):
+        name = None
+    return name if name in STORES else (default or DEFAULT_STORE)
+
+
+def write_project_store(project_folder, name):
+    """Records the store a project's images are written with."""
+    get_store(name)
+    os.makedirs(project_folder, exist_ok=True)
+    with open(os.path.join(project_folder, PROJECT_STORE_FILENAME), "w") as handle:
+        json.dump({"store": name}, handle)
@@ -2,17 +2,22 @@ import cv2
 import numpy as np
 from PIL import Image, ImageDraw
 import os
+from TableDetection import extrema
+from TableDetection.luminosity import to_luminosity, luminosity_profiles
+from Cellularize import Cell, iter_cells, load_page_array, get_random_string
+from table_grid import TableGrid
+import image_store
 
 def calculate_luminosity(image):
-    """Convert image to RGB and calculate luminosity."""
-    image = image.convert('RGB')
-    pixels = np.array(image)
-    luminosity = 0.299 * pixels[:, :, 0] + 0.587 * pixels[:, :, 1] + 0.114 * pixels[:, :, 2]
-    return luminosity
-
-def find_peaks(axis, luminosity, pointgap):
-    """Find peaks in luminosity (darkest parts)."""
-    avg_luminosity = np.mean(luminosity, axis=axis)
+    """Calculate luminosity as a 2-D uint8 array (see TableDetection.luminosity)."""
+    return to_luminosity(image)
+
+def find_peaks(axis, luminosity, pointgap, engine="python"):
+    """Find peaks in luminosity (darkest parts). `luminosity` is a 2-D page or an already averaged 1-D profile."""
+    extrema.check_engine(engine)
+    avg_luminosity = luminosity if np.ndim(luminosity) == 1 else np.mean(luminosity, axis=axis)
+    if engine == "numpy":
+        return extrema.find_extrema(avg_luminosity, pointgap, kind="peak")
     peaks = []
     for i in range(1, len(avg_luminosity) - 1):
         in_range = True
@@ -24,9 +29,12 @@ def find_peaks(axis, luminosity, pointgap):
             peaks.append(i)
     return peaks
 
-def find_troughs(axis, luminosity, pointgap):
-    """Find troughs in luminosity (lightest parts)."""
-    avg_luminosity = np.mean(luminosity, axis=axis)
+def find_troughs(axis, luminosity, pointgap, engine="python"):
+    """Find troughs in luminosity (lightest parts). `luminosity` is a 2-D page or an already averaged 1-D profile."""
+    extrema.check_engine(engine)
+    avg_luminosity = luminosity if np.ndim(luminosity) == 1 else np.mean(luminosity, axis=axis)
+    if engine == "numpy":
+        return extrema.find_extrema(avg_luminosity, pointgap, kind="trough")
     troughs = []
     for i in range(1, len(avg_luminosity) - 1):
         in_range = True
@@ -54,16 +62,8 @@ def draw_lines_in_trough_middle(image, troughs, orientation='horizontal'):
 
     return image
 
-def split_image_with_lines(image_path, lines, temp_dir="temp"):
-    """
-    Split the image into cells based on detected lines, save them as separate images, and return bounding box coordinates.
-    """
-    img = cv2.imread(image_path)
-    if img is None:
-        print(f"Failed to load image {image_path}")
-        return []
-
-    height, width = img.shape[:2]
+def lines_to_boundaries(lines, width, height):
+    """Return sorted horizontal and vertical boundaries from (x1, y1, x2, y2) lines, including the image edges."""
     horizontal_lines = sorted(set(line[1] for line in lines if line[1] == line[3]))
     vertical_lines = sorted(set(line[0] for line in lines if line[0] == line[2]))
 
@@ -77,62 +77,99 @@ def split_image_with_lines(image_path, lines, temp_dir="temp"):
     if not vertical_lines or vertical_lines[-1] != width:
         vertical_lines.append(width)
 
+    return horizontal_lines, vertical_lines
+
+def iter_cells_from_lines(page, lines, page_num=0, min_size=5):
+    """
+    In-memory counterpart of split_image_with_lines: yields Cellularize.Cell views
+    (row i, column j as in the `_cell_{i}_{j}` file names) instead of writing PNGs.
+    """
+    pixels = load_page_array(page)
+    height, width = pixels.shape[:2]
+    horizontal_lines, vertical_lines = lines_to_boundaries(lines, width, height)
+    yield from iter_cells(pixels, convert_to_pairs(vertical_lines), convert_to_pairs(horizontal_lines), page_num, min_size=min_size)
+
+def split_image_with_lines(image_path, lines, temp_dir="temp", page_num=0, store=None, run_id=None):
+    """
+    Split the image into cells based on detected lines, save them as separate images, and return them as Cellularize.Cell records
+    (row i, column j, bounding box and saved path), so callers never parse the `_cell_{i}_{j}` file names.
+    Cells are written with the image_store `store` (default image_store.DEFAULT_STORE).
+    File names start with run_id (default: a random id, like cellularize_Page_colrow's), so pages of
+    different documents or runs with the same file name never overwrite each other's cells in temp_dir.
+    """
+    try:
+        img = load_page_array(image_path)
+    except (OSError, ValueError) as e:
+        print(f"Failed to load image {image_path}: {e}")
+        return []
+    store = image_store.get_store(store)
+
+    height, width = img.shape[:2]
+    horizontal_lines, vertical_lines = lines_to_boundaries(lines, width, height)
+
     cells = []
     base_filename = os.path.basename(image_path).rsplit('.', 1)[0]  # Remove the file extension
+    if run_id is None:
+        run_id = get_random_string(7)
     
     # Ensure the temporary directory exists
     if not os.path.exists(temp_dir):
         os.makedirs(temp_dir)
 
     min_size = 5  # Minimum size of a cell in pixels
+    grid = TableGrid.from_boundaries(horizontal_lines, vertical_lines)
 
-    for i in range(len(horizontal_lines) - 1):
-        for j in range(len(vertical_lines) - 1):
-            # Bounding box coordinates
-            y1, y2 = horizontal_lines[i], horizontal_lines[i + 1]
-            x1, x2 = vertical_lines[j], vertical_lines[j + 1]
+    # Cells narrower or shorter than min_size are left out by the grid
+    for i, j, (x1, y1, x2, y2) in grid.iter_bboxes(min_size=min_size):
+        # Ensure coordinates are within the image bounds
+        if x1 < 0 or y1 < 0 or x2 > width or y2 > height:
+            print(f"Skipping invalid crop region for coordinates: ({x1}, {y1}, {x2}, {y2})")
+            continue
 
-            # Ensure coordinates are within the image bounds
-            if x1 < 0 or y1 < 0 or x2 > width or y2 > height:
-                print(f"Skipping invalid crop region for coordinates: ({x1}, {y1}, {x2}, {y2})")
-                continue
+        # Extract cell image
+        cell_img = img[y1:y2, x1:x2]
 
-            # Ensure cells are not too small
-            if (x2 - x1) < min_size or (y2 - y1) < min_size:
-                print(f"Skipping too small crop region: ({x1}, {y1}, {x2}, {y2})")
-                continue
+        # Save the image
+        cell_img_path = store.path_for(os.path.join(temp_dir, f"{run_id}_{base_filename}_cell_{i}_{j}"))
+        try:
+            store.save(cell_img, cell_img_path)
+        except (OSError, ValueError) as e:
+            print(f"Error saving {cell_img_path}: {e}")
+            continue
 
-            # Extract cell image
-            cell_img = img[y1:y2, x1:x2]
+        # Save the cell record with its bounding box coordinates
+        cells.append(Cell(page_num, i, j, (x1, y1, x2, y2), path=cell_img_path))
 
-            # Save the image
-            cell_img_path = os.path.join(temp_dir, f"{base_filename}_cell_{i}_{j}.png")
-            if not cv2.imwrite(cell_img_path, cell_img):
-                print(f"Error saving {cell_img_path}")
-                continue
+    return cells  # Returns the list of Cell records
 
-            # Save the bounding box coordinates
-            cells.append(((x1, y1), (x2, y2)))  # Add bounding box coordinates to list
-
-    return cells  # Returns the list of bounding box coordinates
+def find_table_peaks_troughs(image_path, horizontal_state="border", vertical_state="border", horizontal_gap_ratio=17/2077, vertical_gap_ratio=80/1474, engine="numpy"):
+    """
+    Detect table using peaks and troughs in the luminosity.
 
-def find_table_peaks_troughs(image_path, horizontal_state="border", vertical_state="border", horizontal_gap_ratio=17/2077, vertical_gap_ratio=80/1474):
-    """Detect table using peaks and troughs in the luminosity."""
-    image = Image.open(image_path)
-    width, height = image.size
-    luminosity = calculate_luminosity(image)
+    @param image_path: Page image path, or an already decoded PIL image / array (never drawn on).
+    @param engine: "numpy" (vectorised, default) or "python" (reference loops); both return identical lines.
+    """
+    extrema.check_engine(engine)
+    if isinstance(image_path, (Image.Image, np.ndarray)):
+        # The returned image gets lines drawn on it, so work on a copy of in-memory pages
+        image, name = Image.fromarray(np.asarray(image_path)).convert('RGB'), "in-memory page"
+    else:
+        # A copy, as .npy pages are read-only memory maps
+        image, name = Image.fromarray(np.array(image_store.load_image(image_path))), image_path
+    row_profile, col_profile = luminosity_profiles(image)
+    width, height = len(col_profile), len(row_profile)
 
     horizontal_gap = max(1, round(height * horizontal_gap_ratio))
     vertical_gap = max(1, round(width * vertical_gap_ratio))
 
-    horizontal_troughs = find_troughs(1, luminosity, horizontal_gap) if horizontal_state == "border" else find_peaks(1, luminosity, horizontal_gap)
+    horizontal_troughs = find_troughs(1, row_profile, horizontal_gap, engine) if horizontal_state == "border" else find_peaks(1, row_profile, horizontal_gap, engine)
     horizontal_troughs = [int(y) for y in horizontal_troughs if 0 <= y < height]
 
-    vertical_troughs = find_troughs(0, luminosity, vertical_gap) if vertical_state == "border" else find_peaks(0, luminosity, vertical_gap)
+    vertical_troughs = find_troughs(0, col_profile, vertical_gap, engine) if vertical_state == "border" else find_peaks(0, col_profile, vertical_gap, engine)
     vertical_troughs = [int(x) for x in vertical_troughs if 0 <= x < width]
 
     if not horizontal_troughs and not vertical_troughs:
-        print(f"No table lines detected for {image_path}.")
+        print(f"No table lines detected for {name}.")
         return [], [], None
 
     draw = ImageDraw.Draw(image)
@@ -154,8 +191,8 @@ def find_table_peaks_troughs(image_path, horizontal_state="border", vertical_sta
 
 def find_table_transitions(image_path, threshold=15, min_distance=10, smoothing_window=5):
     """Detect table transitions based on gradient changes."""
-    image = Image.open(image_path).convert('L')
-    luminosity = np.array(image)
+    luminosity = np.array(to_luminosity(image_path))
+    image = Image.fromarray(luminosity)
 
     def smooth_data(data, window_size):
         return np.convolve(data, np.ones(window_size) / window_size, mode='same')
@@ -0,0 +1,145 @@
+# ocr_cache.py
+
+import hashlib
+import json
+import sqlite3
+
+import numpy as np
+
+CACHE_FILENAME = "ocr_cache.sqlite3"
+
+
+def make_fingerprint(**settings):
+    """
+    Builds an engine/config fingerprint from keyword settings (engine versions, model
+    parameters, thresholds...). Results cached under one fingerprint are never returned
+    for another, so changing any OCR setting invalidates the cache automatically.
+    """
+    return hashlib.blake2b(json.dumps(settings, sort_keys=True, default=str).encode("utf-8"), digest_size=8).hexdigest()
+
+
+class OCRCache:
+    """
+    Persistent OCR result cache keyed by a hash of the cell's pixels.
+
+    Cells that are pixel-identical to a previous run (e.g. after moving one table line,
+    only the cells touching that line change) are answered from the cache instead of
+    being OCR'd again. Entries are evicted least-recently-used once the cache holds
+    more than `max_entries` results.
+
+    Example:
+    --------
+    cache = OCRCache("project/ocr_cache.sqlite3", fingerprint=make_fingerprint(engine="paddle"))
+    hit = cache.get(pixels)
+    if hit is None:
+        cache.put(pixels, text, confidence, source)
+    cache.close()
+    """
+
+    def __init__(self, path, fingerprint="", max_entries=200000):
+        """
+        @param path: SQLite database file, created if it does not exist.
+        @param fingerprint: Engine/config fingerprint mixed into every key (see make_fingerprint).
+        @param max_entries: Upper bound on stored results before LRU eviction.
+        """
+        self.path = path
+        self.fingerprint = fingerprint
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._pending_writes = 0
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ocr_results ("
+            " key TEXT PRIMARY KEY,"
+            " text TEXT NOT NULL,"
+            " confidence REAL NOT NULL,"
+            " source TEXT NOT NULL,"
+            " last_used INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ocr_results_last_used ON ocr_results (last_used)")
+        self._clock = self._conn.execute("SELECT COALESCE(MAX(last_used), 0) FROM ocr_results").fetchone()[0]
+        self._count = self._conn.execute("SELECT COUNT(*) FROM ocr_results").fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def key(self, pixels):
+        """Returns the cache key for a cell: hash of its shape, dtype and pixel bytes plus the fingerprint."""
+        pixels = np.ascontiguousarray(pixels)
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(self.fingerprint.encode("utf-8"))
+        digest.update(f"{pixels.shape}{pixels.dtype.str}".encode("ascii"))
+        digest.update(pixels.data)
+        return digest.hexdigest()
+
+    def _tick(self):
+        self._clock += 1
+        return self._clock
+
+    def get(self, pixels):
+        """
+        Looks up a cell.
+
+        @param pixels: The cell image (NumPy array or PIL Image).
+        @return: (text, confidence, source) on a hit, None on a miss.
+        """
+        key = self.key(np.asarray(pixels))
+        row = self._conn.execute("SELECT text, confidence, source FROM ocr_results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._conn.execute("UPDATE ocr_results SET last_used = ? WHERE key = ?", (self._tick(), key))
+        self._wrote()
+        return row
+
+    def put(self, pixels, text, confidence, source):
+        """Stores the OCR result for a cell, evicting the least recently used entries if the cache is full."""
+        key = self.key(np.asarray(pixels))
+        exists = self._conn.execute("SELECT 1 FROM ocr_results WHERE key = ?", (key,)).fetchone()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO ocr_results (key, text, confidence, source, last_used) VALUES (?, ?, ?, ?, ?)",
+            (key, text, float(confidence), source, self._tick())
+        )
+        if not exists:
+            self._count += 1
+        if self._count > self.max_entries:
+            self._evict(self._count - self.max_entries)
+        self._wrote()
+
+    def _evict(self, count):
+        self._conn.execute(
+            "DELETE FROM ocr_results WHERE key IN (SELECT key FROM ocr_results ORDER BY last_used LIMIT ?)", (count,)
+        )
+        self._count -= count
+
+    def _wrote(self):
+        self._pending_writes += 1
+        if self._pending_writes >= 500:
+            self.flush()
+
+    def flush(self):
+        """Commits pending writes to disk."""
+        self._conn.commit()
+        self._pending_writes = 0
+
+    def close(self):
+        """Commits and closes the database."""
+        self.flush()
+        self._conn.close()
+
+    def __len__(self):
+        return self._count
+
+    def stats(self):
+        """Hit/miss counters for the OCR completion statistics."""
+        lookups = self.hits + self.misses
+        return {
+            'cache_hits': self.hits,
+            'cache_misses': self.misses,
+            'cache_hit_rate': self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,188 @@
+# ocr_cascade.py
+
+import threading
+
+
+class CascadePolicy:
+    """
+    Decides which OCR engines run on a cell and which result is kept.
+
+    Engines run in order; after each one the most confident result so far is kept,
+    and the cascade stops as soon as that confidence reaches the engine's threshold
+    (for the cell's column, if a column override is given). So with the default
+    [('PaddleOCR', 0.98), ('EasyOCR', None)] EasyOCR only runs below 0.98.
+
+    With learn=True the policy also learns, per column, when a fallback engine is
+    worth running: once a fallback has run `min_samples` times in a column, it is
+    skipped for cells whose best confidence is above the highest confidence at which
+    that fallback ever changed the chosen text there (e.g. numeric columns where
+    PaddleOCR is reliably right end up never calling EasyOCR). Every
+    `explore_every`-th skipped cell still runs the fallback, so the estimate keeps
+    up if a column gets harder.
+
+    stats() reports, per engine, how often it ran, ended the cascade and - for
+    fallbacks - actually changed the chosen text.
+
+    Example:
+    --------
+    policy = CascadePolicy([('PaddleOCR', 0.98), ('EasyOCR', None)])
+    text, confidence, engine = policy.run(image, col_index, {'PaddleOCR': paddle, 'EasyOCR': easy})
+    print(policy.stats())
+    """
+
+    def __init__(self, engines, column_thresholds=None, learn=True, min_samples=30, explore_every=10):
+        """
+        @param engines: Ordered (engine_name, threshold) pairs; the threshold of the last engine is unused.
+        @param column_thresholds: Optional {col_index: {engine_name: threshold}} overrides.
+        @param learn: Learn per-column fallback thresholds from the results seen so far.
+        @param min_samples: Fallback runs in a column before its learned threshold is used.
+        @param explore_every: Run the fallback anyway on every n-th cell it would skip.
+        """
+        self.engines = [(name, threshold) for name, threshold in engines]
+        self.column_thresholds = {int(col): dict(thresholds) for col, thresholds in (column_thresholds or {}).items()}
+        self.learn = learn
+        self.min_samples = min_samples
+        self.explore_every = max(1, explore_every)
+        # (engine_name, col_index) -> [runs, accepted, changed, skipped, highest confidence a change happened at]
+        self._counts = {}
+        self._delta = {}
+        self._explore = {}
+        self._lock = threading.Lock()
+
+    def settings(self):
+        """Constructor arguments, to build an identical policy in another process (and for cache fingerprints)."""
+        return {
+            'engines': self.engines,
+            'column_thresholds': self.column_thresholds,
+            'learn': self.learn,
+            'min_samples': self.min_samples,
+            'explore_every': self.explore_every,
+        }
+
+    def threshold(self, engine_name, col_index):
+        """Confidence at which the cascade stops after engine_name in this column (None: never)."""
+        overrides = self.column_thresholds.get(col_index, {})
+        if engine_name in overrides:
+            return overrides[engine_name]
+        return dict(self.engines)[engine_name]
+
+    def learned_threshold(self, engine_name, col_index):
+        """
+        Confidence above which engine_name is skipped in this column, or None while
+        there are too few samples (or learning is off).
+        """
+        if not self.learn:
+            return None
+        with self._lock:
+            counts = self._counts.get((engine_name, col_index))
+        if counts is None or counts[0] < self.min_samples:
+            return None
+        return counts[4]
+
+    def _record(self, engine_name, col_index, runs=0, accepted=0, changed=0, skipped=0, changed_at=-1.0, tables=None):
+        with self._lock:
+            for table in tables or (self._counts, self._delta):
+                counts = table.setdefault((engine_name, col_index), [0, 0, 0, 0, -1.0])
+                counts[0] += runs
+                counts[1] += accepted
+                counts[2] += changed
+                counts[3] += skipped
+                counts[4] = max(counts[4], changed_at)
+
+    def _should_skip(self, engine_name, col_index, best_confidence):
+        learned = self.learned_threshold(engine_name, col_index)
+        if learned is None or best_confidence <= learned:
+            return False
+        with self._lock:
+            seen = self._explore[(engine_name, col_index)] = self._explore.get((engine_name, col_index), 0) + 1
+        # Explore: run anyway on every explore_every-th cell that would be skipped
+        return seen % self.explore_every != 0
+
+    def run(self, image, col_index, recognizers, first_result=None):
+        """
+        Runs the cascade on one cell.
+
+        @param image: Cell image passed to the recognizers.
+        @param recognizers: {engine_name: callable(image) -> (text, confidence)}.
+        @param first_result: (text, confidence) of the first engine if already computed
+                             (e.g. by batched recognition); it is then not called again.
+        @return: (text, confidence, engine_name) of the chosen result.
+        """
+        best = None
+        for index, (engine_name, _) in enumerate(self.engines):
+            if index > 0:
+                previous = self.engines[index - 1][0]
+                threshold = self.threshold(previous, col_index)
+                if threshold is not None and best[1] >= threshold:
+                    self._record(previous, col_index, accepted=1)
+                    return best
+                if self._should_skip(engine_name, col_index, best[1]):
+                    self._record(engine_name, col_index, skipped=1)
+                    return best
+
+            if index == 0 and first_result is not None:
+                text, confidence = first_result
+            else:
+                text, confidence = recognizers[engine_name](image)
+
+            if best is None:
+                best = (text, confidence, engine_name)
+                self._record(engine_name, col_index, runs=1)
+            elif confidence > best[1]:
+                changed = text != best[0]
+                self._record(engine_name, col_index, runs=1, changed=int(changed), changed_at=best[1] if changed else -1.0)
+                best = (text, confidence, engine_name)
+            else:
+                self._record(engine_name, col_index, runs=1)
+
+        self._record(self.engines[-1][0], col_index, accepted=1)
+        return best
+
+    def take_counts(self):
+        """Returns the counters gathered since the last call (picklable), for merge_counts in another process."""
+        with self._lock:
+            delta, self._delta = self._delta, {}
+        return delta
+
+    def merge_counts(self, counts):
+        """Adds counters from take_counts() of a policy running elsewhere (e.g. a worker process)."""
+        for (engine_name, col_index), (runs, accepted, changed, skipped, changed_at) in counts.items():
+            self._record(engine_name, col_index, runs, accepted, changed, skipped, changed_at, tables=(self._counts,))
+
+    def stats(self):
+        """
+        Per-engine totals: runs, accepted (cascade ended there), changed (a fallback's text
+        replaced the previous choice), skipped (by a learned threshold) and change_rate,
+        plus the learned per-column thresholds in use.
+        """
+        engines = {name: {'runs': 0, 'accepted': 0, 'changed': 0, 'skipped': 0} for name, _ in self.engines}
+        learned = {}
+        with self._lock:
+            counts = dict(self._counts)
+        for (engine_name, col_index), (runs, accepted, changed, skipped, changed_at) in counts.items():
+            totals = engines.setdefault(engine_name, {'runs': 0, 'accepted': 0, 'changed': 0, 'skipped': 0})
+            totals['runs'] += runs
+            totals['accepted'] += accepted
+            totals['changed'] += changed
+            totals['skipped'] += skipped
+            if self.learn and engine_name != self.engines[0][0] and runs >= self.min_samples:
+                learned.setdefault(engine_name, {})[col_index] = max(changed_at, 0.0)
+        for totals in engines.values():
+            totals['change_rate'] = totals['changed'] / totals['runs'] if totals['runs'] else 0.0
+        return {'engines': engines, 'learned_thresholds': learned}
+
+
+def format_stats(stats):
+    """One-line summary of CascadePolicy.stats(), e.g. for the console or a status bar."""
+    first = True
+    parts = []
+    for name, totals in stats['engines'].items():
+        if first:
+            parts.append(f"{name}: {totals['runs']} runs, {totals['accepted']} accepted")
+            first = False
+        else:
+            parts.append(
+                f"{name}: {totals['runs']} runs, changed {totals['changed']} ({totals['change_rate'] * 100:.1f}%),"
+                f" skipped {totals['skipped']}"
+            )
+    return "; ".join(parts)
@@ -12,7 +12,11 @@ from paddleocr import PaddleOCR
 from PIL import Image
 import easyocr
 import paddle
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
+from pipeline import prefetch
+import parallel_render
+import image_store
+from ocr_cascade import CascadePolicy, format_stats as format_cascade_stats
 import luminosity_table_detection as ltd
 from luminosity_table_detection import split_image_with_lines
 import tkinter as tk
@@ -43,15 +47,31 @@ def convert_pdf_to_images(pdf_file, storedir):
     if not storedir.exists():
         storedir.mkdir(parents=True, exist_ok=True)
 
-    image_list = []
-    
-    # Convert PDF to images using pdf2image
-    for i, image in enumerate(convert_from_path(str(pdf_file))):
-        image_name = storedir / f"Document_{i}.png"
-        image.save(image_name)
-        image_list.append(str(image_name))
-    
-    return image_list
+    # Render the pages on a process pool (200 DPI, unenhanced, as pdf2image did); the workers
+    # encode and write the pages with the default image store
+    return parallel_render.render_pdf_to_files(str(pdf_file), str(storedir), image_store.get_store().path_for("Document_{index}"), dpi=200, enhance=False)
+
+def iter_pdf_images(pdf_file, storedir):
+    """
+    Streaming version of convert_pdf_to_images: converts and saves one page at a time,
+    yielding each image path as soon as its page is written.
+    """
+    pdf_file = Path(pdf_file)
+    if not pdf_file.exists():
+        raise FileNotFoundError(f"PDF file not found: {pdf_file.resolve()}")
+
+    storedir = Path(storedir)
+    storedir.mkdir(parents=True, exist_ok=True)
+
+    # Pages are written with the default image store, like convert_pdf_to_images
+    store = image_store.get_store()
+    page_count = pdfinfo_from_path(str(pdf_file))["Pages"]
+    for i in range(page_count):
+        # pdf2image pages are 1-based; convert a single page per call
+        image = convert_from_path(str(pdf_file), first_page=i + 1, last_page=i + 1)[0]
+        image_name = store.path_for(str(storedir / f"Document_{i}"))
+        image_store.save_image(np.asarray(image), image_name, store)
+        yield image_name
 
 def extract_tables_from_images(image_paths, table_detection_method='Peaks and Troughs'):
     """
@@ -74,8 +94,7 @@ def extract_tables_from_images(image_paths, table_detection_method='Peaks and Tr
                 raise ValueError("No table positions found")
 
             lines = []
-            image = Image.open(image_path)
-            width, height = image.size
+            width, height = image_store.image_size(image_path)
 
             # Clip horizontal and vertical positions to avoid out-of-bounds errors
             horizontal_positions = [y for y in horizontal_positions if 0 <= y <= height]
@@ -116,7 +135,7 @@ def cellularize_tables(image_list, table_map, page_num):
             continue  # Skip processing if no valid table coordinates
 
         # Use split_image_with_lines to cellularize the image based on table coordinates
-        cells = split_image_with_lines(image_path, table_coords)
+        cells = split_image_with_lines(image_path, table_coords, page_num=page_num + index)
         location_lists.append(cells)
     
     return location_lists
@@ -163,20 +182,20 @@ def configure_logging():
     for logger_name in logging.root.manager.loggerDict:
         logging.getLogger(logger_name).setLevel(logging.WARNING)
 
-def perform_paddle_ocr(image, return_confidence=False):
+def perform_paddle_ocr(image, ocr, return_confidence=False):
     """ Perform OCR using PaddleOCR on a single image."""
     result = ocr.ocr(image, cls=True)
     text = ""
     confidence = 0.0
-    for line in result:
-        for word_info in line:
+    for line in result or []:
+        for word_info in line or []:
             word, score = word_info[1]
             text += word + " "
             if score > confidence:
                 confidence = score
-    return text.strip(), confidence if return_confidence else text.strip()
+    return (text.strip(), confidence) if return_confidence else text.strip()
 
-def perform_easyocr(image):
+def perform_easyocr(image, reader):
     """ Perform OCR using EasyOCR on a single image."""
     result = reader.readtext(np.array(image))
     text = ""
@@ -187,51 +206,40 @@ def perform_easyocr(image):
             confidence = score
     return text.strip(), confidence
 
-def perform_ocr_on_images(location_lists, ocr, reader):
+def make_cascade_policy(learn=False):
+    """ PaddleOCR first, EasyOCR only when PaddleOCR's confidence is below 0.8 (see ocr_cascade.CascadePolicy); learning is opt-in. """
+    return CascadePolicy([('PaddleOCR', 0.8), ('EasyOCR', None)], learn=learn)
+
+def perform_ocr_on_images(location_lists, ocr, reader, policy=None):
     """
-    Perform OCR on images using both PaddleOCR and EasyOCR without batch processing.
+    Perform OCR on images with PaddleOCR, falling back to EasyOCR on low confidence, without batch processing.
+
+    @param location_lists: One list of Cellularize.Cell records per page, as returned by cellularize_tables.
     """
     table_data = {}
     total, bad, easyocr_count, paddleocr_count = 0, 0, 0, 0
+    policy = policy if policy is not None else make_cascade_policy()
+    recognizers = {
+        'PaddleOCR': lambda image: perform_paddle_ocr(image, ocr, return_confidence=True),
+        'EasyOCR': lambda image: perform_easyocr(image, reader),
+    }
 
     for collection in location_lists:
-        for filename in collection:
+        for cell in collection:
+            filename = cell.path or cell.label
             try:
-                # Open the image and convert to RGB
-                image = Image.open(filename).convert("RGB")
-
-                # Perform OCR with PaddleOCR
-                original_text, original_confidence = perform_paddle_ocr(image, return_confidence=True)
-                processed_text, processed_confidence = perform_paddle_ocr(image, return_confidence=True)
-
-                # Use EasyOCR only if PaddleOCR confidence is low
-                if original_confidence < 0.8 and processed_confidence < 0.8:
-                    easy_original_text, easy_original_conf = perform_easyocr(image)
-                    easy_processed_text, easy_processed_conf = perform_easyocr(image)
-                    results = [
-                        (original_text, original_confidence, 'Original Image, PaddleOCR'),
-                        (processed_text, processed_confidence, 'Processed Image, PaddleOCR'),
-                        (easy_original_text, easy_original_conf, 'Original Image, EasyOCR'),
-                        (easy_processed_text, easy_processed_conf, 'Processed Image, EasyOCR')
-                    ]
-                else:
-                    results = [
-                        (original_text, original_confidence, 'Original Image, PaddleOCR'),
-                        (processed_text, processed_confidence, 'Processed Image, PaddleOCR')
-                    ]
+                # Open the image and convert to RGB; the Cell record carries its row and column
+                image = Image.fromarray(cell.pixels()).convert("RGB")
+                row_index, col_index = cell.row, cell.col
 
-                # Select the best result based on confidence
-                best_text, best_confidence, source = max(results, key=lambda x: x[1])
+                # Each engine runs at most once per cell
+                best_text, best_confidence, engine = policy.run(image, col_index, recognizers)
+                source = f'Original Image, {engine}'
 
                 if best_confidence == 0:
                     print(f"Skipping invalid {filename}")
                     continue
 
-                # Extract row and column index from filename
-                parts = filename.rsplit('_', maxsplit=3)
-                row_index = int(parts[-2])
-                col_index = int(parts[-1].split('.')[0])
-
                 if row_index not in table_data:
                     table_data[row_index] = {}
 
@@ -265,6 +273,15 @@ def write_to_csv(all_table_data, output_csv):
                 row = [rows[row_index].get(col_index, "") for col_index in range(max_columns)]
                 writer.writerow(row)
 
+def append_page_to_csv(page, table_data, output_csv):
+    """ Append one page of OCR results to a CSV file, in the layout of write_to_csv. """
+    with open(output_csv, mode='a', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow([f"Page {page}"])
+        max_columns = max((max(cols.keys()) for cols in table_data.values()), default=-1) + 1
+        for row_index in sorted(table_data.keys()):
+            writer.writerow([table_data[row_index].get(col_index, "") for col_index in range(max_columns)])
+
 def cleanup(storedir):
     """ Cleanup temporary files and directories. """
     for file in os.listdir(storedir):
@@ -397,36 +414,44 @@ def start_manual_table_detection(images):
     root.mainloop()
 
 def run_ocr_pipeline(pdf_file, storedir, output_csv, ocr_progress, ocr_cancel_event):
+    """
+    Streams the PDF through conversion -> table detection -> cellularization -> OCR one
+    page at a time (page conversion runs ahead on a background thread, bounded to two
+    pages), appending each page to output_csv as soon as it is done.
+    """
     try:
         setup_environment(storedir)
         configure_logging()
         ocr = initialize_paddleocr()
         reader = initialize_easyocr()
 
-        image_list = convert_pdf_to_images(pdf_file, storedir)
-        total_pages = len(image_list)
-        all_table_data = {}
+        # Start from an empty CSV, pages are appended as they finish
+        open(output_csv, 'w').close()
+        image_paths = []
+        # One policy for the whole document, so per-column fallback thresholds carry over between pages
+        policy = make_cascade_policy()
 
-        for idx, image_path in enumerate(image_list):
+        for idx, image_path in enumerate(prefetch(iter_pdf_images(pdf_file, storedir), maxsize=2)):
             if ocr_cancel_event.is_set():
                 raise Exception("OCR process was cancelled during processing images.")
+            image_paths.append(image_path)
 
             table_map = extract_tables_from_images([image_path])
-            if not table_map[idx]:
+            if not table_map[0]:
                 print(f"OCR failed on {image_path}. Triggering manual table detection.")
                 # Call manual table detection here when OCR fails or tables aren't detected
-                pil_images = [Image.open(image_path) for image_path in image_list]
+                pil_images = [Image.fromarray(np.array(image_store.load_image(path))) for path in image_paths]
                 start_manual_table_detection(pil_images)
                 break  # Break or exit if you want to skip further OCR processing
             
             location_lists = cellularize_tables([image_path], table_map, idx)
-            table_data, total, bad, easyocr_count, paddleocr_count = perform_ocr_on_images(location_lists, ocr, reader)
-            all_table_data[idx] = table_data
+            table_data, total, bad, easyocr_count, paddleocr_count = perform_ocr_on_images(location_lists, ocr, reader, policy)
+            append_page_to_csv(idx, table_data, output_csv)
 
-        write_to_csv(all_table_data, output_csv)
+        print(f"Fallback cascade: {format_cascade_stats(policy.stats())}")
 
     except Exception as e:
         logging.error(f"An error occurred during OCR pipeline: {e}", exc_info=True)
         raise
     finally:
-        cleanup(storedir)
\ No newline at end of file
+        cleanup(storedir)
@@ -0,0 +1,192 @@
+# page_ocr.py
+
+"""
+Whole-page OCR strategy: PaddleOCR detection + recognition runs once per page
+(in overlapping tiles no larger than the detector's det_limit_side_len, so
+PaddleOCR does not shrink 400 DPI pages before detecting) and every recognised word is assigned to the table cell
+containing its centre, instead of running the detector on every cropped cell.
+
+Compare both strategies page by page on a PDF (from Code/):
+    python -m page_ocr ../Examples/FINLAND_1890_T1_g00s.pdf [--dpi 400] [--pages 2]
+"""
+
+import sys
+import time
+import argparse
+
+import cv2
+import numpy as np
+
+from table_grid import TableGrid
+
+# Tile size and overlap in page pixels. Tiles must not exceed the engine's
+# det_limit_side_len (960 in RunThroughTest.PADDLEOCR_SETTINGS) or PaddleOCR scales
+# them down; the overlap must exceed the widest word
+TILE_SIZE = 960
+TILE_OVERLAP = 240
+
+PAGE_SOURCE = 'Whole Page, PaddleOCR'
+
+
+def to_bgr(pixels):
+    """Returns a page or tile (grayscale, RGB or RGBA) as a BGR array, as PaddleOCR expects."""
+    pixels = np.ascontiguousarray(pixels)
+    if pixels.ndim == 2:
+        return cv2.cvtColor(pixels, cv2.COLOR_GRAY2BGR)
+    if pixels.shape[2] == 4:
+        return cv2.cvtColor(pixels, cv2.COLOR_RGBA2BGR)
+    return cv2.cvtColor(pixels, cv2.COLOR_RGB2BGR)
+
+
+def tile_bounds(length, tile_size=TILE_SIZE, overlap=TILE_OVERLAP):
+    """
+    Splits [0, length) into overlapping tiles.
+
+    @return: List of (start, end, core_start, core_end). The cores do not overlap and
+             cover [0, length); a word belongs to the tile whose core holds its centre.
+    """
+    if length <= tile_size:
+        return [(0, length, 0, length)]
+    step = tile_size - overlap
+    starts = list(range(0, length - tile_size, step)) + [length - tile_size]
+    bounds = []
+    for index, start in enumerate(starts):
+        core_start = 0 if index == 0 else (starts[index - 1] + tile_size + start) // 2
+        core_end = length if index == len(starts) - 1 else (start + tile_size + starts[index + 1]) // 2
+        bounds.append((start, start + tile_size, core_start, core_end))
+    return bounds
+
+
+def detect_page_words(page, ocr_engine, tile_size=TILE_SIZE, overlap=TILE_OVERLAP):
+    """
+    Runs PaddleOCR (detection + recognition) over a page in tiles.
+
+    @param page: (H, W) or (H, W, C) uint8 page array.
+    @return: (boxes, texts, confidences): boxes an (N, 4) float array of (x0, y0, x1, y1)
+             in page coordinates, one row per recognised word/line.
+    """
+    boxes, texts, confidences = [], [], []
+    height, width = page.shape[:2]
+    for y0, y1, core_y0, core_y1 in tile_bounds(height, tile_size, overlap):
+        for x0, x1, core_x0, core_x1 in tile_bounds(width, tile_size, overlap):
+            result = ocr_engine.ocr(to_bgr(page[y0:y1, x0:x1]), cls=True)
+            for line in result or []:
+                for points, (text, confidence) in line or []:
+                    points = np.asarray(points, dtype=np.float32)
+                    left, top = points.min(axis=0) + (x0, y0)
+                    right, bottom = points.max(axis=0) + (x0, y0)
+                    centre_x, centre_y = (left + right) / 2, (top + bottom) / 2
+                    # Words in the overlap are seen by two tiles; keep the copy from the owning tile
+                    if core_x0 <= centre_x < core_x1 and core_y0 <= centre_y < core_y1 and text.strip():
+                        boxes.append((left, top, right, bottom))
+                        texts.append(text)
+                        confidences.append(confidence)
+    return np.asarray(boxes, dtype=np.float32).reshape(-1, 4), texts, confidences
+
+
+def assign_words_to_cells(boxes, rows, cols):
+    """
+    Maps each word box to the (row, col) cell containing its centre.
+
+    Rows and columns are the sorted (start, end) pairs of a TableMap page entry
+    (Table[0] and Table[1]); the lookup is a binary search on the interval starts.
+
+    @return: (row_indices, col_indices) arrays, -1 for words outside the grid.
+    """
+    return TableGrid(rows, cols).assign_boxes(boxes)
+
+
+def join_words(boxes, texts, confidences):
+    """Reading-order text of the words in one cell (lines top to bottom, words left to right) and their mean confidence."""
+    heights = boxes[:, 3] - boxes[:, 1]
+    centres_y = (boxes[:, 1] + boxes[:, 3]) / 2
+    line_gap = max(1.0, float(np.median(heights)) / 2)
+    order = np.argsort(centres_y)
+    lines = []
+    for index in order:
+        if lines and centres_y[index] - centres_y[lines[-1][-1]] <= line_gap:
+            lines[-1].append(index)
+        else:
+            lines.append([index])
+    words = [texts[index] for line in lines for index in sorted(line, key=lambda i: boxes[i, 0])]
+    return ' '.join(words), float(np.mean(confidences))
+
+
+def ocr_page_cells(page, rows, cols, ocr_engine, page_num=0, refine=None, tile_size=TILE_SIZE, overlap=TILE_OVERLAP):
+    """
+    Whole-page counterpart of OCRing every cell of a page with process_image.
+
+    @param page: Page array.
+    @param rows: Row (start, end) pairs, Table[0] of the page's TableMap entry.
+    @param cols: Column (start, end) pairs, Table[1].
+    @param refine: Optional callable(row, col, cell_pixels, label, (text, confidence)) returning a
+                   process_image result, e.g. to run the EasyOCR fallback on low-confidence cells.
+    @return: process_image-style results (row, col, text, confidence, source, label); cells
+             without any word are left out, as process_image returns None for them.
+    """
+    boxes, texts, confidences = detect_page_words(page, ocr_engine, tile_size, overlap)
+    grid = TableGrid(rows, cols)
+    row_indices, col_indices = grid.assign_boxes(boxes)
+
+    cells = {}
+    for index in np.flatnonzero((row_indices >= 0) & (col_indices >= 0)):
+        cells.setdefault((int(row_indices[index]), int(col_indices[index])), []).append(index)
+
+    results = []
+    for (row, col), indices in sorted(cells.items()):
+        text, confidence = join_words(boxes[indices], [texts[i] for i in indices], [confidences[i] for i in indices])
+        label = f"page {page_num} row {row} col {col}"
+        if refine is not None:
+            left, top, right, bottom = grid.bbox(row, col)
+            result = refine(row, col, page[top:bottom, left:right], label, (text, confidence))
+            if result is not None:
+                results.append(result)
+        else:
+            results.append((row, col, text, confidence, PAGE_SOURCE, label))
+    return results
+
+
+def main(argv=None):
+    import RunThroughTest as ocr_module
+    from pdf_to_image import PDFPageProvider
+    import paddle
+
+    parser = argparse.ArgumentParser(description="Compare per-cell and whole-page OCR page by page.")
+    parser.add_argument('pdf')
+    parser.add_argument('--dpi', type=int, default=400)
+    parser.add_argument('--pages', type=int, default=None, help="Only the first N pages")
+    args = parser.parse_args(argv)
+
+    use_gpu = paddle.device.is_compiled_with_cuda()
+    ocr, reader = ocr_module.initialize_paddleocr(use_gpu), ocr_module.initialize_easyocr(use_gpu)
+    policy = ocr_module.make_cascade_policy(learn=False)
+
+    def refine(row, col, pixels, label, paddle_result):
+        return ocr_module.select_best_result(row, col, ocr_module.cell_to_rgb(pixels), label, paddle_result, reader, policy)
+
+    print(f"{'page':>4} {'cells':>6} {'per cell (s)':>13} {'whole page (s)':>15} {'same text':>10}")
+    with PDFPageProvider(args.pdf, dpi=args.dpi, max_cached_pages=1) as pages:
+        for page_num in range(min(args.pages or pages.page_count, pages.page_count)):
+            page = np.asarray(pages[page_num])
+            rows, cols = ocr_module.detect_tables_in_images([page])[0]
+            cells = list(ocr_module.iter_cells(page, cols, rows, page_num))
+
+            start = time.perf_counter()
+            per_cell = ocr_module.process_all_images(cells, ocr, reader, policy=policy)
+            cell_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            whole_page = ocr_page_cells(page, rows, cols, ocr, page_num, refine=refine)
+            page_seconds = time.perf_counter() - start
+
+            cell_texts = {(result[0], result[1]): result[2] for result in per_cell}
+            page_texts = {(result[0], result[1]): result[2] for result in whole_page}
+            keys = set(cell_texts) | set(page_texts)
+            same = sum(cell_texts.get(key) == page_texts.get(key) for key in keys)
+            agreement = same / len(keys) * 100 if keys else 100.0
+            print(f"{page_num + 1:>4} {len(cells):>6} {cell_seconds:>13.2f} {page_seconds:>15.2f} {agreement:>9.1f}%")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,196 @@
+# parallel_ocr.py
+
+import time
+import multiprocessing
+import concurrent.futures
+
+import RunThroughTest as ocr_module
+import engine_server
+from ocr_cascade import CascadePolicy
+from parallel_render import physical_core_count
+
+# Engines owned by the current worker process, built once by _init_worker
+_worker_ocr = None
+_worker_reader = None
+_worker_policy = None
+_worker_policy_run = 0
+
+
+def _init_worker(use_gpu, rec_batch_num=6, shared_engines=False, policy_settings=None):
+    """
+    Process-pool initializer: loads PaddleOCR and EasyOCR (or connects to the engine server)
+    once per worker process, and builds the worker's copy of the fallback cascade policy.
+    """
+    global _worker_ocr, _worker_reader, _worker_policy
+    _worker_ocr, _worker_reader = engine_server.get_engines(use_gpu, rec_batch_num, shared=shared_engines)
+    _worker_policy = CascadePolicy(**policy_settings) if policy_settings else ocr_module.make_cascade_policy(learn=False)
+
+
+def _process_chunk(cells, batch_size=None, policy_settings=None, policy_run=0):
+    """
+    Runs process_image (or process_batch when batch_size is set) on a chunk of cells inside a worker process.
+
+    The worker's policy is rebuilt from policy_settings when policy_run changes, so a pool kept
+    across OCR runs does not carry one document's learned thresholds into the next.
+    @return: (results, cascade counters gathered for this chunk, see CascadePolicy.take_counts).
+    """
+    global _worker_policy, _worker_policy_run
+    if policy_run != _worker_policy_run:
+        _worker_policy = CascadePolicy(**policy_settings) if policy_settings else ocr_module.make_cascade_policy(learn=False)
+        _worker_policy_run = policy_run
+    if batch_size:
+        results = ocr_module.process_batch(cells, _worker_ocr, _worker_reader, batch_size, policy=_worker_policy)
+    else:
+        results = [ocr_module.process_image(cell, _worker_ocr, _worker_reader, policy=_worker_policy) for cell in cells]
+    return results, _worker_policy.take_counts()
+
+
+class ParallelOCRExecutor:
+    """
+    OCRs cells on a pool of worker processes, each with its own OCR engines.
+
+    Cells (in-memory Cell records or cell image paths) are sent to the workers in
+    chunks and the results come back in completion order, so a slow chunk does not
+    hold up the others. Use as a context manager so the pool is shut down. The pool
+    can be kept across OCR runs (the workers' engines stay loaded); assign each run's
+    policy with set_policy().
+
+    Example:
+    --------
+    with ParallelOCRExecutor(max_workers=4) as executor:
+        results = executor.process_all(cells, progress_callback=callback)
+    """
+
+    def __init__(self, max_workers=None, chunk_size=16, use_gpu=False, batch_size=None, shared_engines=False, policy=None):
+        """
+        @param max_workers: Number of worker processes (default: physical core count).
+        @param chunk_size: Number of cells sent to a worker per task.
+        @param use_gpu: Passed to initialize_paddleocr/initialize_easyocr in each worker.
+        @param batch_size: If set, workers use batched PaddleOCR recognition with this
+                           batch size; chunks are enlarged to hold at least one batch.
+        @param shared_engines: Workers use the engine server's models instead of loading their own.
+                               The server runs one request at a time, so the workers' OCR is
+                               then serialized (plus pickling the cells); only worth it when
+                               memory does not allow a model set per worker.
+        @param policy: Optional ocr_cascade.CascadePolicy. Each worker runs a copy of it (learning
+                       from its own cells) and the workers' counters are merged back into it.
+        """
+        self.max_workers = max_workers or physical_core_count()
+        self.batch_size = batch_size
+        self.chunk_size = max(1, chunk_size, batch_size or 0)
+        self.policy = policy
+        self.broken = False  # A worker process died; the pool cannot be used again
+        self._policy_settings = policy.settings() if policy is not None else None
+        self._policy_run = 0
+        # "spawn" avoids forking a process that holds Qt or Paddle threads
+        self._pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(use_gpu, batch_size or 6, shared_engines, policy.settings() if policy is not None else None)
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+    def set_policy(self, policy):
+        """
+        Makes the workers run fresh copies of `policy` from the next chunk on, and merges
+        their counters into it instead of the previous policy.
+        """
+        self.policy = policy
+        self._policy_settings = policy.settings() if policy is not None else None
+        self._policy_run += 1
+
+    def shutdown(self, wait=True):
+        """Stops the worker processes, dropping any chunks that have not started."""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+    def iter_results(self, cells, cancel_event=None):
+        """
+        Yields (chunk_cells, chunk_results) for each chunk as soon as it finishes.
+
+        Stops early, cancelling outstanding chunks, once cancel_event is set.
+        """
+        cells = list(cells)
+        chunks = [cells[start:start + self.chunk_size] for start in range(0, len(cells), self.chunk_size)]
+        futures = {
+            self._pool.submit(_process_chunk, chunk, self.batch_size, self._policy_settings, self._policy_run): chunk
+            for chunk in chunks
+        }
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+                try:
+                    results, counts = future.result()
+                except concurrent.futures.BrokenExecutor:
+                    self.broken = True
+                    raise
+                if self.policy is not None:
+                    self.policy.merge_counts(counts)
+                yield futures[future], results
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def process_all(self, cells, progress_callback=None, cancel_event=None, cache=None, blank_detector=None):
+        """
+        Parallel equivalent of RunThroughTest.process_all_images.
+
+        @param cells: Sequence of Cell records or cell image paths.
+        @param progress_callback: Called as progress_callback(done, total, remaining_time).
+        @param cancel_event: threading.Event; when set, remaining chunks are cancelled.
+        @param cache: Optional ocr_cache.OCRCache; looked up and filled in this process,
+                      so only cache misses are sent to the workers.
+        @param blank_detector: Optional blank_cells.BlankCellDetector; empty cells are answered
+                               here with blank results and never sent to the workers.
+        @return: List of process_image results (None results dropped), in completion order.
+        """
+        cells = list(cells)
+        total_images = len(cells)
+        start_time = time.time()
+        results = []
+
+        pending = cells
+        if blank_detector is not None:
+            ocr_module.prepare_blank_detector(blank_detector, cells)
+            pending = []
+            for cell in cells:
+                loaded = ocr_module.load_cell(cell)
+                if loaded is not None and blank_detector.is_blank(loaded[2]):
+                    results.append(ocr_module.blank_result(loaded[0], loaded[1], loaded[3]))
+                else:
+                    pending.append(cell)
+        if cache is not None:
+            cells_to_check, pending = pending, []
+            for cell in cells_to_check:
+                loaded = ocr_module.load_cell(cell)
+                cached = cache.get(loaded[2]) if loaded is not None else None
+                if cached is None:
+                    pending.append(cell)
+                else:
+                    result = ocr_module.result_from_cache(loaded[0], loaded[1], loaded[3], cached)
+                    if result:
+                        results.append(result)
+        done = total_images - len(pending)
+
+        for chunk_cells, chunk_results in self.iter_results(pending, cancel_event):
+            results.extend(result for result in chunk_results if result)
+            done += len(chunk_cells)
+            if cache is not None:
+                for cell, result in zip(chunk_cells, chunk_results):
+                    loaded = ocr_module.load_cell(cell)
+                    if loaded is not None:
+                        ocr_module.cache_result(cache, loaded[2], result)
+
+            elapsed = time.time() - start_time
+            remaining_time = (total_images - done) * elapsed / done
+
+            if progress_callback:
+                progress_callback(done, total_images, remaining_time)
+
+        return results
@@ -0,0 +1,293 @@
+# parallel_render.py
+
+"""
+Renders the pages of a PDF on a pool of worker processes.
+
+Each worker reopens the document with fitz.open and renders a contiguous range of
+pages. Pages come back to the caller in page order without being pickled: either
+through shared memory blocks the caller allocates (ParallelPDFRenderer.iter_pages),
+or as image files the workers write themselves (render_to_files / render_pdf_to_files)
+with an image_store store, so any encoding runs in parallel too.
+
+Time the serial and parallel renderers on a PDF (from Code/):
+    python -m parallel_render ../Examples/Brabant.pdf [--dpi 400] [--workers 4]
+"""
+
+import os
+import sys
+import math
+import time
+import argparse
+import tempfile
+import multiprocessing
+import concurrent.futures
+from multiprocessing import shared_memory
+
+import fitz  # PyMuPDF
+import numpy as np
+
+import pdf_to_image
+import image_store
+
+# Below this many pages the process start-up costs more than it saves
+MIN_PARALLEL_PAGES = 3
+
+
+def physical_core_count():
+    """Returns the number of physical CPU cores, falling back to logical cores if psutil is unavailable."""
+    try:
+        import psutil
+        count = psutil.cpu_count(logical=False)
+    except ImportError:
+        count = None
+    return count or os.cpu_count() or 1
+
+
+def render_array(page, dpi=400, rotation_angle=0, grayscale=False, enhance=True):
+    """Renders a fitz.Page as a uint8 array: (H, W) with grayscale, else (H, W, 3) like render_page."""
+    if grayscale:
+        return pdf_to_image.render_page_array(page, dpi, rotation_angle, enhance)
+    return np.asarray(pdf_to_image.render_page(page, dpi, rotation_angle, enhance))
+
+
+def page_shape(page, dpi=400, rotation_angle=0, grayscale=False):
+    """Shape of render_array(page, ...) without rendering the page."""
+    zoom = dpi / 72
+    irect = (page.rect * fitz.Matrix(zoom, zoom).prerotate(rotation_angle)).irect
+    return (irect.height, irect.width) if grayscale else (irect.height, irect.width, 3)
+
+
+def page_ranges(page_count, workers, chunks_per_worker=2):
+    """Splits range(page_count) into contiguous ranges, a few per worker so a slow page range does not hold up the rest."""
+    size = max(1, math.ceil(page_count / max(1, workers * chunks_per_worker)))
+    return [range(start, min(page_count, start + size)) for start in range(0, page_count, size)]
+
+
+def _render_into_shared(pdf_path, jobs, dpi, rotation_angle, grayscale, enhance):
+    """Worker: renders (index, shared memory name, shape) jobs into the caller's shared memory blocks."""
+    with fitz.open(pdf_path) as doc:
+        for index, name, shape in jobs:
+            pixels = render_array(doc.load_page(index), dpi, rotation_angle, grayscale, enhance)
+            block = shared_memory.SharedMemory(name=name)
+            try:
+                np.ndarray(shape, dtype=np.uint8, buffer=block.buf)[...] = pixels
+            finally:
+                block.close()
+    return len(jobs)
+
+
+def _render_to_files(pdf_path, jobs, dpi, rotation_angle, grayscale, enhance, store=None, skip_existing=False):
+    """
+    Worker: renders (index, path) jobs and saves each page with `store`, replacing the file
+    atomically. With skip_existing, pages written meanwhile (e.g. on demand) are skipped.
+    """
+    with fitz.open(pdf_path) as doc:
+        for index, path in jobs:
+            if skip_existing and os.path.exists(path):
+                continue
+            pixels = render_array(doc.load_page(index), dpi, rotation_angle, grayscale, enhance)
+            # Readers polling for the file never see a half-written page
+            image_store.save_image(pixels, path, store)
+    return len(jobs)
+
+
+def _release(block):
+    """Closes and unlinks a shared memory block; releasing it twice is harmless."""
+    try:
+        block.close()
+        block.unlink()
+    except FileNotFoundError:
+        pass
+
+
+class ParallelPDFRenderer:
+    """
+    Renders PDF pages on worker processes and hands them back in page order.
+
+    Use as a context manager so the pool is shut down. With one worker, or a
+    document shorter than MIN_PARALLEL_PAGES, pages are rendered in this process.
+
+    Example:
+    --------
+    with ParallelPDFRenderer("document.pdf", dpi=400, grayscale=True) as renderer:
+        for index, pixels in renderer.iter_pages():
+            ...
+        paths = renderer.render_to_files("temp_images", "page_{number}.png")
+    """
+
+    def __init__(self, pdf_path, dpi=400, rotation_angle=0, grayscale=False, enhance=True, max_workers=None):
+        """
+        @param pdf_path: Path to the PDF file.
+        @param dpi: Render resolution.
+        @param rotation_angle: Rotation angle in degrees (default is 0).
+        @param grayscale: Render straight to (H, W) grayscale (render_page_array) instead of RGB.
+        @param enhance: Apply the contrast/sharpness/median enhancement.
+        @param max_workers: Number of worker processes (default: physical core count).
+        """
+        self.pdf_path = str(pdf_path)
+        self.settings = (dpi, rotation_angle, grayscale, enhance)
+        with fitz.open(self.pdf_path) as doc:
+            self.page_count = len(doc)
+            self._shapes = [page_shape(page, dpi, rotation_angle, grayscale) for page in doc]
+        self.max_workers = max(1, min(max_workers or physical_core_count(), self.page_count))
+        self._pool = None
+        if self.max_workers > 1 and self.page_count >= MIN_PARALLEL_PAGES:
+            # "spawn" avoids forking a process that holds Qt or Paddle threads
+            self._pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+    def shutdown(self, wait=True):
+        """Stops the worker processes, dropping any page ranges that have not started."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
+
+    def iter_pages(self, cancel_event=None):
+        """
+        Yields (page_index, pixels) in page order. Workers write into shared memory
+        blocks allocated here; each page is copied out once and its block released, and
+        at most two ranges per worker are in flight so memory stays bounded.
+        """
+        if self._pool is None:
+            with fitz.open(self.pdf_path) as doc:
+                for index in range(self.page_count):
+                    if cancel_event is not None and cancel_event.is_set():
+                        return
+                    yield index, render_array(doc.load_page(index), *self.settings)
+            return
+
+        ranges = iter(page_ranges(self.page_count, self.max_workers))
+        in_flight = []  # (future, [(index, block, shape)]) in page order
+
+        def submit_next():
+            pages = next(ranges, None)
+            if pages is None:
+                return False
+            blocks = []
+            for index in pages:
+                shape = self._shapes[index]
+                blocks.append((index, shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)))), shape))
+            jobs = [(index, block.name, shape) for index, block, shape in blocks]
+            in_flight.append((self._pool.submit(_render_into_shared, self.pdf_path, jobs, *self.settings), blocks))
+            return True
+
+        current = []
+        try:
+            while len(in_flight) < 2 * self.max_workers and submit_next():
+                pass
+            while in_flight:
+                future, current = in_flight.pop(0)
+                future.result()
+                submit_next()
+                for index, block, shape in current:
+                    if cancel_event is not None and cancel_event.is_set():
+                        return
+                    pixels = np.ndarray(shape, dtype=np.uint8, buffer=block.buf).copy()
+                    _release(block)
+                    yield index, pixels
+        finally:
+            for future, _ in in_flight:
+                future.cancel()
+            # Workers still writing into a block must finish before it is unlinked
+            concurrent.futures.wait([future for future, _ in in_flight])
+            for blocks in [current] + [blocks for _, blocks in in_flight]:
+                for _, block, _ in blocks:
+                    _release(block)
+
+    def render_to_files(self, output_folder, name_format='page_{number}.png', skip_existing=True, cancel_event=None, store=None):
+        """
+        Renders every page to output_folder, the workers encoding and writing the files.
+
+        @param name_format: File name with {index} (0-based) and/or {number} (1-based) fields.
+        @param skip_existing: Leave pages whose file already exists alone, if the folder's
+                              page files belong to this document (see pdf_to_image.claim_page_folder).
+        @param cancel_event: threading.Event stopping the rendering; once it is set, this
+                             returns when the pages being rendered are written.
+        @param store: image_store store name (default: from the name_format extension, .npy or PNG).
+        @return: List of the page file paths, in page order.
+        """
+        os.makedirs(output_folder, exist_ok=True)
+        prefix = name_format.split('{', 1)[0]
+        if prefix:
+            # Page files another document left in the folder are deleted, not skipped
+            pdf_to_image.claim_page_folder(output_folder, pdf_to_image.document_id(self.pdf_path, *self.settings), prefix)
+        paths = [os.path.join(output_folder, name_format.format(index=index, number=index + 1)) for index in range(self.page_count)]
+        jobs = [(index, paths[index]) for index in range(self.page_count) if not (skip_existing and os.path.exists(paths[index]))]
+
+        if self._pool is None:
+            for index, path in jobs:
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+                _render_to_files(self.pdf_path, [(index, path)], *self.settings, store, skip_existing)
+            return paths
+
+        if cancel_event is None:
+            job_ranges = [jobs[r.start:r.stop] for r in page_ranges(len(jobs), self.max_workers)]
+        else:
+            # One page per task, so a cancel only waits for the pages being rendered
+            job_ranges = [[job] for job in jobs]
+        futures = [self._pool.submit(_render_to_files, self.pdf_path, chunk, *self.settings, store, skip_existing) for chunk in job_ranges if chunk]
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+                future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+        return paths
+
+
+def render_pdf_to_files(pdf_path, output_folder, name_format='page_{number}.png', dpi=400, grayscale=False, enhance=True, max_workers=None, skip_existing=False, cancel_event=None, store=None):
+    """
+    Renders a PDF into page image files on a pool of processes.
+
+    @param name_format: File name with {index} (0-based) and/or {number} (1-based) fields;
+                        use a .npy extension for raw pages (image_store "npy").
+    @param store: image_store store name (default: from the name_format extension).
+    @return: List of the page file paths, in page order.
+    """
+    with ParallelPDFRenderer(pdf_path, dpi=dpi, grayscale=grayscale, enhance=enhance, max_workers=max_workers) as renderer:
+        return renderer.render_to_files(output_folder, name_format, skip_existing, cancel_event, store)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time serial and parallel rendering of a PDF.")
+    parser.add_argument('pdf')
+    parser.add_argument('--dpi', type=int, default=400)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--grayscale', action='store_true')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    with fitz.open(args.pdf) as doc:
+        serial = [render_array(page, args.dpi, grayscale=args.grayscale) for page in doc]
+    serial_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ParallelPDFRenderer(args.pdf, dpi=args.dpi, grayscale=args.grayscale, max_workers=args.workers) as renderer:
+        workers = renderer.max_workers
+        parallel = [pixels for _, pixels in renderer.iter_pages()]
+    parallel_seconds = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as folder:
+        start = time.perf_counter()
+        render_pdf_to_files(args.pdf, folder, dpi=args.dpi, grayscale=args.grayscale, max_workers=args.workers)
+        files_seconds = time.perf_counter() - start
+
+    identical = all(np.array_equal(a, b) for a, b in zip(serial, parallel))
+    print(f"{len(serial)} pages at {args.dpi} DPI: serial {serial_seconds:.2f}s, "
+          f"{workers} workers {parallel_seconds:.2f}s (to files {files_seconds:.2f}s), identical: {identical}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,10 +1,17 @@
 # pdf_to_image.py
 
 import os
+import hashlib
+import threading
+from collections import OrderedDict
 import fitz  # PyMuPDF
+import cv2
+import numpy as np
 from PIL import Image, ImageEnhance, ImageFilter
 import io
 
+import image_store
+
 def enhance_image(image):
     """
     Enhances the image by increasing contrast and sharpness and reducing noise.
@@ -20,27 +27,348 @@ def enhance_image(image):
     image = image.filter(ImageFilter.MedianFilter(size=3))  # Reduces noise
     return image.convert('RGB')
 
-def pdf_to_images(pdf_path, dpi=400, rotation_angle=0):
+# Rows enhanced at a time, so the int16 temporaries stay a few MB instead of several full pages
+ENHANCE_BAND_ROWS = 256
+
+def enhance_array(gray, band_rows=ENHANCE_BAND_ROWS):
     """
-    Converts a PDF file into a list of PIL images.
+    Vectorised enhance_image for a grayscale page array: the same contrast, sharpness
+    and median steps with identical output, but without PIL images or RGB copies.
+    The page is processed in bands of rows (each with a two-row halo for the 3x3 filters).
 
-    @param pdf_path: Path to the PDF file.
-    @param zoom_x: Horizontal zoom factor (default is 2.0).
-    @param zoom_y: Vertical zoom factor (default is 2.0).
+    @param gray: (H, W) uint8 array.
+    @return: Enhanced (H, W) uint8 array.
+    """
+    height = gray.shape[0]
+    # Contrast 2: 2 * v - mean, as one lookup table
+    mean = int(gray.mean() + 0.5)
+    lut = np.clip(2 * np.arange(256) - mean, 0, 255).astype(np.uint8)
+
+    enhanced = np.empty(gray.shape, dtype=np.uint8)
+    for start in range(0, height, band_rows):
+        end = min(height, start + band_rows)
+        halo_start, halo_end = max(0, start - 2), min(height, end + 2)
+        contrasted = cv2.LUT(gray[halo_start:halo_end], lut)
+
+        # Sharpness 3: 3 * v - 2 * smooth, smooth being PIL's SMOOTH kernel (centre 5, neighbours 1, / 13, rounded)
+        contrasted16 = contrasted.astype(np.int16)
+        smooth = cv2.boxFilter(contrasted, cv2.CV_16S, (3, 3), normalize=False, borderType=cv2.BORDER_REPLICATE)
+        smooth += 4 * contrasted16
+        smooth += 6
+        smooth //= 13
+        # PIL leaves the outermost pixels of the page unfiltered
+        smooth[:, [0, -1]] = contrasted16[:, [0, -1]]
+        if halo_start == 0:
+            smooth[0] = contrasted16[0]
+        if halo_end == height:
+            smooth[-1] = contrasted16[-1]
+        contrasted16 *= 3
+        contrasted16 -= 2 * smooth
+        sharp = np.clip(contrasted16, 0, 255).astype(np.uint8)
+
+        # Reduces noise; the halo rows only serve as neighbours
+        enhanced[start:end] = cv2.medianBlur(sharp, 3)[start - halo_start:end - halo_start]
+    return enhanced
+
+def render_page_array(page, dpi=400, rotation_angle=0, enhance=True):
+    """
+    Renders a single PyMuPDF page straight to grayscale as a NumPy array.
+
+    MuPDF rasterises into a single-channel (csGRAY) pixmap whose sample buffer is
+    wrapped without copying and enhanced directly, so no RGB page is ever built.
+
+    @param page: A fitz.Page.
+    @param dpi: Render resolution.
     @param rotation_angle: Rotation angle in degrees (default is 0).
-    @return: List of PIL Image objects.
+    @param enhance: Apply enhance_array to the rendered page.
+    @return: (H, W) uint8 array.
     """
-    doc = fitz.open(pdf_path)
-    images = []
+    zoom = dpi / 72
+    mat = fitz.Matrix(zoom, zoom).prerotate(rotation_angle)
+    pix = page.get_pixmap(matrix=mat, colorspace=fitz.csGRAY, alpha=False)
+    gray = np.frombuffer(pix.samples_mv, dtype=np.uint8).reshape(pix.height, pix.stride)[:, :pix.width]
+    # The view does not keep the pixmap alive, so only the enhanced result (or a copy) leaves here
+    return enhance_array(gray) if enhance else gray.copy()
+
+def render_page(page, dpi=400, rotation_angle=0, enhance=True, grayscale=False):
+    """
+    Renders a single PyMuPDF page into a PIL image.
+
+    @param page: A fitz.Page.
+    @param dpi: Render resolution.
+    @param rotation_angle: Rotation angle in degrees (default is 0).
+    @param enhance: Apply enhance_image to the rendered page.
+    @param grayscale: Render with render_page_array and return a mode "L" image sharing
+                      its buffer, instead of an RGB image.
+    @return: PIL Image object.
+    """
+    if grayscale:
+        return Image.fromarray(render_page_array(page, dpi, rotation_angle, enhance))
     zoom = dpi / 72  # Calculate zoom factor
     mat = fitz.Matrix(zoom, zoom).prerotate(rotation_angle)
-    for page_num in range(len(doc)):
-        page = doc.load_page(page_num)  # Load page
-        pix = page.get_pixmap(matrix=mat, alpha=False)
-        image = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+    pix = page.get_pixmap(matrix=mat, alpha=False)
+    image = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+    if enhance:
         image = enhance_image(image)  # Apply image enhancement
-        images.append(image)
-    return images
+    return image
+
+def pdf_to_images(pdf_path, dpi=400, rotation_angle=0, grayscale=False):
+    """
+    Converts a PDF file into a list of PIL images.
+
+    @param pdf_path: Path to the PDF file.
+    @param dpi: Render resolution (default is 400).
+    @param rotation_angle: Rotation angle in degrees (default is 0).
+    @param grayscale: Return mode "L" pages rendered directly to grayscale (see render_page).
+    @return: List of PIL Image objects.
+    """
+    return list(iter_pdf_pages(pdf_path, dpi, rotation_angle, grayscale))
+
+def iter_pdf_pages(pdf_path, dpi=400, rotation_angle=0, grayscale=False):
+    """
+    Generator version of pdf_to_images: renders and enhances one page at a time,
+    so only the page currently being processed is held in memory.
+
+    @param pdf_path: Path to the PDF file.
+    @param dpi: Render resolution (default is 400).
+    @param rotation_angle: Rotation angle in degrees (default is 0).
+    @param grayscale: Return mode "L" pages rendered directly to grayscale (see render_page).
+    @return: Iterator of PIL Image objects, in page order.
+    """
+    with fitz.open(pdf_path) as doc:
+        for page in doc:
+            yield render_page(page, dpi, rotation_angle, grayscale=grayscale)
+
+# File in a page folder naming the document its page files were rendered from
+PAGE_FOLDER_MARKER = '.document'
+
+def document_id(pdf_path, dpi=400, rotation_angle=0, grayscale=False, enhance=True):
+    """
+    Identifies the page files of a PDF rendered with the given settings.
+
+    The PDF is identified by its absolute path, size and modification time, so a
+    different or updated document gets a new id even under the same file name.
+
+    @return: Short hexadecimal id.
+    """
+    stat = os.stat(pdf_path)
+    key = repr((os.path.abspath(pdf_path), stat.st_size, stat.st_mtime_ns, dpi, rotation_angle, grayscale, enhance))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+def claim_page_folder(output_folder, doc_id, prefix='page_'):
+    """
+    Makes output_folder hold the page files of the document doc_id (see document_id).
+
+    If the folder was last used for another document, or another version of this one,
+    its page files (names starting with prefix, partial writes included) are deleted,
+    so pages are rendered again instead of being reused.
+
+    @return: True if stale page files were deleted.
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    marker = os.path.join(output_folder, PAGE_FOLDER_MARKER)
+    try:
+        with open(marker, encoding='utf-8') as f:
+            if f.read().strip() == doc_id:
+                return False
+    except FileNotFoundError:
+        pass
+    stale = [name for name in os.listdir(output_folder) if name.startswith(prefix)]
+    for name in stale:
+        try:
+            os.remove(os.path.join(output_folder, name))
+        except FileNotFoundError:
+            pass
+    # Written under a temporary name, so a concurrent reader never sees half an id
+    partial = f"{marker}.partial{os.getpid()}_{threading.get_ident()}"
+    with open(partial, 'w', encoding='utf-8') as f:
+        f.write(doc_id)
+    os.replace(partial, marker)
+    return bool(stale)
+
+class PDFPageProvider:
+    """
+    Renders the pages of a PDF on demand instead of all at once.
+
+    The document is opened once; full-resolution pages are rendered (and enhanced)
+    the first time they are requested and kept in a bounded LRU cache, and small
+    previews for display are rendered and cached separately. It can stand in for the
+    list returned by pdf_to_images: indexing returns the full-resolution page, and
+    images appended after the PDF pages (e.g. loaded crops) are held as-is.
+
+    Example:
+    --------
+    pages = PDFPageProvider("document.pdf", dpi=400, preview_dpi=96)
+    preview = pages.get_preview(0)      # fast, for display
+    pixels = pages.get_preview_array(0) # the same, as an array for image_bridge
+    width, height = pages.page_size(0)  # size of pages[0], without rendering it
+    path = pages.page_path(0, "temp_images")  # rendered and saved on first use
+    raw = pages.page_path(0, "temp_images", store="npy")  # raw, memory-mapped by readers
+
+    gray = PDFPageProvider("document.pdf", grayscale=True)
+    pixels = gray.get_array(0)          # (H, W) uint8, no RGB round-trip
+    """
+
+    def __init__(self, pdf_path, dpi=400, preview_dpi=96, max_cached_pages=4, max_cached_previews=32, rotation_angle=0, grayscale=False):
+        """
+        @param pdf_path: Path to the PDF file.
+        @param dpi: Resolution of the full pages used for table detection and OCR.
+        @param preview_dpi: Resolution of the display previews.
+        @param max_cached_pages: Number of decoded full-resolution pages kept in memory.
+        @param max_cached_previews: Number of previews kept in memory.
+        @param rotation_angle: Rotation angle in degrees (default is 0).
+        @param grayscale: Render pages straight to grayscale; pages are then mode "L" images
+                          and get_array returns the rendered buffer itself.
+        """
+        self.pdf_path = pdf_path
+        self.dpi = dpi
+        self.preview_dpi = preview_dpi
+        self.max_cached_pages = max_cached_pages
+        self.max_cached_previews = max_cached_previews
+        self.rotation_angle = rotation_angle
+        self.grayscale = grayscale
+        self._doc = fitz.open(pdf_path)
+        self.page_count = len(self._doc)
+        # Page files in a folder claimed for another id are stale, see page_path
+        self.document_id = document_id(pdf_path, dpi, rotation_angle, grayscale)
+        self._page_folders = set()
+        self._extra_images = []
+        self._pages = OrderedDict()
+        self._previews = OrderedDict()
+        # PyMuPDF documents are not thread-safe; OCR may request pages from a worker thread
+        self._lock = threading.RLock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return self.page_count + len(self._extra_images)
+
+    def __getitem__(self, index):
+        return self.get_page(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.get_page(index)
+
+    def append(self, image):
+        """Adds an in-memory image after the PDF pages."""
+        self._extra_images.append(image)
+
+    def clear(self):
+        """Drops appended images and cached renders; PDF pages are re-rendered when next requested."""
+        with self._lock:
+            self._extra_images.clear()
+            self._pages.clear()
+            self._previews.clear()
+
+    def _index(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Page index out of range: {index}")
+        return index
+
+    def _cached_render(self, cache, max_size, index, dpi):
+        with self._lock:
+            if index in cache:
+                cache.move_to_end(index)
+                return cache[index]
+            if self.grayscale:
+                # Cached as the rendered array; get_page wraps it in an image without copying
+                image = render_page_array(self._doc.load_page(index), dpi, self.rotation_angle)
+            else:
+                image = render_page(self._doc.load_page(index), dpi, self.rotation_angle)
+            cache[index] = image
+            while len(cache) > max_size:
+                cache.popitem(last=False)
+            return image
+
+    def _as_image(self, render):
+        """Cached renders are arrays in grayscale mode; Image.fromarray shares their memory."""
+        return Image.fromarray(render) if self.grayscale else render
+
+    def get_page(self, index):
+        """Returns the full-resolution page as a PIL image, rendering it if it is not cached."""
+        index = self._index(index)
+        if index >= self.page_count:
+            return self._extra_images[index - self.page_count]
+        return self._as_image(self._cached_render(self._pages, self.max_cached_pages, index, self.dpi))
+
+    def get_array(self, index):
+        """
+        Returns the full-resolution page as a NumPy array, for detection and OCR.
+
+        In grayscale mode this is the cached (H, W) render itself, without any copy;
+        otherwise the page is converted to an (H, W, 3) array.
+        """
+        index = self._index(index)
+        if self.grayscale and index < self.page_count:
+            return self._cached_render(self._pages, self.max_cached_pages, index, self.dpi)
+        return np.asarray(self.get_page(index))
+
+    def get_preview(self, index):
+        """Returns a low-resolution rendering of the page for display."""
+        index = self._index(index)
+        if index >= self.page_count:
+            return self._extra_images[index - self.page_count]
+        return self._as_image(self._cached_render(self._previews, self.max_cached_previews, index, self.preview_dpi))
+
+    def get_preview_array(self, index):
+        """
+        Returns the display preview as a NumPy array; in grayscale mode this is the cached
+        render itself, so it can be wrapped for display without any copy.
+        """
+        index = self._index(index)
+        if self.grayscale and index < self.page_count:
+            return self._cached_render(self._previews, self.max_cached_previews, index, self.preview_dpi)
+        return np.asarray(self.get_preview(index))
+
+    def page_size(self, index, dpi=None):
+        """Returns the (width, height) in pixels of the page rendered at `dpi` (default: full resolution), without rendering it."""
+        index = self._index(index)
+        if index >= self.page_count:
+            return self._extra_images[index - self.page_count].size
+        zoom = (dpi or self.dpi) / 72
+        with self._lock:
+            rect = self._doc.load_page(index).rect * fitz.Matrix(zoom, zoom).prerotate(self.rotation_angle)
+        irect = rect.irect
+        return irect.width, irect.height
+
+    def page_path(self, index, output_folder, image_format='png', store=None):
+        """
+        Returns the path of the full-resolution page image in output_folder
+        (named page_{index + 1}), rendering and saving it only if it does not exist yet.
+
+        The first call for a folder claims it for this document (see claim_page_folder),
+        so page files left by another document are rendered again rather than reused.
+        Files are written with image_store.save_image, so readers never see half a page.
+
+        @param image_format: "png" or "npy", used when no store is given.
+        @param store: image_store store name ("npy", "png-fast", "png") to write the page
+                      with; its extension replaces image_format.
+        """
+        if store is None:
+            if image_format not in ('png', 'npy'):
+                raise ValueError(f"Unsupported page image format '{image_format}', expected 'png' or 'npy'")
+            store = image_format
+        path = image_store.get_store(store).path_for(os.path.join(output_folder, f'page_{index + 1}'))
+        with self._lock:
+            if output_folder not in self._page_folders:
+                claim_page_folder(output_folder, self.document_id)
+                self._page_folders.add(output_folder)
+        if not os.path.exists(path):
+            image_store.save_image(self.get_array(index), path, store)
+        return path
+
+    def close(self):
+        """Releases the document and all cached renders."""
+        with self._lock:
+            self.clear()
+            self._doc.close()
 
 def convert_pdf_to_images(pdf_path, output_folder, image_format='png', zoom_x=2.0, zoom_y=2.0, rotation_angle=0):
     """
@@ -0,0 +1,269 @@
+# pipeline.py
+
+import time
+import queue
+import threading
+
+
+def prefetch(iterable, maxsize=2):
+    """
+    Runs `iterable` on a background thread and yields its items through a bounded queue,
+    so the producer works at most `maxsize` items ahead of the consumer.
+
+    Exceptions raised by the producer are re-raised in the consumer. Closing the
+    returned generator (e.g. breaking out of the loop) stops the producer.
+    """
+    items = queue.Queue(maxsize)
+    stop = threading.Event()
+    end = object()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+        except BaseException as error:
+            put((end, error))
+            return
+        put((end, None))
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while True:
+            item, error = items.get()
+            if item is end:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+        producer.join()
+        # Stop nested stages (e.g. another prefetch) promptly rather than at garbage collection
+        close = getattr(iterable, 'close', None)
+        if close is not None:
+            close()
+
+
+class _Stage:
+    """One stage of a Pipeline: a function, its worker threads and its input queue."""
+
+    def __init__(self, name, func, workers, queue_size):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.input = queue.Queue(queue_size)
+        self.items = 0
+        self.busy_seconds = 0.0
+        self.lock = threading.Lock()
+
+    def record(self, seconds):
+        with self.lock:
+            self.items += 1
+            self.busy_seconds += seconds
+
+
+class Pipeline:
+    """
+    Runs items through a chain of stages, each with its own pool of worker threads,
+    connected by bounded queues, so e.g. page N+1 renders and is table-detected while
+    page N is being OCR'd.
+
+    The last step usually runs in the consuming thread (OCR engines belong to the
+    thread that created them); wrap it in measure() so it shows up in metrics().
+
+    Example:
+    --------
+    pipeline = Pipeline(queue_size=2)
+    pipeline.add_stage("render", render_page)
+    pipeline.add_stage("detect", detect_cells, workers=2)
+    for page_num, cells in pipeline.run(range(page_count)):
+        with pipeline.measure("ocr"):
+            ocr(cells)
+    print(pipeline.metrics())
+    """
+
+    def __init__(self, queue_size=2):
+        """
+        @param queue_size: Maximum number of items waiting in front of each stage
+                           (and in front of the consumer).
+        """
+        self.queue_size = queue_size
+        self._stages = []
+        self._measured = {}
+        self._output = None
+        self._start_time = None
+        self.max_pending = 0  # Largest number of outputs held back for reordering by the last run()
+
+    def add_stage(self, name, func, workers=1):
+        """Appends a stage that maps each item through func(item) on `workers` threads. Returns self."""
+        self._stages.append(_Stage(name, func, workers, self.queue_size))
+        return self
+
+    def measure(self, name):
+        """Context manager timing work done in the consuming thread as stage `name`."""
+        return _Measure(self._measured.setdefault(name, _Stage(name, None, 1, 0)))
+
+    def metrics(self):
+        """
+        Per-stage statistics, in pipeline order (consumer-side stages last):
+        {name: {'workers', 'items', 'busy_seconds', 'utilization', 'queue_depth'}}.
+        Utilization is busy time over wall time times workers; queue_depth is the
+        number of items currently waiting in front of the stage.
+        """
+        elapsed = time.perf_counter() - self._start_time if self._start_time else 0.0
+        stats = {stage.name: self._stage_metrics(stage, elapsed, stage.input) for stage in self._stages}
+        for stage in self._measured.values():
+            stats[stage.name] = self._stage_metrics(stage, elapsed, self._output)
+        return stats
+
+    @staticmethod
+    def _stage_metrics(stage, elapsed, waiting):
+        return {
+            'workers': stage.workers,
+            'items': stage.items,
+            'busy_seconds': stage.busy_seconds,
+            'utilization': stage.busy_seconds / (elapsed * stage.workers) if elapsed else 0.0,
+            'queue_depth': waiting.qsize() if waiting is not None else 0,
+        }
+
+    def run(self, items, ordered=True):
+        """
+        Feeds `items` through the stages and yields the output of the last stage.
+
+        @param ordered: Yield outputs in input order (default); otherwise in completion order.
+                        In order, at most queue_size + (total workers) items are in flight
+                        between the input and the consumer, so one slow item cannot let the
+                        ones after it pile up waiting to be reordered.
+        Exceptions raised by a stage are re-raised here; closing the generator stops all stages.
+        """
+        if not self._stages:
+            yield from items
+            return
+
+        self._start_time = time.perf_counter()
+        self._output = queue.Queue(self.queue_size)
+        stop = threading.Event()
+        end = object()
+        outputs = [stage.input for stage in self._stages[1:]] + [self._output]
+        window = threading.Semaphore(self.queue_size + sum(stage.workers for stage in self._stages)) if ordered else None
+        self.max_pending = 0
+
+        def put(target, item):
+            while not stop.is_set():
+                try:
+                    target.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def get(source):
+            while True:
+                try:
+                    return source.get(timeout=0.1)
+                except queue.Empty:
+                    if stop.is_set():
+                        return end, None
+
+        def feed():
+            try:
+                for seq, item in enumerate(items):
+                    if window is not None:
+                        # Wait for the consumer to yield an earlier item before feeding another
+                        while not window.acquire(timeout=0.1):
+                            if stop.is_set():
+                                return
+                    if not put(self._stages[0].input, (seq, item)):
+                        return
+            except BaseException as error:
+                put(self._output, (end, error))
+                return
+            put(self._stages[0].input, (end, None))
+
+        def work(stage, target, remaining):
+            while True:
+                seq, item = get(stage.input)
+                if seq is end:
+                    # Let sibling workers see the end marker; the last one forwards it
+                    with stage.lock:
+                        remaining[0] -= 1
+                        last = remaining[0] == 0
+                    put(target if last else stage.input, (end, None))
+                    return
+                try:
+                    start = time.perf_counter()
+                    result = stage.func(item)
+                    stage.record(time.perf_counter() - start)
+                except BaseException as error:
+                    put(self._output, (end, error))
+                    stop.set()
+                    return
+                if not put(target, (seq, result)):
+                    return
+
+        threads = [threading.Thread(target=feed, daemon=True)]
+        for stage, target in zip(self._stages, outputs):
+            remaining = [stage.workers]
+            threads.extend(
+                threading.Thread(target=work, args=(stage, target, remaining), daemon=True, name=f"{stage.name}-{index}")
+                for index in range(stage.workers)
+            )
+        for thread in threads:
+            thread.start()
+
+        pending = {}
+        next_seq = 0
+        try:
+            while True:
+                seq, result = get(self._output)
+                if seq is end:
+                    if result is not None:
+                        raise result
+                    return
+                if not ordered:
+                    yield result
+                    continue
+                pending[seq] = result
+                self.max_pending = max(self.max_pending, len(pending))
+                while next_seq in pending:
+                    window.release()
+                    yield pending.pop(next_seq)
+                    next_seq += 1
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+            close = getattr(items, 'close', None)
+            if close is not None:
+                close()
+
+
+class _Measure:
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stage.record(time.perf_counter() - self.start)
+
+
+def format_metrics(metrics):
+    """One-line summary of Pipeline.metrics(), e.g. 'render 40% busy, 1 queued | ocr 98% busy, 0 queued'."""
+    return " | ".join(
+        f"{name} {stage['utilization'] * 100:.0f}% busy, {stage['queue_depth']} queued"
+        for name, stage in metrics.items()
+    )
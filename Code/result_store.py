@@ -0,0 +1,174 @@
+# result_store.py
+
+import csv
+
+import numpy as np
+
+from blank_cells import BLANK_SOURCE
+
+# Results below this confidence are flagged for review, as in RunThroughTest.process_results
+LOW_CONFIDENCE_THRESHOLD = 0.8
+
+
+class ResultStore:
+    """
+    Columnar store of OCR results: one entry per cell in parallel arrays (row, column,
+    confidence) plus a list of texts, and a dense (rows, columns) grid of entry indices
+    for constant-time cell lookup.
+
+    Nothing is built per cell for display; a table model asks for the cells it shows.
+    Sorting and filtering return arrays of row numbers, so any number of orderings can
+    be layered over the same data without copying it.
+
+    Example:
+    --------
+    store = ResultStore.from_results(results)   # process_image result tuples
+    store.text(3, 1), store.confidence(3, 1)
+    rows = store.filter_rows("wien")            # rows with a cell containing "wien"
+    rows = store.sort_order(2, rows=rows)       # ... ordered by column 2
+    """
+
+    def __init__(self, rows, cols, texts, confidences=None, shape=(0, 0)):
+        """
+        @param rows: Row index of every entry.
+        @param cols: Column index of every entry.
+        @param texts: Text of every entry.
+        @param confidences: Confidence of every entry; NaN (or None for all) when unknown.
+        @param shape: Minimum (rows, columns), for tables ending in empty rows or columns.
+        """
+        self.rows = np.asarray(rows, dtype=np.int32)
+        self.cols = np.asarray(cols, dtype=np.int32)
+        self.texts = list(texts)
+        if confidences is None:
+            self.confidences = np.full(len(self.texts), np.nan, dtype=np.float32)
+        else:
+            self.confidences = np.asarray(confidences, dtype=np.float32)
+
+        n_rows = max(shape[0], int(self.rows.max()) + 1 if len(self.rows) else 0)
+        n_cols = max(shape[1], int(self.cols.max()) + 1 if len(self.cols) else 0)
+        self.grid = np.full((n_rows, n_cols), -1, dtype=np.int32)
+        # Keep the last entry for a cell, as a dict of rows would
+        keys = (self.rows.astype(np.int64) * max(n_cols, 1) + self.cols)[::-1]
+        _, first = np.unique(keys, return_index=True)
+        last = len(keys) - 1 - first
+        self.grid[self.rows[last], self.cols[last]] = last
+        self._sort_keys = {}
+        self._row_texts = None
+
+    @classmethod
+    def from_results(cls, results):
+        """
+        Builds a store from process_image result tuples (row, col, text, confidence, source, label),
+        keeping the same cells as RunThroughTest.process_results: None results and blank
+        cells are left out.
+        """
+        rows, cols, texts, confidences = [], [], [], []
+        for result in results:
+            if result is None or result[4] == BLANK_SOURCE:
+                continue
+            rows.append(result[0])
+            cols.append(result[1])
+            texts.append(result[2])
+            confidences.append(result[3])
+        return cls(rows, cols, texts, confidences)
+
+    @classmethod
+    def from_table_data(cls, table_data):
+        """Builds a store from a {row: {col: text}} table, with unknown confidences."""
+        entries = [(row, col, text) for row, cols in table_data.items() for col, text in cols.items()]
+        return cls([e[0] for e in entries], [e[1] for e in entries], [e[2] for e in entries])
+
+    @classmethod
+    def from_csv(cls, csv_path):
+        """Builds a store from a CSV file (every non-empty cell), with unknown confidences."""
+        rows, cols, texts = [], [], []
+        n_rows = n_cols = 0
+        with open(csv_path, 'r', newline='', encoding='utf-8') as csvfile:
+            for row, values in enumerate(csv.reader(csvfile)):
+                n_rows, n_cols = row + 1, max(n_cols, len(values))
+                for col, text in enumerate(values):
+                    if text:
+                        rows.append(row)
+                        cols.append(col)
+                        texts.append(text)
+        return cls(rows, cols, texts, shape=(n_rows, n_cols))
+
+    @property
+    def shape(self):
+        """(rows, columns) of the table."""
+        return self.grid.shape
+
+    def __len__(self):
+        return len(self.texts)
+
+    def text(self, row, col):
+        """Text of a cell, '' if it has no result."""
+        entry = self.grid[row, col]
+        return self.texts[entry] if entry >= 0 else ''
+
+    def confidence(self, row, col):
+        """Confidence of a cell, NaN if it has no result or the confidence is unknown."""
+        entry = self.grid[row, col]
+        return float(self.confidences[entry]) if entry >= 0 else float('nan')
+
+    def is_low_confidence(self, row, col, threshold=LOW_CONFIDENCE_THRESHOLD):
+        """True if the cell has a known confidence below threshold."""
+        return self.confidence(row, col) < threshold
+
+    def low_confidence_count(self, threshold=LOW_CONFIDENCE_THRESHOLD):
+        return int(np.count_nonzero(self.confidences < threshold))
+
+    def row_values(self, row):
+        """The texts of a row, '' for cells without a result."""
+        return [self.texts[entry] if entry >= 0 else '' for entry in self.grid[row]]
+
+    def _column_sort_key(self, col):
+        """Per-row sort keys of a column, built once: numbers first (by value), then texts."""
+        if col not in self._sort_keys:
+            entries = self.grid[:, col]
+            texts = np.array([self.texts[entry] if entry >= 0 else '' for entry in entries], dtype=str)
+            numbers = np.full(len(entries), np.inf)
+            for row, text in enumerate(texts):
+                try:
+                    numbers[row] = float(text.replace(',', ''))
+                except ValueError:
+                    pass
+            self._sort_keys[col] = (np.char.lower(texts), numbers)
+        return self._sort_keys[col]
+
+    def sort_order(self, col, descending=False, rows=None):
+        """
+        Returns `rows` (default: all rows) ordered by the cells of column `col`. Numeric
+        cells sort by value before text cells, which sort case-insensitively; ties keep
+        their order.
+        """
+        rows = np.arange(self.shape[0]) if rows is None else np.asarray(rows)
+        texts, numbers = self._column_sort_key(col)
+        # lexsort sorts by the last key first and is stable
+        if not descending:
+            return rows[np.lexsort((texts[rows], numbers[rows]))]
+        # Ties are put in reverse order first, so reversing the result keeps them in order
+        return rows[np.lexsort((np.arange(len(rows))[::-1], texts[rows], numbers[rows]))[::-1]]
+
+    def filter_rows(self, text, col=None, rows=None):
+        """
+        Returns the `rows` (default: all rows) with a cell containing `text`,
+        case-insensitively; in column `col` only if given. An empty text keeps every row.
+        """
+        rows = np.arange(self.shape[0]) if rows is None else np.asarray(rows)
+        needle = text.strip().lower()
+        if not needle:
+            return rows
+        if col is not None:
+            return rows[np.fromiter((needle in self.text(row, col).lower() for row in rows), dtype=bool, count=len(rows))]
+        if self._row_texts is None:
+            # Columns are joined with a separator no search text contains
+            self._row_texts = ['\x1f'.join(self.row_values(row)).lower() for row in range(self.shape[0])]
+        return rows[np.fromiter((needle in self._row_texts[row] for row in rows), dtype=bool, count=len(rows))]
+
+    def write_csv(self, output_csv):
+        """Writes the table to a CSV file, one line per row."""
+        with open(output_csv, mode='w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            for row in range(self.shape[0]):
+                writer.writerow(self.row_values(row))
@@ -0,0 +1,142 @@
+# table_grid.py
+
+import bisect
+
+import numpy as np
+
+
+def line_intersections(horizontal, vertical):
+    """
+    (x, y) of every crossing of horizontal lines (y positions) and vertical lines (x
+    positions), duplicates dropped. Unlike TableGrid.intersections this needs no cells,
+    so a single line on either axis still crosses every line of the other.
+    """
+    return [(x, y) for y in sorted(set(horizontal)) for x in sorted(set(vertical))]
+
+
+class TableGrid:
+    """
+    Index over a table's rows and columns for mapping page coordinates to cells.
+
+    Built from sorted (start, end) pixel pairs - Table[0] (rows) and Table[1] (columns)
+    of a TableMap page entry - it answers point -> cell and box -> cells queries by
+    binary search on the interval starts instead of scanning every cell, and maps
+    whole arrays of points at once. Gaps between intervals belong to no cell.
+
+    Example:
+    --------
+    grid = TableGrid.from_table(TableMap[page])
+    grid.cell_at(812, 455)                 # (row, col) or None
+    grid.cells_in_box(800, 440, 900, 470)  # every (row, col) the box overlaps
+    rows, cols = grid.assign(xs, ys)       # vectorized, -1 outside the grid
+    """
+
+    def __init__(self, rows, cols):
+        """
+        @param rows: (top, bottom) pixel pairs, sorted and non-overlapping.
+        @param cols: (left, right) pixel pairs, sorted and non-overlapping.
+        """
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, 2)
+        cols = np.asarray(cols, dtype=np.float64).reshape(-1, 2)
+        self.row_starts, self.row_ends = rows[:, 0], rows[:, 1]
+        self.col_starts, self.col_ends = cols[:, 0], cols[:, 1]
+
+    @classmethod
+    def from_table(cls, table):
+        """From a TableMap page entry: table[0] row pairs, table[1] column pairs."""
+        return cls(table[0], table[1])
+
+    @classmethod
+    def from_boundaries(cls, horizontal, vertical):
+        """From sorted line positions: consecutive horizontal lines bound the rows, vertical lines the columns."""
+        horizontal = sorted(set(horizontal))
+        vertical = sorted(set(vertical))
+        return cls(list(zip(horizontal[:-1], horizontal[1:])), list(zip(vertical[:-1], vertical[1:])))
+
+    @property
+    def shape(self):
+        """(number of rows, number of columns)"""
+        return len(self.row_starts), len(self.col_starts)
+
+    def __len__(self):
+        return len(self.row_starts) * len(self.col_starts)
+
+    @staticmethod
+    def _index(starts, ends, value):
+        index = bisect.bisect_right(starts, value) - 1
+        return index if index >= 0 and value < ends[index] else -1
+
+    def row_at(self, y):
+        """Row index containing y, or -1."""
+        return self._index(self.row_starts, self.row_ends, y)
+
+    def col_at(self, x):
+        """Column index containing x, or -1."""
+        return self._index(self.col_starts, self.col_ends, x)
+
+    def cell_at(self, x, y):
+        """(row, col) of the cell containing the point, or None."""
+        row, col = self.row_at(y), self.col_at(x)
+        return (row, col) if row >= 0 and col >= 0 else None
+
+    @staticmethod
+    def _overlapping(starts, ends, low, high):
+        first = np.searchsorted(ends, low, side='right')
+        last = np.searchsorted(starts, high, side='left')
+        return range(int(first), int(last))
+
+    def cells_in_box(self, left, top, right, bottom):
+        """Every (row, col) whose cell overlaps the box, in row-major order."""
+        rows = self._overlapping(self.row_starts, self.row_ends, top, bottom)
+        cols = self._overlapping(self.col_starts, self.col_ends, left, right)
+        return [(row, col) for row in rows for col in cols]
+
+    @staticmethod
+    def _assign(starts, ends, values):
+        if not len(starts):
+            return np.full(len(values), -1)
+        index = np.searchsorted(starts, values, side='right') - 1
+        inside = (index >= 0) & (values < ends[np.clip(index, 0, None)])
+        return np.where(inside, index, -1)
+
+    def assign(self, xs, ys):
+        """Vectorized cell_at: (row_indices, col_indices) arrays, -1 where a point is outside the grid."""
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        return self._assign(self.row_starts, self.row_ends, ys), self._assign(self.col_starts, self.col_ends, xs)
+
+    def assign_boxes(self, boxes):
+        """assign() for the centres of (N, 4) (left, top, right, bottom) boxes."""
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        return self.assign((boxes[:, 0] + boxes[:, 2]) / 2, (boxes[:, 1] + boxes[:, 3]) / 2)
+
+    def bbox(self, row, col):
+        """(left, upper, right, lower) of a cell, as ints."""
+        return (int(self.col_starts[col]), int(self.row_starts[row]), int(self.col_ends[col]), int(self.row_ends[row]))
+
+    def iter_bboxes(self, width=None, height=None, min_size=1, rows_outer=True):
+        """
+        Yields (row, col, bbox) for every cell at least min_size pixels wide and tall,
+        clipped to width x height if given.
+        """
+        lefts, rights = self.col_starts.astype(int), self.col_ends.astype(int)
+        tops, bottoms = self.row_starts.astype(int), self.row_ends.astype(int)
+        if width is not None:
+            lefts, rights = np.clip(lefts, 0, width), np.clip(rights, 0, width)
+        if height is not None:
+            tops, bottoms = np.clip(tops, 0, height), np.clip(bottoms, 0, height)
+        wide = (rights - lefts) >= min_size
+        tall = (bottoms - tops) >= min_size
+
+        pairs = [(row, col) for row in np.flatnonzero(tall) for col in np.flatnonzero(wide)]
+        if not rows_outer:
+            pairs.sort(key=lambda pair: (pair[1], pair[0]))
+        for row, col in pairs:
+            yield int(row), int(col), (int(lefts[col]), int(tops[row]), int(rights[col]), int(bottoms[row]))
+
+    def intersections(self):
+        """(x, y) of every row/column boundary crossing, as an (N, 2) array."""
+        xs = np.unique(np.concatenate([self.col_starts, self.col_ends]))
+        ys = np.unique(np.concatenate([self.row_starts, self.row_ends]))
+        grid_x, grid_y = np.meshgrid(xs, ys)
+        return np.column_stack([grid_x.ravel(), grid_y.ravel()])
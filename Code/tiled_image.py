@@ -0,0 +1,140 @@
+# tiled_image.py
+
+import math
+import threading
+
+import cv2
+import numpy as np
+
+# Scales of the pyramid levels relative to the full-resolution page
+LEVEL_SCALES = (0.125, 0.25, 0.5, 1.0)
+# Side of a square tile in level pixels
+TILE_SIZE = 512
+
+
+def level_for_scale(view_scale, scales=LEVEL_SCALES):
+    """
+    Returns the level to draw at a view scale (device pixels per page pixel): the coarsest
+    level that is not magnified on screen, or the finest level when zoomed in further.
+    """
+    for scale in sorted(scales):
+        if scale >= view_scale:
+            return scale
+    return max(scales)
+
+
+class ImagePyramid:
+    """
+    Downsampled levels of a full-resolution image, cut into square tiles for display.
+
+    Levels are built from the full-resolution pixels with area interpolation; the
+    full-resolution level is the pixel array itself, and tiles are views into their
+    level, so nothing is copied to cut them. Positions are in full-resolution (page)
+    pixels, the coordinates of the graphics scene.
+
+    Example:
+    --------
+    pyramid = ImagePyramid(width, height)
+    pyramid.build(lambda: provider.get_array(0), cancel_event=cancel)  # e.g. in a thread
+    scale = level_for_scale(0.4)                                       # -> 0.5
+    for col, row in pyramid.tiles_in_rect(scale, 1000, 2000, 800, 600):
+        pixels = pyramid.tile(scale, col, row)
+        x, y, w, h = pyramid.tile_rect(scale, col, row)
+    """
+
+    def __init__(self, width, height, scales=LEVEL_SCALES, tile_size=TILE_SIZE):
+        """
+        @param width: Width of the full-resolution image.
+        @param height: Height of the full-resolution image.
+        @param scales: Scales of the levels to build.
+        @param tile_size: Side of a tile in level pixels.
+        """
+        self.width = width
+        self.height = height
+        self.scales = tuple(sorted(scales))
+        self.tile_size = tile_size
+        self._levels = {}
+        # Levels are built by one thread and read by the GUI thread
+        self._lock = threading.Lock()
+
+    def level_size(self, scale):
+        """(width, height) of a level in pixels."""
+        return max(1, round(self.width * scale)), max(1, round(self.height * scale))
+
+    def has_level(self, scale):
+        with self._lock:
+            return scale in self._levels
+
+    def built_levels(self):
+        with self._lock:
+            return sorted(self._levels)
+
+    def level(self, scale):
+        """Pixels of a built level."""
+        with self._lock:
+            return self._levels[scale]
+
+    def build_level(self, scale, pixels):
+        """Builds a level from the full-resolution pixels and returns it."""
+        if scale == 1.0:
+            level = pixels
+        else:
+            level = cv2.resize(pixels, self.level_size(scale), interpolation=cv2.INTER_AREA)
+        with self._lock:
+            self._levels[scale] = level
+        return level
+
+    def build(self, load_pixels, scales=None, cancel_event=None, on_level=None):
+        """
+        Builds levels (default: all) from coarse to fine, so a usable level is ready soon.
+
+        @param load_pixels: Function returning the full-resolution (H, W) or (H, W, C) uint8
+                            array; only called if a level has to be built.
+        @param scales: Scales of the levels to build; levels already built are skipped.
+        @param cancel_event: threading.Event stopping the build between levels.
+        @param on_level: Called with the scale of every level built.
+        """
+        pixels = None
+        for scale in sorted(self.scales if scales is None else scales):
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            if self.has_level(scale):
+                continue
+            if pixels is None:
+                pixels = np.asarray(load_pixels())
+                if pixels.shape[:2] != (self.height, self.width):
+                    raise ValueError(f"Expected a {self.width}x{self.height} image, got {pixels.shape[1]}x{pixels.shape[0]}")
+            self.build_level(scale, pixels)
+            if on_level is not None:
+                on_level(scale)
+
+    def tile_counts(self, scale):
+        """(columns, rows) of tiles of a level."""
+        width, height = self.level_size(scale)
+        return math.ceil(width / self.tile_size), math.ceil(height / self.tile_size)
+
+    def tiles_in_rect(self, scale, x, y, width, height):
+        """(column, row) of the tiles of a level intersecting a rectangle in page pixels."""
+        columns, rows = self.tile_counts(scale)
+        level_width, level_height = self.level_size(scale)
+        # Page pixels covered by a full tile
+        span_x, span_y = self.tile_size * self.width / level_width, self.tile_size * self.height / level_height
+        first_col, first_row = max(0, int(x // span_x)), max(0, int(y // span_y))
+        last_col = min(columns - 1, int(math.ceil((x + width) / span_x)) - 1)
+        last_row = min(rows - 1, int(math.ceil((y + height) / span_y)) - 1)
+        return [(col, row) for row in range(first_row, last_row + 1) for col in range(first_col, last_col + 1)]
+
+    def tile(self, scale, col, row):
+        """Pixels of a tile of a built level, as a view into the level."""
+        size = self.tile_size
+        return self.level(scale)[row * size:(row + 1) * size, col * size:(col + 1) * size]
+
+    def tile_rect(self, scale, col, row):
+        """(x, y, width, height) in page pixels covered by a tile."""
+        level_width, level_height = self.level_size(scale)
+        size = self.tile_size
+        left, top = col * size, row * size
+        right, bottom = min(left + size, level_width), min(top + size, level_height)
+        # Level pixels map onto the page with the level's exact (rounded) scale
+        scale_x, scale_y = self.width / level_width, self.height / level_height
+        return left * scale_x, top * scale_y, (right - left) * scale_x, (bottom - top) * scale_y
@@ -0,0 +1,74 @@
+"""
+Micro-benchmark of the peak/trough engines over the PDFs in Examples/.
+
+Renders every page, then times the "python" and "numpy" engines of both
+luminosity detectors on the row and column profiles and checks that the
+detected indices are identical.
+
+Usage (from Code/unitTests):
+    python benchmark_extrema.py [--dpi 400] [--pages 2]
+"""
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pdf_to_image
+import luminosity_table_detection as ltd
+from TableDetection import luminositybased
+
+EXAMPLES_DIR = Path(__file__).resolve().parent.parent.parent / 'Examples'
+
+
+def time_call(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def benchmark_page(image, horizontal_gap_ratio=17/2077, vertical_gap_ratio=80/1474):
+    """Time both engines on one page; returns (python_seconds, numpy_seconds, identical)."""
+    width, height = image.size
+    luminosity = ltd.calculate_luminosity(image)
+    cases = [
+        (ltd.find_troughs, 1, max(1, round(height * horizontal_gap_ratio))),
+        (ltd.find_troughs, 0, max(1, round(width * vertical_gap_ratio))),
+        (luminositybased.find_troughs, 1, round(height * horizontal_gap_ratio)),
+        (luminositybased.find_troughs, 0, round(width * vertical_gap_ratio)),
+    ]
+    python_total = numpy_total = 0.0
+    identical = True
+    for func, axis, gap in cases:
+        try:
+            expected, python_time = time_call(func, axis, luminosity, gap, engine="python")
+        except IndexError:
+            expected, python_time = None, 0.0
+        actual, numpy_time = time_call(func, axis, luminosity, gap, engine="numpy")
+        python_total += python_time
+        numpy_total += numpy_time
+        if expected is not None and expected != actual:
+            identical = False
+    return python_total, numpy_total, identical
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dpi', type=int, default=400)
+    parser.add_argument('--pages', type=int, default=2, help="Maximum pages per PDF")
+    args = parser.parse_args()
+
+    print(f"{'PDF':<35} {'page':>4} {'python s':>9} {'numpy s':>9} {'speedup':>8}  identical")
+    for pdf_path in sorted(EXAMPLES_DIR.glob('*.pdf')):
+        images = pdf_to_image.pdf_to_images(str(pdf_path), dpi=args.dpi)[:args.pages]
+        for page_num, image in enumerate(images):
+            python_time, numpy_time, identical = benchmark_page(image)
+            speedup = python_time / numpy_time if numpy_time else float('inf')
+            print(f"{pdf_path.name:<35} {page_num:>4} {python_time:>9.3f} {numpy_time:>9.3f} {speedup:>7.1f}x  {identical}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,375 @@
+"""
+Benchmark of the whole pipeline over the bundled examples, written as JSON.
+
+PDFs in Examples/: every page is rendered, enhanced, table-detected, cellularized,
+OCR'd and written to CSV, and each stage is measured on its own (wall time, CPU
+time and peak resident memory while it runs). Cellularised-Example sets (folders of
+page_<id>_<row>_<col>.png cells with an "Expected Output.csv"): the cells are OCR'd
+and written to CSV, and the CSV is compared cell by cell with the expected one.
+
+The OCR and CSV stages need PaddleOCR and EasyOCR; with --no-ocr, or when they
+cannot be imported, they are recorded as skipped and the other stages still run.
+Results carry the git commit, so two runs can be compared for speed or accuracy
+regressions with --compare.
+
+Usage (from Code/unitTests):
+    python benchmark_pipeline.py [--dpi 400] [--pages 2] [--no-ocr] [--output benchmark.json]
+    python benchmark_pipeline.py --compare before.json after.json [--threshold 0.1]
+"""
+
+import os
+import re
+import sys
+import csv
+import json
+import time
+import difflib
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import fitz  # PyMuPDF
+
+import pdf_to_image
+from Cellularize import Cell, iter_cells
+from background_detection import detect_page_table
+
+EXAMPLES_DIR = Path(__file__).resolve().parent.parent.parent / 'Examples'
+CELLS_DIR = EXAMPLES_DIR / 'Cellularised-Example'
+EXPECTED_CSV = 'Expected Output.csv'
+PDF_STAGES = ('render', 'enhance', 'detect', 'cellularize', 'ocr', 'csv')
+# Row and column at the end of a cellularize_Page_colrow file name
+CELL_NAME = re.compile(r'_(\d+)_(\d+)\.png$')
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB (psutil, or /proc on Linux), or None if unavailable."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2**20
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class StageRecorder:
+    """
+    Accumulates wall time, CPU time and peak RSS per named stage.
+
+    CPU time is the process time of all threads, so it exceeds wall time when a stage
+    runs on several cores. Peak RSS is sampled on a background thread while a stage runs.
+
+    Example:
+    --------
+    recorder = StageRecorder()
+    with recorder.measure('render'):
+        pixels = render(page)
+    recorder.stages['render']  # {'calls': 1, 'wall_seconds': ..., 'cpu_seconds': ..., 'peak_rss_mb': ...}
+    """
+
+    def __init__(self, sample_interval=0.01):
+        self.sample_interval = sample_interval
+        self.stages = {}
+
+    def skip(self, name, reason):
+        """Records a stage that did not run."""
+        self.stages[name] = {'skipped': reason}
+
+    def measure(self, name):
+        return _StageMeasure(self, name)
+
+    def _record(self, name, wall, cpu, peak):
+        stage = self.stages.setdefault(name, {'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'peak_rss_mb': None})
+        stage['calls'] += 1
+        stage['wall_seconds'] += wall
+        stage['cpu_seconds'] += cpu
+        if peak is not None:
+            stage['peak_rss_mb'] = max(peak, stage['peak_rss_mb'] or 0.0)
+
+
+class _StageMeasure:
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+
+    def _sample(self):
+        while not self._done.wait(self.recorder.sample_interval):
+            self._peak_sample()
+
+    def _peak_sample(self):
+        rss = current_rss_mb()
+        if rss is not None:
+            self.peak = max(rss, self.peak or 0.0)
+
+    def __enter__(self):
+        self.peak = None
+        self._peak_sample()
+        self._done = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+        self._sampler.start()
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        self._done.set()
+        self._sampler.join()
+        self._peak_sample()
+        self.recorder._record(self.name, wall, cpu, self.peak)
+
+
+def read_csv_grid(path):
+    """Reads a CSV as a list of rows of stripped strings."""
+    with open(path, newline='', encoding='utf-8-sig') as file:
+        return [[value.strip() for value in row] for row in csv.reader(file)]
+
+
+def normalize_cell(text):
+    """Collapses whitespace, so line breaks inside a cell do not count as errors."""
+    return ' '.join(str(text).split())
+
+
+def compare_csv(actual_path, expected_path):
+    """
+    Compares two CSV files cell by cell over every position present in either.
+
+    @return: {'cells', 'exact_matches', 'exact_rate', 'similarity'}; similarity is the
+             mean difflib ratio of the cell texts (1.0 for two empty cells).
+    """
+    actual, expected = read_csv_grid(actual_path), read_csv_grid(expected_path)
+    rows = max(len(actual), len(expected))
+    cells = exact = 0
+    similarity = 0.0
+    for row in range(rows):
+        actual_row = actual[row] if row < len(actual) else []
+        expected_row = expected[row] if row < len(expected) else []
+        for col in range(max(len(actual_row), len(expected_row))):
+            got = normalize_cell(actual_row[col]) if col < len(actual_row) else ''
+            want = normalize_cell(expected_row[col]) if col < len(expected_row) else ''
+            cells += 1
+            exact += got == want
+            similarity += 1.0 if got == want else difflib.SequenceMatcher(None, got, want).ratio()
+    return {
+        'cells': cells,
+        'exact_matches': exact,
+        'exact_rate': exact / cells if cells else 1.0,
+        'similarity': similarity / cells if cells else 1.0,
+    }
+
+
+def load_ocr(use_ocr=True):
+    """Returns (ocr_module, ocr, reader), or (None, None, reason) when OCR is off or unavailable."""
+    if not use_ocr:
+        return None, None, 'disabled with --no-ocr'
+    try:
+        import paddle
+        import engine_server
+        import RunThroughTest as ocr_module
+    except ImportError as e:
+        return None, None, f'OCR engines unavailable: {e}'
+    ocr, reader = engine_server.get_engines(paddle.device.is_compiled_with_cuda())
+    return ocr_module, ocr, reader
+
+
+def ocr_cells_to_csv(cells, engines, recorder, output_csv):
+    """Runs the OCR and CSV stages on a list of Cell records (fresh cascade policy, no result cache)."""
+    ocr_module, ocr, reader = engines
+    if ocr_module is None:
+        recorder.skip('ocr', reader)
+        recorder.skip('csv', reader)
+        return False
+    with recorder.measure('ocr'):
+        results = ocr_module.process_all_images(
+            cells, ocr, reader, policy=ocr_module.make_cascade_policy(), blank_detector=ocr_module.BlankCellDetector()
+        )
+    with recorder.measure('csv'):
+        table_data = ocr_module.process_results(results)[0]
+        ocr_module.append_results_to_csv(table_data, output_csv)
+    return True
+
+
+def benchmark_pdf(pdf_path, engines, output_dir, dpi=400, max_pages=None):
+    """Runs every stage on the pages of a PDF; returns its JSON record."""
+    recorder = StageRecorder()
+    output_csv = os.path.join(output_dir, f'{pdf_path.stem}.csv')
+    open(output_csv, 'w').close()
+    cell_count = 0
+    start = time.perf_counter()
+    with fitz.open(str(pdf_path)) as doc:
+        page_count = len(doc) if max_pages is None else min(max_pages, len(doc))
+        for page_num in range(page_count):
+            with recorder.measure('render'):
+                gray = pdf_to_image.render_page_array(doc.load_page(page_num), dpi, enhance=False)
+            with recorder.measure('enhance'):
+                page = pdf_to_image.enhance_array(gray)
+            del gray
+            with recorder.measure('detect'):
+                Table = detect_page_table(page)
+            with recorder.measure('cellularize'):
+                cells = list(iter_cells(page, Table[1], Table[0], page_num))
+            cell_count += len(cells)
+            ocr_cells_to_csv(cells, engines, recorder, output_csv)
+    return {
+        'name': pdf_path.name,
+        'kind': 'pdf',
+        'pages': page_count,
+        'cells': cell_count,
+        'wall_seconds': time.perf_counter() - start,
+        'stages': {name: recorder.stages[name] for name in PDF_STAGES if name in recorder.stages},
+        'accuracy': None,
+    }
+
+
+def cell_set_records(folder):
+    """Cell records for the cell images of a Cellularised-Example folder, row and column taken from the names."""
+    cells = []
+    for path in sorted(folder.glob('*.png')):
+        match = CELL_NAME.search(path.name)
+        if match:
+            cells.append(Cell(0, int(match.group(1)), int(match.group(2)), None, path=str(path)))
+    return cells
+
+
+def benchmark_cell_set(folder, engines, output_dir):
+    """OCRs a folder of cell images and scores the CSV against its Expected Output.csv; returns its JSON record."""
+    recorder = StageRecorder()
+    name = folder.relative_to(EXAMPLES_DIR).as_posix()
+    output_csv = os.path.join(output_dir, re.sub(r'\W+', '_', name) + '.csv')
+    open(output_csv, 'w').close()
+    cells = cell_set_records(folder)
+    start = time.perf_counter()
+    ran = ocr_cells_to_csv(cells, engines, recorder, output_csv)
+    return {
+        'name': name,
+        'kind': 'cells',
+        'pages': 1,
+        'cells': len(cells),
+        'wall_seconds': time.perf_counter() - start,
+        'stages': recorder.stages,
+        'accuracy': compare_csv(output_csv, folder / EXPECTED_CSV) if ran else None,
+    }
+
+
+def git_commit():
+    """The current commit hash, or None outside a git checkout."""
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def peak_rss_mb():
+    """Peak resident set size of the whole run in MB, or None where the resource module is missing (Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 if sys.platform != 'darwin' else peak / 1e6
+
+
+def run_benchmark(dpi=400, max_pages=None, use_ocr=True, pdfs=None):
+    """Benchmarks the example PDFs and cell sets; returns the JSON-ready report."""
+    engines = load_ocr(use_ocr)
+    documents = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        for pdf_path in pdfs or sorted(EXAMPLES_DIR.glob('*.pdf')):
+            print(f"Benchmarking {pdf_path.name}...")
+            documents.append(benchmark_pdf(Path(pdf_path), engines, output_dir, dpi, max_pages))
+        for expected in sorted(CELLS_DIR.rglob(EXPECTED_CSV)):
+            print(f"Benchmarking {expected.parent.relative_to(EXAMPLES_DIR).as_posix()}...")
+            documents.append(benchmark_cell_set(expected.parent, engines, output_dir))
+    return {
+        'commit': git_commit(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'settings': {'dpi': dpi, 'max_pages': max_pages, 'ocr': engines[0] is not None},
+        'peak_rss_mb': peak_rss_mb(),
+        'documents': documents,
+    }
+
+
+def compare_reports(before, after, threshold=0.1):
+    """
+    Lists stage slowdowns and accuracy drops between two reports.
+
+    @param threshold: Relative wall time increase reported as a regression.
+    @return: List of human-readable regression messages (empty if none).
+    """
+    regressions = []
+    previous = {document['name']: document for document in before['documents']}
+    for document in after['documents']:
+        old = previous.get(document['name'])
+        if old is None:
+            continue
+        for stage, stats in document['stages'].items():
+            old_stats = old['stages'].get(stage, {})
+            if 'wall_seconds' not in stats or not old_stats.get('wall_seconds'):
+                continue
+            change = stats['wall_seconds'] / old_stats['wall_seconds'] - 1
+            if change > threshold:
+                regressions.append(f"{document['name']} {stage}: {old_stats['wall_seconds']:.2f}s -> {stats['wall_seconds']:.2f}s (+{change:.0%})")
+        if document['accuracy'] and old['accuracy']:
+            for key in ('exact_rate', 'similarity'):
+                if document['accuracy'][key] < old['accuracy'][key]:
+                    regressions.append(f"{document['name']} {key}: {old['accuracy'][key]:.3f} -> {document['accuracy'][key]:.3f}")
+    return regressions
+
+
+def print_report(report):
+    print(f"{'Document':<40} {'stage':<12} {'wall s':>8} {'cpu s':>8} {'peak MB':>8}")
+    for document in report['documents']:
+        for stage, stats in document['stages'].items():
+            if 'skipped' in stats:
+                print(f"{document['name']:<40} {stage:<12} skipped ({stats['skipped']})")
+                continue
+            peak = f"{stats['peak_rss_mb']:.0f}" if stats['peak_rss_mb'] is not None else "n/a"
+            print(f"{document['name']:<40} {stage:<12} {stats['wall_seconds']:>8.2f} {stats['cpu_seconds']:>8.2f} {peak:>8}")
+        if document['accuracy']:
+            accuracy = document['accuracy']
+            print(f"{document['name']:<40} accuracy: {accuracy['exact_matches']}/{accuracy['cells']} exact, similarity {accuracy['similarity']:.3f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dpi', type=int, default=400)
+    parser.add_argument('--pages', type=int, default=None, help="Maximum pages per PDF (default: all)")
+    parser.add_argument('--no-ocr', action='store_true', help="Skip the OCR and CSV stages")
+    parser.add_argument('--output', default='benchmark.json', help="JSON file to write")
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'), help="Compare two JSON reports instead of running")
+    parser.add_argument('--threshold', type=float, default=0.1, help="Relative slowdown reported by --compare")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        reports = []
+        for path in args.compare:
+            with open(path) as file:
+                reports.append(json.load(file))
+        regressions = compare_reports(*reports, threshold=args.threshold)
+        print("\n".join(regressions) if regressions else "No regressions.")
+        return 1 if regressions else 0
+
+    report = run_benchmark(args.dpi, args.pages, not args.no_ocr)
+    print_report(report)
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Benchmark of RGB versus direct-grayscale page rendering over the PDFs in Examples/.
+
+For every page, times render + enhance + conversion to the array detection and OCR
+work on, once through the RGB path (render_page, then np.asarray) and once through
+render_page_array (csGRAY pixmap, vectorised enhancement). Each measurement runs in
+a fresh process so its peak resident memory (MuPDF and PIL buffers included) can be
+reported, and both paths are checked to give the same grayscale page.
+
+Usage (from Code/unitTests):
+    python benchmark_render.py [--dpi 400] [--pages 2]
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import subprocess
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+EXAMPLES_DIR = Path(__file__).resolve().parent.parent.parent / 'Examples'
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None where the resource module is missing (Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 if sys.platform != 'darwin' else peak / 1e6
+
+
+def run_child(mode, pdf_path, page_num, dpi):
+    """Renders one page in this (fresh) process and prints time, memory growth and a hash of the gray page."""
+    import numpy as np
+    import fitz
+    import pdf_to_image
+    from TableDetection.luminosity import to_luminosity
+
+    with fitz.open(pdf_path) as doc:
+        page = doc.load_page(page_num)
+        baseline = peak_rss_mb()
+        start = time.perf_counter()
+        if mode == 'rgb':
+            pixels = np.asarray(pdf_to_image.render_page(page, dpi))
+        else:
+            pixels = pdf_to_image.render_page_array(page, dpi)
+        seconds = time.perf_counter() - start
+        peak = peak_rss_mb()
+    digest = hashlib.sha1(np.ascontiguousarray(to_luminosity(pixels)).tobytes()).hexdigest()
+    print(json.dumps({'seconds': seconds, 'mb': None if peak is None else peak - baseline, 'digest': digest}))
+
+
+def measure(mode, pdf_path, page_num, dpi):
+    output = subprocess.run(
+        [sys.executable, __file__, '--child', mode, str(pdf_path), str(page_num), '--dpi', str(dpi)],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dpi', type=int, default=400)
+    parser.add_argument('--pages', type=int, default=2, help="Maximum pages per PDF")
+    parser.add_argument('--child', nargs=3, metavar=('MODE', 'PDF', 'PAGE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, pdf_path, page_num = args.child
+        run_child(mode, pdf_path, int(page_num), args.dpi)
+        return
+
+    import fitz
+
+    def mb(value):
+        return f"{value:.0f}" if value is not None else "n/a"
+
+    print(f"{'PDF':<35} {'page':>4} {'rgb s':>7} {'gray s':>7} {'rgb MB':>7} {'gray MB':>8}  identical")
+    for pdf_path in sorted(EXAMPLES_DIR.glob('*.pdf')):
+        with fitz.open(str(pdf_path)) as doc:
+            page_count = len(doc)
+        for page_num in range(min(args.pages, page_count)):
+            rgb = measure('rgb', pdf_path, page_num, args.dpi)
+            gray = measure('gray', pdf_path, page_num, args.dpi)
+            identical = rgb['digest'] == gray['digest']
+            print(f"{pdf_path.name:<35} {page_num:>4} {rgb['seconds']:>7.2f} {gray['seconds']:>7.2f} {mb(rgb['mb']):>7} {mb(gray['mb']):>8}  {identical}")
+
+
+if __name__ == '__main__':
+    main()
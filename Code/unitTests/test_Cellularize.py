@@ -0,0 +1,106 @@
+import os
+import sys
+import pickle
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import Cellularize
+from Cellularize import iter_cells, Cell
+import luminosity_table_detection as ltd
+
+
+class TestIterCells(unittest.TestCase):
+
+    def setUp(self):
+        self.page = np.arange(60 * 80 * 3, dtype=np.uint32).reshape(60, 80, 3).astype(np.uint8)
+        self.colAr = [[0, 30], [30, 80]]
+        self.rowAr = [[0, 20], [20, 45], [45, 60]]
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_cells_are_views_of_the_page(self):
+        cells = list(iter_cells(self.page, self.colAr, self.rowAr, page_num=2))
+        self.assertEqual(len(cells), 6)
+        for cell in cells:
+            self.assertIsInstance(cell, Cell)
+            self.assertEqual(cell.page, 2)
+            self.assertTrue(np.shares_memory(cell.image, self.page))
+            left, upper, right, lower = cell.bbox
+            np.testing.assert_array_equal(cell.image, self.page[upper:lower, left:right])
+
+    def test_row_col_numbering(self):
+        cells = {(cell.row, cell.col): cell.bbox for cell in iter_cells(self.page, self.colAr, self.rowAr)}
+        self.assertEqual(cells[(1, 0)], (0, 20, 30, 45))
+        self.assertEqual(cells[(2, 1)], (30, 45, 80, 60))
+
+    def test_debug_dump(self):
+        cells = list(iter_cells(self.page, self.colAr, self.rowAr, page_num=1, dump_dir=self.temp_dir))
+        for cell in cells:
+            path = os.path.join(self.temp_dir, f"page_1_{cell.row}_{cell.col}.png")
+            with Image.open(path) as saved:
+                np.testing.assert_array_equal(np.asarray(saved), cell.image)
+
+    def test_lines_match_split_image_with_lines(self):
+        image_path = os.path.join(self.temp_dir, 'page.png')
+        Image.fromarray(self.page).save(image_path)
+        lines = [(0, 20, 80, 20), (0, 22, 80, 22), (0, 45, 80, 45), (30, 0, 30, 60)]
+        expected = ltd.split_image_with_lines(image_path, lines, temp_dir=os.path.join(self.temp_dir, 'cells'))
+        cells = list(ltd.iter_cells_from_lines(image_path, lines))
+        self.assertEqual(
+            sorted((c.row, c.col, c.bbox) for c in cells),
+            sorted((c.row, c.col, tuple(int(v) for v in c.bbox)) for c in expected)
+        )
+        for cell in expected:
+            left, upper, right, lower = cell.bbox
+            np.testing.assert_array_equal(cell.pixels(), self.page[upper:lower, left:right])
+
+    def test_split_cells_of_same_named_pages_are_kept_apart(self):
+        lines = [(0, 30, 80, 30), (40, 0, 40, 60)]
+        paths = []
+        for folder, value in (('a', 10), ('b', 200)):
+            os.makedirs(os.path.join(self.temp_dir, folder))
+            image_path = os.path.join(self.temp_dir, folder, 'page_1.png')
+            Image.fromarray(np.full((60, 80), value, dtype=np.uint8)).save(image_path)
+            cells = ltd.split_image_with_lines(image_path, lines, temp_dir=os.path.join(self.temp_dir, 'cells'))
+            paths.append({cell.path for cell in cells})
+            for cell in cells:
+                self.assertTrue((cell.pixels() == value).all())
+        self.assertFalse(paths[0] & paths[1])
+
+    def test_saved_cells_carry_their_position(self):
+        # Underscores in the output folder used to break the row/col parsing of file names
+        output = os.path.join(self.temp_dir, 'doc_with_under_scores')
+        os.makedirs(output)
+        original = Cellularize.OutputLocation
+        Cellularize.OutputLocation = output
+        try:
+            image_path = os.path.join(self.temp_dir, 'page.png')
+            Image.fromarray(self.page).save(image_path)
+            first = Cellularize.cellularize_Page_colrow(image_path, self.colAr, self.rowAr, 0)
+            second = Cellularize.cellularize_Page_colrow(image_path, self.colAr, self.rowAr, 0)
+        finally:
+            Cellularize.OutputLocation = original
+
+        self.assertEqual(len(set(cell.path for cell in first + second)), 12)
+        in_memory = {(cell.row, cell.col): cell for cell in iter_cells(self.page, self.colAr, self.rowAr)}
+        for cell in first:
+            self.assertIsNone(cell.image)
+            np.testing.assert_array_equal(cell.pixels(), in_memory[(cell.row, cell.col)].image)
+
+    def test_cell_record_pickles(self):
+        cell = next(iter_cells(self.page, self.colAr, self.rowAr, page_num=3))
+        copy = pickle.loads(pickle.dumps(cell))
+        self.assertEqual((copy.page, copy.row, copy.col, copy.bbox, copy.path), (3, 0, 0, (0, 0, 30, 20), None))
+        np.testing.assert_array_equal(copy.image, cell.image)
+        self.assertFalse(hasattr(cell, '__dict__'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from PIL import Image
+
+from pdf_to_image import PDFPageProvider, pdf_to_images, enhance_image, enhance_array
+
+EXAMPLE_PDF = Path(__file__).resolve().parent.parent.parent / 'Examples' / 'Brabant.pdf'
+
+
+class TestPDFPageProvider(unittest.TestCase):
+
+    def setUp(self):
+        self.provider = PDFPageProvider(str(EXAMPLE_PDF), dpi=150, preview_dpi=50, max_cached_pages=2)
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.provider.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_pages_match_pdf_to_images(self):
+        expected = pdf_to_images(str(EXAMPLE_PDF), dpi=150)
+        self.assertEqual(len(self.provider), len(expected))
+        self.assertEqual(self.provider[1].tobytes(), expected[1].tobytes())
+
+    def test_page_size_without_rendering(self):
+        for index in range(2):
+            self.assertEqual(self.provider.page_size(index), self.provider[index].size)
+            self.assertEqual(self.provider.page_size(index, dpi=50), self.provider.get_preview(index).size)
+
+    def test_cache_is_bounded(self):
+        first = self.provider[0]
+        self.assertIs(self.provider[0], first)
+        self.provider[1]
+        self.provider[2]
+        self.assertEqual(len(self.provider._pages), 2)
+        self.assertIsNot(self.provider[0], first)
+
+    def test_page_path_renders_once(self):
+        path = self.provider.page_path(0, self.temp_dir)
+        self.assertEqual(os.path.basename(path), 'page_1.png')
+        modified = os.path.getmtime(path)
+        self.assertEqual(self.provider.page_path(0, self.temp_dir), path)
+        self.assertEqual(os.path.getmtime(path), modified)
+
+    def test_page_path_replaces_other_documents_pages(self):
+        stale = os.path.join(self.temp_dir, 'page_1.png')
+        Image.new('RGB', (10, 10)).save(stale)
+        path = self.provider.page_path(0, self.temp_dir)
+        self.assertEqual(path, stale)
+        self.assertEqual(Image.open(path).size, self.provider.page_size(0))
+        # Other render settings make other page files
+        with PDFPageProvider(str(EXAMPLE_PDF), dpi=50) as other:
+            self.assertNotEqual(other.document_id, self.provider.document_id)
+            self.assertEqual(Image.open(other.page_path(0, self.temp_dir)).size, other.page_size(0))
+
+    def test_appended_images_follow_pdf_pages(self):
+        extra = self.provider[0].crop((0, 0, 10, 10))
+        self.provider.append(extra)
+        self.assertEqual(len(self.provider), self.provider.page_count + 1)
+        self.assertIs(self.provider[-1], extra)
+        self.assertIs(self.provider.get_preview(self.provider.page_count), extra)
+
+    def test_grayscale_pages_match_rgb_pages(self):
+        with PDFPageProvider(str(EXAMPLE_PDF), dpi=150, grayscale=True) as gray:
+            pixels = gray.get_array(1)
+            self.assertEqual(pixels.shape, self.provider[1].size[::-1])
+            np.testing.assert_array_equal(pixels, np.asarray(self.provider[1].convert('L')))
+            # The cached render is handed out as-is
+            self.assertIs(gray.get_array(1), pixels)
+            self.assertEqual(gray[1].mode, 'L')
+            self.assertEqual(gray[1].tobytes(), pixels.tobytes())
+
+    def test_preview_arrays(self):
+        np.testing.assert_array_equal(self.provider.get_preview_array(0), np.asarray(self.provider.get_preview(0)))
+        with PDFPageProvider(str(EXAMPLE_PDF), dpi=150, preview_dpi=50, grayscale=True) as gray:
+            # The cached render itself, so display needs no copy
+            self.assertIs(gray.get_preview_array(1), gray.get_preview_array(1))
+            np.testing.assert_array_equal(gray.get_preview_array(1), np.asarray(gray.get_preview(1)))
+
+    def test_enhance_array_matches_enhance_image(self):
+        rng = np.random.default_rng(5)
+        gray = np.clip(rng.normal(200, 40, size=(300, 170)), 0, 255).astype(np.uint8)
+        expected = np.asarray(enhance_image(Image.fromarray(gray)).convert('L'))
+        for band_rows in (1, 7, 256):
+            np.testing.assert_array_equal(enhance_array(gray, band_rows), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from background_detection import BackgroundTableDetector, detect_page_table
+from pdf_to_image import PDFPageProvider
+
+EXAMPLE_PDF = Path(__file__).resolve().parent.parent.parent / 'Examples' / 'Brabant.pdf'
+
+
+class TestBackgroundTableDetector(unittest.TestCase):
+
+    def setUp(self):
+        self.order = []
+        self.results = {}
+        self.errors = {}
+        self.gate = threading.Event()
+        self.started = threading.Event()
+
+    def detect(self, page, table_style):
+        # The first page waits for the gate, so the queue can be rearranged meanwhile
+        if not self.started.is_set():
+            self.started.set()
+            self.gate.wait(5)
+        self.order.append(page)
+        if page == 'bad':
+            raise ValueError('unreadable page')
+        return [[(page, page + 1)], [(0, 1)]]
+
+    def make_detector(self, pages, max_workers=1):
+        detector = BackgroundTableDetector(
+            lambda index: pages[index],
+            on_result=self.results.__setitem__,
+            on_error=self.errors.__setitem__,
+            max_workers=max_workers,
+            detect=self.detect
+        )
+        self.addCleanup(detector.close)
+        return detector
+
+    def test_visible_page_goes_first(self):
+        detector = self.make_detector(list(range(5)))
+        detector.submit(range(5))
+        self.assertTrue(self.started.wait(5))
+        detector.prioritize(3)
+        detector.submit([1, 4])
+        self.gate.set()
+        self.assertTrue(detector.wait(5))
+        self.assertEqual(self.order, [0, 3, 1, 2, 4])
+        self.assertEqual(detector.get(3), [[(3, 4)], [(0, 1)]])
+        self.assertEqual(sorted(detector.tables()), list(range(5)))
+
+    def test_cached_pages_are_not_detected_again(self):
+        self.gate.set()
+        detector = self.make_detector([10, 11], max_workers=2)
+        detector.submit([0, 1])
+        self.assertTrue(detector.wait(5))
+        detector.submit([0, 1])
+        detector.prioritize(1)
+        self.assertTrue(detector.wait(5))
+        self.assertEqual(sorted(self.order), [10, 11])
+        self.assertEqual(self.results[1], [[(11, 12)], [(0, 1)]])
+        detector.invalidate(1)
+        self.assertIsNone(detector.get(1))
+        detector.submit([1])
+        self.assertTrue(detector.wait(5))
+        self.assertEqual(len(self.order), 3)
+
+    def test_errors_and_close(self):
+        self.gate.set()
+        detector = self.make_detector([0, 'bad'])
+        detector.submit([0, 1])
+        self.assertTrue(detector.wait(5))
+        self.assertIsInstance(self.errors[1], ValueError)
+        self.assertIsNone(detector.get(1))
+        self.assertFalse(detector.closed)
+        detector.close()
+        self.assertTrue(detector.closed)
+        detector.submit([1])
+        self.assertTrue(detector.wait(1))
+        self.assertNotIn(1, self.results)
+
+    def test_detect_page_table(self):
+        with PDFPageProvider(str(EXAMPLE_PDF), dpi=100, grayscale=True) as provider:
+            rows, cols = detect_page_table(provider.get_array(0))
+        self.assertGreater(len(rows), 1)
+        self.assertGreater(len(cols), 1)
+        self.assertTrue(all(start < end for start, end in rows + cols))
+
+
+if __name__ == '__main__':
+    unittest.main()
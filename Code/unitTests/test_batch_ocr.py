@@ -0,0 +1,66 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import batch_ocr
+
+
+class TestBatchOCR(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        for folder in ('a', 'b'):
+            os.makedirs(os.path.join(self.temp_dir, folder))
+            for name in ('census.pdf', 'notes.txt'):
+                open(os.path.join(self.temp_dir, folder, name), 'w').close()
+        self.outdir = os.path.join(self.temp_dir, 'out')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_find_pdfs(self):
+        pattern = os.path.join(self.temp_dir, '**', '*.pdf')
+        pdfs = batch_ocr.find_pdfs([pattern, pattern])
+        self.assertEqual([os.path.relpath(path, self.temp_dir) for path in pdfs],
+                         [os.path.join('a', 'census.pdf'), os.path.join('b', 'census.pdf')])
+
+    def test_output_names_are_unique(self):
+        pdfs = batch_ocr.find_pdfs([os.path.join(self.temp_dir, '*', '*.pdf')])
+        names = batch_ocr.output_names(pdfs)
+        self.assertEqual(len(set(names.values())), 2)
+        for pdf_path, name in names.items():
+            self.assertEqual(name, f"census_{batch_ocr.path_hash(pdf_path)}.csv")
+        # A stem that looks like another input's deduplicated name does not collide
+        lookalike = os.path.join(self.temp_dir, 'c', f"census_{batch_ocr.path_hash(pdfs[0])}.pdf")
+        self.assertEqual(len(set(batch_ocr.output_names(pdfs + [lookalike]).values())), 3)
+
+    def test_output_names_keep_previous_names(self):
+        first, second = batch_ocr.find_pdfs([os.path.join(self.temp_dir, '*', '*.pdf')])
+        self.assertEqual(batch_ocr.output_names([first]), {first: 'census.csv'})
+        names = batch_ocr.output_names([first, second], previous={first: 'census.csv'})
+        self.assertEqual(names[first], 'census.csv')
+        self.assertNotEqual(names[second], 'census.csv')
+        # A run without the earlier document does not take its CSV
+        self.assertNotEqual(batch_ocr.output_names([second], previous={first: 'census.csv'})[second], 'census.csv')
+
+    def test_finished_documents_are_skipped(self):
+        pdfs = batch_ocr.find_pdfs([os.path.join(self.temp_dir, '*', '*.pdf')])
+        os.makedirs(self.outdir)
+        for name in batch_ocr.output_names(pdfs).values():
+            open(os.path.join(self.outdir, name), 'w').close()
+
+        summary = batch_ocr.run_batch(pdfs, self.outdir)
+        self.assertEqual([document['status'] for document in summary['documents']], ['skipped', 'skipped'])
+        with open(os.path.join(self.outdir, batch_ocr.SUMMARY_FILENAME), encoding='utf-8') as file:
+            self.assertEqual(json.load(file)['documents'], summary['documents'])
+        # The next run resumes from the names in the summary
+        self.assertEqual(batch_ocr.read_previous_names(self.outdir), {pdf: name for pdf, name in batch_ocr.output_names(pdfs).items()})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from benchmark_pipeline import StageRecorder, CELLS_DIR, EXPECTED_CSV, compare_csv, compare_reports, cell_set_records
+
+
+class TestBenchmarkPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def write_csv(self, name, text):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(text)
+        return path
+
+    def test_compare_csv_cell_by_cell(self):
+        expected = self.write_csv('expected.csv', 'a,b\n1.0,"two\nlines"\n')
+        self.assertEqual(compare_csv(expected, expected)['exact_rate'], 1.0)
+        actual = self.write_csv('actual.csv', 'a,bb\n1.0,two lines,extra\n')
+        accuracy = compare_csv(actual, expected)
+        self.assertEqual((accuracy['cells'], accuracy['exact_matches']), (5, 3))
+        self.assertLess(accuracy['similarity'], 1.0)
+        self.assertGreater(accuracy['similarity'], accuracy['exact_rate'])
+
+    def test_stage_recorder_accumulates(self):
+        recorder = StageRecorder()
+        for _ in range(2):
+            with recorder.measure('detect'):
+                sum(range(10000))
+        recorder.skip('ocr', 'unavailable')
+        self.assertEqual(recorder.stages['detect']['calls'], 2)
+        self.assertGreater(recorder.stages['detect']['wall_seconds'], 0)
+        self.assertEqual(recorder.stages['ocr'], {'skipped': 'unavailable'})
+
+    def test_compare_reports_flags_regressions(self):
+        def report(seconds, exact_rate):
+            return {'documents': [{
+                'name': 'Brabant.pdf',
+                'stages': {'render': {'wall_seconds': seconds}, 'ocr': {'skipped': 'disabled'}},
+                'accuracy': {'exact_rate': exact_rate, 'similarity': 0.9},
+            }]}
+        self.assertEqual(compare_reports(report(1.0, 0.8), report(1.05, 0.8)), [])
+        self.assertEqual(len(compare_reports(report(1.0, 0.8), report(1.5, 0.7))), 2)
+
+    def test_example_cell_sets_are_found(self):
+        cells = cell_set_records(CELLS_DIR / 'Austria Part')
+        self.assertEqual(len(cells), 10)
+        self.assertEqual(sorted({(cell.row, cell.col) for cell in cells})[-1], (1, 4))
+        self.assertTrue((CELLS_DIR / 'Austria Part' / EXPECTED_CSV).exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
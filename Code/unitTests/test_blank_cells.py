@@ -0,0 +1,69 @@
+import os
+import sys
+import unittest
+import cv2
+import numpy as np
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from blank_cells import BlankCellDetector
+from pdf_to_image import PDFPageProvider
+from TableDetection import luminositybased
+from Cellularize import iter_cells
+
+EXAMPLE_PDF = Path(__file__).resolve().parent.parent.parent / 'Examples' / 'Brabant.pdf'
+
+
+def make_cell(text=None, height=40, width=160):
+    cell = np.full((height, width, 3), 245, dtype=np.uint8)
+    if text:
+        cv2.putText(cell, text, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (20, 20, 20), 2)
+    return cell
+
+
+class TestBlankCellDetector(unittest.TestCase):
+
+    def setUp(self):
+        self.detector = BlankCellDetector()
+
+    def test_text_is_not_blank(self):
+        self.assertFalse(self.detector.is_blank(make_cell("1890")))
+        self.assertFalse(self.detector.is_blank(make_cell("7")))
+        self.assertFalse(self.detector.is_blank(make_cell("5")[:, :40]))
+
+    def test_empty_and_noise_are_blank(self):
+        self.assertTrue(self.detector.is_blank(make_cell()))
+        speckled = make_cell()
+        speckled[[5, 20, 33], [30, 90, 140]] = 0
+        self.assertTrue(self.detector.is_blank(speckled))
+        self.assertTrue(self.detector.is_blank(np.zeros((0, 10), dtype=np.uint8)))
+
+    def test_ruling_lines_are_blank(self):
+        cell = make_cell()
+        cell[:, 2:5] = 0  # Vertical rule along the left edge
+        cell[18:20, :] = 0  # Horizontal rule through the middle
+        self.assertTrue(self.detector.is_blank(cell))
+
+    def test_stats(self):
+        self.detector.is_blank(make_cell())
+        self.detector.is_blank(make_cell("42"))
+        self.assertEqual(self.detector.stats(), {'blank_checked': 2, 'blank_skipped': 1})
+
+    def test_fit_on_document(self):
+        with PDFPageProvider(str(EXAMPLE_PDF), dpi=150) as pages:
+            page = pages[0]
+        table = [luminositybased.convert_to_pairs(coords) for coords in luminositybased.findTable(page, 'borderless', 'borderless')]
+        cells = list(iter_cells(np.asarray(page), table[1], table[0], 0))
+        self.detector.fit_once([cell.image for cell in cells])
+        self.assertTrue(self.detector.fitted)
+        self.assertTrue(64 <= self.detector.dark_threshold <= 224)
+
+        blank = sum(self.detector.is_blank(cell.image) for cell in cells)
+        # A census page: some empty cells, but most hold numbers
+        self.assertGreater(blank, 0)
+        self.assertLess(blank, len(cells) // 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
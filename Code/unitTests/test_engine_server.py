@@ -0,0 +1,138 @@
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import engine_server
+
+
+class FakePaddleOCR:
+    def __init__(self):
+        self.calls = 0
+
+    def ocr(self, image, cls=True):
+        self.calls += 1
+        return [[[[[0, 0], [1, 0], [1, 1], [0, 1]], (f"{image.shape[1]}x{image.shape[0]}", 0.99)]]]
+
+    def text_recognizer(self, images):
+        return [(str(int(image.mean())), 0.9) for image in images], 0.0
+
+
+class FakeReader:
+    def readtext(self, image, **kwargs):
+        return [([[0, 0]], "easy", 0.5 if kwargs.get('detail') else 0.1)]
+
+
+@unittest.skipIf(os.name == 'nt', "Unix socket test")
+class TestEngineServer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.mkdtemp()
+        cls.address = os.path.join(cls.temp_dir, 'engines.sock')
+        cls.loads = []
+
+        def factory(use_gpu, rec_batch_num):
+            cls.loads.append((use_gpu, rec_batch_num))
+            return FakePaddleOCR(), FakeReader()
+
+        cls.server = engine_server.make_server(cls.address, authkey=b'test', factory=factory)
+        threading.Thread(target=cls.serve, daemon=True).start()
+
+    @classmethod
+    def serve(cls):
+        try:
+            cls.server.serve_forever()
+        except SystemExit:
+            pass  # serve_forever exits via sys.exit once stopped
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop_event.set()
+        cls.server.listener.close()
+        shutil.rmtree(cls.temp_dir, ignore_errors=True)
+
+    def remote_engines(self, key=(False, 6)):
+        service = engine_server.connect(self.address, authkey=b'test')
+        service.load(key)
+        return engine_server.RemotePaddleOCR(service, key), engine_server.RemoteEasyOCR(service, key)
+
+    def test_remote_engines_behave_like_local_ones(self):
+        ocr, reader = self.remote_engines()
+        image = np.full((10, 20, 3), 200, dtype=np.uint8)
+        self.assertEqual(ocr.ocr(image, cls=True)[0][0][1], ('20x10', 0.99))
+        self.assertEqual(ocr.text_recognizer([image, image * 0])[0], [('200', 0.9), ('0', 0.9)])
+        self.assertEqual(reader.readtext(image, detail=1), [([[0, 0]], 'easy', 0.5)])
+
+    def test_engines_loaded_once_per_settings(self):
+        self.remote_engines((False, 6))
+        self.remote_engines((False, 6))
+        self.remote_engines((False, 32))
+        self.assertEqual(self.loads.count((False, 6)), 1)
+        self.assertEqual(self.loads.count((False, 32)), 1)
+
+    def test_warm_up_runs_both_engines(self):
+        ocr, reader = self.remote_engines()
+        self.assertGreaterEqual(engine_server.warm_up(ocr, reader), 0)
+        local = FakePaddleOCR()
+        engine_server.warm_up(local, FakeReader())
+        self.assertEqual(local.calls, 1)
+        # The dummy cell has dark text on a white background
+        image = engine_server.warm_up_image()
+        self.assertEqual(image.dtype, np.uint8)
+        self.assertLess(image.min(), 100)
+
+    def test_wrong_authkey_is_rejected(self):
+        with self.assertRaises(Exception):
+            engine_server.connect(self.address, authkey=b'wrong')
+
+
+
+@unittest.skipIf(os.name == 'nt', "POSIX permissions test")
+class TestRuntimeFiles(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.environ = os.environ.get('XDG_RUNTIME_DIR')
+        os.environ['XDG_RUNTIME_DIR'] = self.temp_dir
+
+    def tearDown(self):
+        if self.environ is None:
+            os.environ.pop('XDG_RUNTIME_DIR', None)
+        else:
+            os.environ['XDG_RUNTIME_DIR'] = self.environ
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_runtime_files_are_private(self):
+        folder = engine_server.runtime_dir()
+        self.assertEqual(os.path.dirname(folder), self.temp_dir)
+        self.assertEqual(os.stat(folder).st_mode & 0o777, 0o700)
+        self.assertEqual(os.path.dirname(engine_server.default_address()), folder)
+        key = engine_server.default_authkey()
+        self.assertEqual(engine_server.default_authkey(), key)
+        self.assertEqual(os.stat(os.path.join(folder, engine_server.KEY_FILENAME)).st_mode & 0o777, 0o600)
+
+    def test_readable_key_is_not_trusted(self):
+        engine_server.default_authkey()
+        os.chmod(os.path.join(engine_server.runtime_dir(), engine_server.KEY_FILENAME), 0o644)
+        with self.assertRaises(PermissionError):
+            engine_server.default_authkey()
+
+    def test_shared_runtime_dir_is_not_used(self):
+        os.makedirs(os.path.join(self.temp_dir, 'ocr_engines'), mode=0o777)
+        os.chmod(os.path.join(self.temp_dir, 'ocr_engines'), 0o777)
+        with self.assertRaises(PermissionError):
+            engine_server.runtime_dir()
+
+    def test_no_server_is_reported_as_connection_error(self):
+        with self.assertRaises((FileNotFoundError, ConnectionError)):
+            engine_server.connect()
+
+
+if __name__ == '__main__':
+    unittest.main()
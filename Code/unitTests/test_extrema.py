@@ -0,0 +1,65 @@
+import os
+import sys
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import luminosity_table_detection as ltd
+from TableDetection import luminositybased, extrema
+
+
+class TestExtremaEquivalence(unittest.TestCase):
+    """The NumPy engine must return exactly the indices of the original loops."""
+
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(3200)
+        cls.luminosities = [
+            # Noisy page with dark ruling lines and repeated (tied) values
+            np.clip(rng.normal(230, 20, size=(180, 140)).round(), 0, 255),
+            rng.integers(0, 4, size=(90, 70)).astype(np.float64),
+            rng.random((40, 300)) * 255,
+        ]
+        cls.luminosities[0][::15, :] = 20
+        cls.luminosities[0][:, ::23] = 35
+        cls.gaps = [0, 1, 2, 3, 5, 9, 17, 60]
+
+    def assert_same(self, legacy, fast, *args):
+        try:
+            expected = legacy(*args)
+        except IndexError:
+            # The original luminosity_table_detection loop can index past the
+            # end of the profile; there is no reference result to compare to.
+            return
+        self.assertEqual(expected, fast(*args, engine="numpy"))
+
+    def test_luminosity_table_detection(self):
+        for luminosity in self.luminosities:
+            for axis in (0, 1):
+                for gap in self.gaps:
+                    with self.subTest(shape=luminosity.shape, axis=axis, gap=gap):
+                        self.assert_same(ltd.find_peaks, ltd.find_peaks, axis, luminosity, gap)
+                        self.assert_same(ltd.find_troughs, ltd.find_troughs, axis, luminosity, gap)
+
+    def test_luminositybased(self):
+        for luminosity in self.luminosities:
+            for axis in (0, 1):
+                for gap in self.gaps:
+                    with self.subTest(shape=luminosity.shape, axis=axis, gap=gap):
+                        self.assert_same(luminositybased.find_peaks, luminositybased.find_peaks, axis, luminosity, gap)
+                        self.assert_same(luminositybased.find_troughs, luminositybased.find_troughs, axis, luminosity, gap)
+
+    def test_gap_larger_than_profile(self):
+        profile = np.array([5.0, 1.0, 4.0, 0.0, 3.0])
+        luminosity = profile[:, None]
+        self.assertEqual(luminositybased.find_peaks(1, luminosity, 12),
+                         luminositybased.find_peaks(1, luminosity, 12, engine="numpy"))
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            extrema.check_engine("cuda")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import sys
+import unittest
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import image_bridge
+from image_bridge import PixmapCache, display_array
+
+
+class TestDisplayArray(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(22)
+        self.gray = rng.integers(0, 256, size=(60, 80), dtype=np.uint8)
+        self.rgb = rng.integers(0, 256, size=(60, 80, 3), dtype=np.uint8)
+
+    def test_arrays_are_not_copied(self):
+        for pixels, image_format in ((self.gray, image_bridge.GRAYSCALE), (self.rgb, image_bridge.RGB)):
+            array, found_format = display_array(pixels)
+            self.assertIs(array, pixels)
+            self.assertEqual(found_format, image_format)
+        # A crop keeps pointing into the page, with the page's row stride
+        crop = self.rgb[10:40, 8:48]
+        array, _ = display_array(crop)
+        self.assertIs(array, crop)
+        self.assertEqual(array.strides[0], self.rgb.strides[0])
+
+    def test_unwrappable_layouts_are_copied(self):
+        for pixels in (self.rgb[:, ::2], self.rgb[:, :, ::-1], self.gray[1:, 1:]):
+            array, _ = display_array(pixels)
+            self.assertFalse(np.shares_memory(array, pixels))
+            np.testing.assert_array_equal(array, pixels)
+
+    def test_pil_images(self):
+        array, image_format = display_array(Image.fromarray(self.gray))
+        self.assertEqual(image_format, image_bridge.GRAYSCALE)
+        np.testing.assert_array_equal(array, self.gray)
+        array, image_format = display_array(Image.fromarray(self.rgb).convert('P'))
+        self.assertEqual((image_format, array.shape), (image_bridge.RGBA, (60, 80, 4)))
+        with self.assertRaises(ValueError):
+            display_array(self.gray.astype(np.float32))
+
+
+class TestPixmapCache(unittest.TestCase):
+
+    def test_lru_within_budget(self):
+        cache = PixmapCache(max_bytes=10, cost=len)
+        cache.put(0, 1.0, 'aaaa')
+        cache.put(1, 1.0, 'bbbb')
+        self.assertEqual(cache.get(0, 1.0), 'aaaa')
+        cache.put(2, 1.0, 'cccc')
+        # Page 1 was used least recently
+        self.assertNotIn((1, 1.0), cache)
+        self.assertEqual((len(cache), cache.nbytes), (2, 8))
+        # Too large to keep, but still returned
+        self.assertEqual(cache.put(3, 1.0, 'x' * 11), 'x' * 11)
+        self.assertNotIn((3, 1.0), cache)
+
+    def test_get_or_create_by_page_and_zoom(self):
+        cache = PixmapCache(max_bytes=100, cost=len)
+        created = []
+
+        def create():
+            created.append(1)
+            return 'page'
+
+        for zoom in (0.25, 0.25, 1.0):
+            cache.get_or_create(5, zoom, create)
+        self.assertEqual(len(created), 2)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+        cache.discard(5)
+        self.assertEqual((len(cache), cache.nbytes), (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
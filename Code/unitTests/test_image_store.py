@@ -0,0 +1,102 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from pathlib import Path
+from PIL import Image
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import image_store
+import Cellularize
+from Cellularize import iter_cells, load_page_array
+from TableDetection import luminositybased
+from parallel_render import render_pdf_to_files
+from pdf_to_image import PDFPageProvider
+
+EXAMPLE_PDF = Path(__file__).resolve().parent.parent.parent / 'Examples' / 'Brabant.pdf'
+
+
+class TestImageStore(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        rng = np.random.default_rng(19)
+        self.gray = rng.integers(0, 256, size=(70, 90), dtype=np.uint8)
+        self.rgb = rng.integers(0, 256, size=(70, 90, 3), dtype=np.uint8)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_stores_are_lossless(self):
+        for name in image_store.STORES:
+            store = image_store.get_store(name)
+            for pixels in (self.gray, self.rgb):
+                path = store.path_for(os.path.join(self.temp_dir, f'{name}_{pixels.ndim}'))
+                image_store.save_image(pixels, path, name)
+                np.testing.assert_array_equal(image_store.load_image(path), pixels)
+                self.assertEqual(image_store.image_size(path), (90, 70))
+        # Nothing left behind under a temporary name
+        self.assertFalse([name for name in os.listdir(self.temp_dir) if '.partial' in name])
+
+    def test_png_is_the_default(self):
+        self.assertEqual(image_store.get_store().name, 'png')
+
+    def test_failed_replace_leaves_no_partial_file(self):
+        target = os.path.join(self.temp_dir, 'page.png')
+        os.makedirs(target)  # Cannot be replaced by a file
+        with self.assertRaises(OSError):
+            image_store.save_image(self.gray, target)
+        self.assertEqual(os.listdir(self.temp_dir), ['page.png'])
+        self.assertTrue(image_store.is_partial(f'page{image_store.PARTIAL_MARK}12_34.png'))
+        self.assertFalse(image_store.is_partial(target))
+
+    def test_npy_is_memory_mapped_read_only(self):
+        path = image_store.save_image(self.gray, os.path.join(self.temp_dir, 'page.npy'))
+        pixels = load_page_array(path)
+        self.assertIsInstance(pixels, np.memmap)
+        self.assertFalse(pixels.flags.writeable)
+        cell = next(iter_cells(pixels, [[10, 40]], [[5, 25]]))
+        self.assertTrue(np.shares_memory(cell.image, pixels))
+        np.testing.assert_array_equal(cell.image, self.gray[5:25, 10:40])
+
+    def test_unknown_store(self):
+        with self.assertRaises(ValueError):
+            image_store.get_store('tiff')
+
+    def test_project_store_is_recorded(self):
+        self.assertEqual(image_store.read_project_store(self.temp_dir, 'png-fast'), 'png-fast')
+        image_store.write_project_store(self.temp_dir, 'png')
+        self.assertEqual(image_store.read_project_store(self.temp_dir, 'npy'), 'png')
+
+    def test_detection_reads_npy_pages(self):
+        png_path = os.path.join(self.temp_dir, 'page.png')
+        Image.fromarray(self.gray).save(png_path)
+        npy_path = image_store.save_image(self.gray, os.path.join(self.temp_dir, 'page.npy'))
+        self.assertEqual(luminositybased.findTable(npy_path), luminositybased.findTable(png_path))
+
+    def test_saved_cells_use_store(self):
+        original = Cellularize.OutputLocation
+        Cellularize.OutputLocation = self.temp_dir
+        try:
+            cells = Cellularize.cellularize_Page_colrow(self.rgb, [[0, 40], [40, 90]], [[0, 30], [30, 70]], 0, store='npy')
+        finally:
+            Cellularize.OutputLocation = original
+        for cell in cells:
+            self.assertTrue(cell.path.endswith('.npy'))
+            left, upper, right, lower = cell.bbox
+            np.testing.assert_array_equal(cell.pixels(), self.rgb[upper:lower, left:right])
+
+    def test_render_pdf_to_npy_files(self):
+        paths = render_pdf_to_files(str(EXAMPLE_PDF), self.temp_dir, 'page_{number}.npy', dpi=40, grayscale=True, max_workers=1)
+        with PDFPageProvider(str(EXAMPLE_PDF), dpi=40, grayscale=True) as provider:
+            for index in (0, len(paths) - 1):
+                np.testing.assert_array_equal(image_store.load_image(paths[index]), provider.get_array(index))
+                # Already written, so found rather than rendered again
+                self.assertEqual(provider.page_path(index, self.temp_dir, store='npy'), paths[index])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import sys
+import unittest
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from TableDetection import luminositybased
+from TableDetection.luminosity import to_luminosity, luminosity_sums, luminosity_profiles
+
+
+def float_luminosity(pixels):
+    """The original float64 luminosity formula."""
+    pixels = pixels.astype(np.float64)
+    return 0.299 * pixels[:, :, 0] + 0.587 * pixels[:, :, 1] + 0.114 * pixels[:, :, 2]
+
+
+class TestLuminosity(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(38)
+        self.gray = rng.integers(0, 256, size=(301, 197), dtype=np.uint8)
+        self.gray[::20, :] = 10
+        self.gray[:, ::31] = 30
+        self.rgb = np.repeat(self.gray[:, :, None], 3, axis=2)
+
+    def test_grayscale_is_not_copied(self):
+        self.assertTrue(np.shares_memory(to_luminosity(self.gray), self.gray))
+        np.testing.assert_array_equal(to_luminosity(self.rgb), self.gray)
+        np.testing.assert_array_equal(to_luminosity(Image.fromarray(self.rgb)), self.gray)
+
+    def test_tiled_sums_match_full_page(self):
+        expected_rows = self.gray.sum(axis=1, dtype=np.uint64)
+        expected_cols = self.gray.sum(axis=0, dtype=np.uint64)
+        for tile_rows in (1, 7, 256, 10000):
+            rows, cols = luminosity_sums(self.gray, tile_rows)
+            np.testing.assert_array_equal(rows, expected_rows)
+            np.testing.assert_array_equal(cols, expected_cols)
+
+    def test_profiles_match_float_formula(self):
+        rng = np.random.default_rng(7)
+        colour = rng.integers(0, 256, size=(64, 90, 3), dtype=np.uint8)
+        for pixels in (self.rgb, colour):
+            rows, cols = luminosity_profiles(pixels, tile_rows=16)
+            luminosity = float_luminosity(pixels)
+            # uint8 rounding of each pixel moves an average by at most half a level
+            np.testing.assert_allclose(rows, luminosity.mean(axis=1), atol=0.5)
+            np.testing.assert_allclose(cols, luminosity.mean(axis=0), atol=0.5)
+
+    def test_find_table_from_profiles(self):
+        image = Image.fromarray(self.rgb)
+        luminosity = float_luminosity(self.rgb)
+        expected = [
+            luminositybased.find_troughs(1, luminosity, round(301 * 17 / 2077), engine="numpy"),
+            luminositybased.find_troughs(0, luminosity, round(197 * 80 / 1474), engine="numpy"),
+        ]
+        self.assertEqual(luminositybased.findTable(image, "borderless", "borderless"), expected)
+        self.assertEqual(luminositybased.findTable(self.gray, "borderless", "borderless"), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ocr_cache import OCRCache, make_fingerprint
+
+
+class TestOCRCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'cache.sqlite3')
+        self.cell = np.full((20, 40, 3), 255, dtype=np.uint8)
+        self.cell[5:15, 10:30] = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_hit_and_miss(self):
+        with OCRCache(self.path) as cache:
+            self.assertIsNone(cache.get(self.cell))
+            cache.put(self.cell, '1890', 0.99, 'PaddleOCR')
+            self.assertEqual(cache.get(self.cell.copy()), ('1890', 0.99, 'PaddleOCR'))
+            self.assertEqual(cache.stats(), {'cache_hits': 1, 'cache_misses': 1, 'cache_hit_rate': 0.5})
+
+    def test_changed_pixels_miss(self):
+        with OCRCache(self.path) as cache:
+            cache.put(self.cell, '1890', 0.99, 'PaddleOCR')
+            changed = self.cell.copy()
+            changed[0, 0] = 0
+            self.assertIsNone(cache.get(changed))
+
+    def test_fingerprint_separates_results(self):
+        with OCRCache(self.path, fingerprint=make_fingerprint(threshold=0.98)) as cache:
+            cache.put(self.cell, '1890', 0.99, 'PaddleOCR')
+        with OCRCache(self.path, fingerprint=make_fingerprint(threshold=0.9)) as cache:
+            self.assertIsNone(cache.get(self.cell))
+        with OCRCache(self.path, fingerprint=make_fingerprint(threshold=0.98)) as cache:
+            self.assertEqual(cache.get(self.cell), ('1890', 0.99, 'PaddleOCR'))
+
+    def test_lru_eviction(self):
+        cells = [np.full((4, 4), value, dtype=np.uint8) for value in range(3)]
+        with OCRCache(self.path, max_entries=2) as cache:
+            cache.put(cells[0], 'a', 1.0, 'PaddleOCR')
+            cache.put(cells[1], 'b', 1.0, 'PaddleOCR')
+            cache.get(cells[0])
+            cache.put(cells[2], 'c', 1.0, 'PaddleOCR')
+            self.assertEqual(len(cache), 2)
+            self.assertIsNone(cache.get(cells[1]))
+            self.assertIsNotNone(cache.get(cells[0]))
+            self.assertIsNotNone(cache.get(cells[2]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ocr_cascade import CascadePolicy, format_stats
+
+
+class CountingEngine:
+    """Fake recogniser returning a fixed (text, confidence) per image and counting calls."""
+
+    def __init__(self, results):
+        self.results = results
+        self.calls = 0
+
+    def __call__(self, image):
+        self.calls += 1
+        return self.results[image]
+
+
+class TestCascadePolicy(unittest.TestCase):
+
+    def setUp(self):
+        self.paddle = CountingEngine({'sure': ('1890', 0.99), 'unsure': ('l89O', 0.6), 'agree': ('42', 0.9)})
+        self.easy = CountingEngine({'sure': ('1890', 0.9), 'unsure': ('1890', 0.95), 'agree': ('42', 0.95)})
+        self.recognizers = {'PaddleOCR': self.paddle, 'EasyOCR': self.easy}
+
+    def policy(self, **kwargs):
+        return CascadePolicy([('PaddleOCR', 0.98), ('EasyOCR', None)], **kwargs)
+
+    def test_early_exit_and_fallback(self):
+        policy = self.policy(learn=False)
+        self.assertEqual(policy.run('sure', 0, self.recognizers), ('1890', 0.99, 'PaddleOCR'))
+        self.assertEqual(self.easy.calls, 0)
+        self.assertEqual(policy.run('unsure', 0, self.recognizers), ('1890', 0.95, 'EasyOCR'))
+        self.assertEqual(self.easy.calls, 1)
+
+        stats = policy.stats()['engines']
+        self.assertEqual(stats['PaddleOCR'], {'runs': 2, 'accepted': 1, 'changed': 0, 'skipped': 0, 'change_rate': 0.0})
+        self.assertEqual(stats['EasyOCR']['runs'], 1)
+        self.assertEqual(stats['EasyOCR']['changed'], 1)
+        self.assertIn("EasyOCR: 1 runs, changed 1", format_stats(policy.stats()))
+
+    def test_first_result_is_not_recomputed(self):
+        policy = self.policy(learn=False)
+        self.assertEqual(policy.run('sure', 0, self.recognizers, first_result=('1890', 0.99)), ('1890', 0.99, 'PaddleOCR'))
+        self.assertEqual(self.paddle.calls, 0)
+
+    def test_column_threshold_override(self):
+        policy = self.policy(learn=False, column_thresholds={3: {'PaddleOCR': 0.5}})
+        self.assertEqual(policy.run('unsure', 3, self.recognizers)[2], 'PaddleOCR')
+        self.assertEqual(policy.run('unsure', 2, self.recognizers)[2], 'EasyOCR')
+
+    def test_learns_to_skip_unhelpful_fallback(self):
+        policy = self.policy(min_samples=5, explore_every=4)
+        for _ in range(5):
+            # EasyOCR is more confident but reads the same text: it never changes the choice
+            self.assertEqual(policy.run('agree', 1, self.recognizers)[0], '42')
+        self.assertEqual(self.easy.calls, 5)
+        self.assertEqual(policy.learned_threshold('EasyOCR', 1), -1.0)
+
+        engines = [policy.run('agree', 1, self.recognizers)[2] for _ in range(8)]
+        self.assertEqual(engines.count('PaddleOCR'), 6)
+        # Two of the eight cells still ran EasyOCR to keep the estimate current
+        self.assertEqual(self.easy.calls, 7)
+        self.assertEqual(policy.stats()['engines']['EasyOCR']['skipped'], 6)
+
+        # Columns where the fallback does change the text keep running it
+        for _ in range(10):
+            policy.run('unsure', 2, self.recognizers)
+        self.assertEqual(policy.learned_threshold('EasyOCR', 2), 0.6)
+        self.assertEqual(policy.stats()['learned_thresholds']['EasyOCR'], {1: 0.0, 2: 0.6})
+
+    def test_merge_counts_from_another_policy(self):
+        worker = self.policy(learn=False)
+        worker.run('unsure', 0, self.recognizers)
+        parent = CascadePolicy(**worker.settings())
+        parent.merge_counts(worker.take_counts())
+        worker.run('sure', 0, self.recognizers)
+        parent.merge_counts(worker.take_counts())
+        self.assertEqual(parent.stats(), worker.stats())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import sys
+import unittest
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from page_ocr import TILE_SIZE, tile_bounds, assign_words_to_cells, join_words, ocr_page_cells, PAGE_SOURCE
+
+
+class BlobEngine:
+    """Fake PaddleOCR: every dark blob is a 'word' whose text is the blob's gray level."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def ocr(self, image, cls=True):
+        self.calls += 1
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        count, labels, stats, _ = cv2.connectedComponentsWithStats((gray < 200).astype(np.uint8))
+        lines = []
+        for label in range(1, count):
+            x, y, w, h, _ = stats[label]
+            text = str(int(np.median(gray[labels == label])))
+            lines.append([[[x, y], [x + w, y], [x + w, y + h], [x, y + h]], (text, 0.99)])
+        return [lines]
+
+
+class TestPageOCR(unittest.TestCase):
+
+    def test_tile_cores_partition_the_page(self):
+        for length in (500, 1600, 1601, 4000, 4681):
+            bounds = tile_bounds(length, tile_size=1600, overlap=320)
+            self.assertEqual(bounds[0][2], 0)
+            self.assertEqual(bounds[-1][3], length)
+            for (start, end, core_start, core_end), following in zip(bounds, bounds[1:] + [None]):
+                self.assertTrue(start <= core_start < core_end <= end <= length)
+                if following is not None:
+                    self.assertEqual(core_end, following[2])
+
+    def test_assign_words_to_cells(self):
+        rows = [(0, 50), (50, 100)]
+        cols = [(0, 200), (210, 400)]
+        boxes = np.array([[10, 10, 60, 40], [250, 60, 300, 90], [201, 10, 209, 40], [10, 120, 40, 140]], dtype=np.float32)
+        row_indices, col_indices = assign_words_to_cells(boxes, rows, cols)
+        self.assertEqual(row_indices.tolist(), [0, 1, 0, -1])
+        self.assertEqual(col_indices.tolist(), [0, 1, -1, 0])
+
+    def test_join_words_in_reading_order(self):
+        boxes = np.array([[60, 0, 100, 20], [0, 30, 40, 50], [0, 2, 50, 22]], dtype=np.float32)
+        self.assertEqual(join_words(boxes, ['B', 'C', 'A'], [0.9, 0.8, 1.0]), ('A B C', 0.9))
+
+    def test_default_tiles_fit_the_detector_limit(self):
+        # RunThroughTest.PADDLEOCR_SETTINGS builds the engine with det_limit_side_len=960
+        self.assertLessEqual(TILE_SIZE, 960)
+        for start, end, _, _ in tile_bounds(4681):
+            self.assertLessEqual(end - start, 960)
+
+    def test_words_on_tile_boundaries_are_kept_once(self):
+        page = np.full((300, 900, 3), 255, dtype=np.uint8)
+        rows = [(0, 150), (150, 300)]
+        cols = [(0, 300), (300, 600), (600, 900)]
+        # Words centred on, and straddling, the tile overlaps (tiles of 400 with 160 overlap)
+        words = {(0, 0): (20, 40, 100, 60), (0, 1): (310, 30, 390, 70), (1, 1): (330, 200, 470, 230), (1, 2): (640, 170, 700, 200)}
+        for index, (x0, y0, x1, y1) in enumerate(words.values()):
+            page[y0:y1, x0:x1] = 10 + index * 20
+
+        engine = BlobEngine()
+        results = ocr_page_cells(page, rows, cols, engine, page_num=2, tile_size=400, overlap=160)
+        self.assertGreater(engine.calls, 1)
+        self.assertEqual(
+            results,
+            [(row, col, str(10 + index * 20), 0.99, PAGE_SOURCE, f"page 2 row {row} col {col}") for index, (row, col) in enumerate(words)]
+        )
+
+    def test_refine_receives_cell_pixels(self):
+        page = np.full((100, 200), 255, dtype=np.uint8)
+        page[20:40, 120:160] = 50
+        seen = []
+
+        def refine(row, col, pixels, label, result):
+            seen.append((row, col, pixels.shape, result))
+            return None
+
+        self.assertEqual(ocr_page_cells(page, [(0, 100)], [(0, 100), (100, 200)], BlobEngine(), refine=refine), [])
+        self.assertEqual(seen, [(0, 1, (100, 100), ('50', 0.99))])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import threading
+import numpy as np
+from pathlib import Path
+from PIL import Image
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from parallel_render import ParallelPDFRenderer, render_pdf_to_files, page_ranges
+from pdf_to_image import PDFPageProvider, PAGE_FOLDER_MARKER
+
+# Six pages, enough for the process pool to be used
+EXAMPLE_PDF = Path(__file__).resolve().parent.parent.parent / 'Examples' / 'Brabant.pdf'
+
+
+class TestParallelRender(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_page_ranges_cover_document_in_order(self):
+        for page_count, workers in ((1, 4), (6, 2), (19, 4), (5, 8)):
+            ranges = page_ranges(page_count, workers)
+            self.assertEqual([index for pages in ranges for index in pages], list(range(page_count)))
+
+    def test_pages_in_order_and_identical(self):
+        with PDFPageProvider(str(EXAMPLE_PDF), dpi=60, grayscale=True) as provider:
+            expected = [provider.get_array(index) for index in range(provider.page_count)]
+        with ParallelPDFRenderer(EXAMPLE_PDF, dpi=60, grayscale=True, max_workers=2) as renderer:
+            self.assertIsNotNone(renderer._pool)
+            pages = list(renderer.iter_pages())
+        self.assertEqual([index for index, _ in pages], list(range(len(expected))))
+        for (_, pixels), reference in zip(pages, expected):
+            np.testing.assert_array_equal(pixels, reference)
+
+    def test_stopping_early_releases_pages(self):
+        cancel = threading.Event()
+        with ParallelPDFRenderer(EXAMPLE_PDF, dpi=40, max_workers=2) as renderer:
+            for index, pixels in renderer.iter_pages(cancel_event=cancel):
+                self.assertEqual(pixels.ndim, 3)
+                cancel.set()
+            self.assertEqual(index, 0)
+
+    def test_render_to_files(self):
+        # A page file of another document is rendered again, not skipped
+        stale = os.path.join(self.temp_dir, 'Document_0.png')
+        Image.new('L', (3, 3)).save(stale)
+        paths = render_pdf_to_files(str(EXAMPLE_PDF), self.temp_dir, 'Document_{index}.png', dpi=40, max_workers=2, skip_existing=True)
+        self.assertEqual([os.path.basename(path) for path in paths], [f'Document_{index}.png' for index in range(6)])
+        self.assertEqual(sorted(os.listdir(self.temp_dir)), sorted([PAGE_FOLDER_MARKER] + [os.path.basename(path) for path in paths]))
+        with PDFPageProvider(str(EXAMPLE_PDF), dpi=40) as provider, Image.open(paths[3]) as page, Image.open(stale) as first:
+            self.assertEqual(page.tobytes(), provider[3].tobytes())
+            self.assertEqual(first.size, provider.page_size(0))
+
+        # Pages of the same document are skipped
+        modified = os.path.getmtime(paths[0])
+        render_pdf_to_files(str(EXAMPLE_PDF), self.temp_dir, 'Document_{index}.png', dpi=40, max_workers=2, skip_existing=True)
+        self.assertEqual(os.path.getmtime(paths[0]), modified)
+
+    def test_cancelled_render_to_files_stops_early(self):
+        cancel = threading.Event()
+        cancel.set()
+        paths = render_pdf_to_files(str(EXAMPLE_PDF), self.temp_dir, 'page_{number}.png', dpi=40, max_workers=2, cancel_event=cancel)
+        self.assertLess(sum(os.path.exists(path) for path in paths), len(paths))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import os
+import sys
+import time
+import threading
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pipeline import prefetch, Pipeline
+
+
+class TestPrefetch(unittest.TestCase):
+
+    def test_items_in_order(self):
+        self.assertEqual(list(prefetch(iter(range(10)), maxsize=2)), list(range(10)))
+
+    def test_producer_stays_bounded(self):
+        produced = []
+
+        def pages():
+            for page in range(100):
+                produced.append(page)
+                yield page
+
+        stream = prefetch(pages(), maxsize=2)
+        next(stream)
+        time.sleep(0.2)
+        # One item consumed, at most `maxsize` queued and one waiting to be queued
+        self.assertLessEqual(len(produced), 4)
+        stream.close()
+
+    def test_producer_error_is_raised(self):
+        def pages():
+            yield 1
+            raise ValueError("render failed")
+
+        stream = prefetch(pages())
+        self.assertEqual(next(stream), 1)
+        with self.assertRaises(ValueError):
+            next(stream)
+
+    def test_close_stops_nested_stages(self):
+        threads_before = threading.active_count()
+        stream = prefetch(prefetch(iter(range(1000)), maxsize=1), maxsize=1)
+        next(stream)
+        stream.close()
+        time.sleep(0.3)
+        self.assertEqual(threading.active_count(), threads_before)
+
+
+class TestPipeline(unittest.TestCase):
+
+    def test_stages_in_order(self):
+        pipeline = Pipeline(queue_size=2)
+        pipeline.add_stage("double", lambda x: x * 2, workers=3)
+        pipeline.add_stage("inc", lambda x: x + 1)
+        self.assertEqual(list(pipeline.run(range(50))), [x * 2 + 1 for x in range(50)])
+
+    def test_stages_overlap(self):
+        def slow(x):
+            time.sleep(0.05)
+            return x
+
+        pipeline = Pipeline().add_stage("render", slow).add_stage("detect", slow)
+        start = time.perf_counter()
+        for _ in pipeline.run(range(10)):
+            with pipeline.measure("ocr"):
+                time.sleep(0.05)
+        # Sequential phases would take 1.5s; overlapped stages take about a third of that
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+    def test_metrics(self):
+        pipeline = Pipeline().add_stage("render", lambda x: x, workers=2)
+        for _ in pipeline.run(range(5)):
+            with pipeline.measure("ocr"):
+                pass
+        metrics = pipeline.metrics()
+        self.assertEqual(list(metrics), ["render", "ocr"])
+        self.assertEqual(metrics["render"]["items"], 5)
+        self.assertEqual(metrics["render"]["workers"], 2)
+        self.assertEqual(metrics["ocr"]["items"], 5)
+        for stage in metrics.values():
+            self.assertGreaterEqual(stage["utilization"], 0.0)
+            self.assertEqual(stage["queue_depth"], 0)
+
+    def test_reorder_window_is_bounded(self):
+        def first_is_slow(x):
+            if x == 0:
+                time.sleep(0.5)
+            return x
+
+        pipeline = Pipeline(queue_size=2).add_stage("detect", first_is_slow, workers=4)
+        self.assertEqual(list(pipeline.run(range(100))), list(range(100)))
+        # Without a window, items 1..99 would all wait behind item 0
+        self.assertLessEqual(pipeline.max_pending, 2 + 4)
+
+    def test_stage_error_is_raised(self):
+        def fail(x):
+            if x == 3:
+                raise ValueError("detection failed")
+            return x
+
+        pipeline = Pipeline().add_stage("detect", fail)
+        with self.assertRaises(ValueError):
+            list(pipeline.run(range(10)))
+
+    def test_close_stops_workers(self):
+        threads_before = threading.active_count()
+        stream = Pipeline(queue_size=1).add_stage("a", lambda x: x, workers=2).run(iter(range(1000)))
+        next(stream)
+        stream.close()
+        self.assertEqual(threading.active_count(), threads_before)
+
+
+if __name__ == '__main__':
+    unittest.main()
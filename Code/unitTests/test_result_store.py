@@ -0,0 +1,77 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from result_store import ResultStore
+from blank_cells import BLANK_SOURCE
+
+
+class TestResultStore(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.results = [
+            (0, 0, 'Land', 0.99, 'Original Image, PaddleOCR', 'a'),
+            (0, 1, 'Wien', 0.95, 'Original Image, PaddleOCR', 'b'),
+            (1, 0, 'Salzburg', 0.90, 'Original Image, PaddleOCR', 'c'),
+            (1, 1, '291.183', 0.62, 'Original Image, EasyOCR', 'd'),
+            (2, 0, 'tirol', 0.97, 'Original Image, PaddleOCR', 'e'),
+            (2, 1, '10.5', 0.93, 'Original Image, PaddleOCR', 'f'),
+            (3, 0, 'Krain', 0.91, 'Original Image, PaddleOCR', 'g'),
+            (3, 1, '', 1.0, BLANK_SOURCE, 'h'),
+            None,
+            (2, 0, 'Tirol', 0.98, 'Original Image, EasyOCR', 'e'),
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_cells_and_confidences(self):
+        store = ResultStore.from_results(self.results)
+        self.assertEqual(store.shape, (4, 2))
+        # The later result for a cell wins, blank and None results are left out
+        self.assertEqual(store.text(2, 0), 'Tirol')
+        self.assertEqual(store.text(3, 1), '')
+        self.assertTrue(store.is_low_confidence(1, 1))
+        self.assertFalse(store.is_low_confidence(3, 1))
+        self.assertEqual(store.low_confidence_count(), 1)
+
+    def test_sort_numbers_then_text(self):
+        store = ResultStore.from_results(self.results)
+        rows = np.arange(1, 4)
+        np.testing.assert_array_equal(store.sort_order(1, rows=rows), [2, 1, 3])
+        np.testing.assert_array_equal(store.sort_order(1, descending=True, rows=rows), [3, 1, 2])
+        np.testing.assert_array_equal(store.sort_order(0, rows=rows), [3, 1, 2])
+
+    def test_filter_rows(self):
+        store = ResultStore.from_results(self.results)
+        np.testing.assert_array_equal(store.filter_rows('TIROL'), [2])
+        np.testing.assert_array_equal(store.filter_rows('i', col=1), [0])
+        np.testing.assert_array_equal(store.filter_rows('', rows=[3, 1]), [3, 1])
+        self.assertEqual(len(store.filter_rows('nowhere')), 0)
+
+    def test_csv_round_trip(self):
+        path = os.path.join(self.temp_dir, 'table.csv')
+        with open(path, 'w', newline='', encoding='utf-8') as file:
+            file.write('a,b,c\n1,,"x, y"\n,,\n')
+        store = ResultStore.from_csv(path)
+        self.assertEqual(store.shape, (3, 3))
+        self.assertEqual(store.row_values(1), ['1', '', 'x, y'])
+        self.assertTrue(np.isnan(store.confidence(0, 0)))
+        copy = os.path.join(self.temp_dir, 'copy.csv')
+        store.write_csv(copy)
+        self.assertEqual(ResultStore.from_csv(copy).row_values(1), store.row_values(1))
+
+    def test_from_table_data(self):
+        store = ResultStore.from_table_data({0: {0: 'h', 2: 'i'}, 4: {1: 'x'}})
+        self.assertEqual(store.shape, (5, 3))
+        self.assertEqual(store.row_values(4), ['', 'x', ''])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import sys
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from table_grid import TableGrid, line_intersections
+
+
+class TestTableGrid(unittest.TestCase):
+
+    def setUp(self):
+        # Two rows, three columns with a gap between the second and third column
+        self.grid = TableGrid([(0, 50), (50, 100)], [(0, 100), (100, 200), (210, 300)])
+
+    def brute_force(self, x, y):
+        for row, (top, bottom) in enumerate(zip(self.grid.row_starts, self.grid.row_ends)):
+            for col, (left, right) in enumerate(zip(self.grid.col_starts, self.grid.col_ends)):
+                if left <= x < right and top <= y < bottom:
+                    return row, col
+        return None
+
+    def test_cell_at(self):
+        self.assertEqual(self.grid.shape, (2, 3))
+        self.assertEqual(self.grid.cell_at(10, 10), (0, 0))
+        self.assertEqual(self.grid.cell_at(100, 50), (1, 1))
+        self.assertEqual(self.grid.cell_at(299, 99), (1, 2))
+        self.assertIsNone(self.grid.cell_at(205, 10))  # In the gap
+        self.assertIsNone(self.grid.cell_at(300, 10))
+        self.assertIsNone(self.grid.cell_at(-1, 10))
+
+    def test_assign_matches_cell_at(self):
+        rng = np.random.default_rng(0)
+        xs, ys = rng.uniform(-20, 320, 500), rng.uniform(-20, 120, 500)
+        rows, cols = self.grid.assign(xs, ys)
+        for x, y, row, col in zip(xs, ys, rows, cols):
+            expected = self.brute_force(x, y)
+            self.assertEqual(self.grid.cell_at(x, y), expected)
+            self.assertEqual(None if row < 0 or col < 0 else (row, col), expected)
+
+    def test_cells_in_box(self):
+        self.assertEqual(self.grid.cells_in_box(90, 40, 110, 60), [(0, 0), (0, 1), (1, 0), (1, 1)])
+        self.assertEqual(self.grid.cells_in_box(201, 10, 209, 20), [])
+        self.assertEqual(self.grid.cells_in_box(150, 60, 250, 70), [(1, 1), (1, 2)])
+
+    def test_from_boundaries_and_bboxes(self):
+        grid = TableGrid.from_boundaries([0, 40, 40, 80], [0, 3, 60])
+        self.assertEqual(grid.shape, (2, 2))
+        self.assertEqual(list(grid.iter_bboxes(min_size=5)), [(0, 1, (3, 0, 60, 40)), (1, 1, (3, 40, 60, 80))])
+        self.assertEqual(grid.bbox(1, 0), (0, 40, 3, 80))
+        self.assertEqual(len(grid.intersections()), 9)
+
+    def test_line_intersections_with_a_single_line(self):
+        self.assertEqual(line_intersections([100], [30, 10, 20]), [(10, 100), (20, 100), (30, 100)])
+        self.assertEqual(line_intersections([5, 5, 1], [7]), [(7, 1), (7, 5)])
+        self.assertEqual(line_intersections([], [7]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
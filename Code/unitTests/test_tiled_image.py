@@ -0,0 +1,61 @@
+import os
+import sys
+import threading
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from tiled_image import ImagePyramid, level_for_scale, LEVEL_SCALES
+
+
+class TestImagePyramid(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(23)
+        self.pixels = rng.integers(0, 256, size=(700, 1000), dtype=np.uint8)
+        self.pyramid = ImagePyramid(1000, 700, tile_size=128)
+
+    def test_level_for_scale(self):
+        self.assertEqual(level_for_scale(0.1), 0.125)
+        self.assertEqual(level_for_scale(0.25), 0.25)
+        self.assertEqual(level_for_scale(0.3), 0.5)
+        self.assertEqual(level_for_scale(3.0), 1.0)
+
+    def test_build_coarse_to_fine(self):
+        built = []
+        loads = []
+        self.pyramid.build(lambda: loads.append(1) or self.pixels, on_level=built.append)
+        self.assertEqual(built, sorted(LEVEL_SCALES))
+        self.assertEqual(len(loads), 1)
+        self.assertIs(self.pyramid.level(1.0), self.pixels)
+        self.assertEqual(self.pyramid.level(0.25).shape, (175, 250))
+        # Built levels are not built again
+        self.pyramid.build(lambda: self.fail('loaded again'))
+
+    def test_build_can_be_cancelled(self):
+        cancel_event = threading.Event()
+        cancel_event.set()
+        self.pyramid.build(lambda: self.pixels, cancel_event=cancel_event)
+        self.assertEqual(self.pyramid.built_levels(), [])
+        with self.assertRaises(ValueError):
+            self.pyramid.build(lambda: self.pixels[:10])
+
+    def test_tiles_cover_rect(self):
+        self.pyramid.build(lambda: self.pixels, scales=[0.5, 1.0])
+        self.assertEqual(self.pyramid.tile_counts(1.0), (8, 6))
+        # At half scale a 128 pixel tile covers 256 page pixels
+        self.assertEqual(self.pyramid.tiles_in_rect(0.5, 250, 0, 10, 10), [(0, 0), (1, 0)])
+        self.assertEqual(self.pyramid.tiles_in_rect(1.0, 990, 690, 100, 100), [(7, 5)])
+        self.assertEqual(self.pyramid.tiles_in_rect(1.0, -50, -50, 20, 20), [])
+        # Edge tiles are cut to the image, and tiles are views into their level
+        self.assertEqual(self.pyramid.tile_rect(1.0, 7, 5), (896, 640, 104, 60))
+        tile = self.pyramid.tile(1.0, 7, 5)
+        self.assertTrue(np.shares_memory(tile, self.pixels))
+        np.testing.assert_array_equal(tile, self.pixels[640:, 896:])
+        x, y, width, height = self.pyramid.tile_rect(0.5, 3, 2)
+        self.assertEqual((x + width, y + height), (1000, 700))
+
+
+if __name__ == '__main__':
+    unittest.main()